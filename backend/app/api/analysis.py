@@ -1,8 +1,15 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, AsyncIterator, List, Optional
+from bson import ObjectId
+from bson.errors import InvalidId
 from ..database import get_database
+from collections import Counter
+import base64
+import json
 import re
 
 router = APIRouter(prefix="/analysis")
@@ -15,6 +22,22 @@ class SearchRequest(BaseModel):
     startDate: str
     endDate: str
     keyword: Optional[str] = None
+    limit: Optional[int] = None     # 페이지 크기 (기본 SEARCH_PAGE_SIZE, 최대 SEARCH_MAX_PAGE_SIZE)
+    cursor: Optional[str] = None    # 이전 응답의 next_cursor (없으면 첫 페이지)
+
+class ExportRequest(BaseModel):
+    startDate: str
+    endDate: str
+    keyword: Optional[str] = None
+    include_messages: bool = False  # True면 요약 대신 전체 메시지를 내보냄
+
+# 상담 리스트 페이지 크기
+SEARCH_PAGE_SIZE = 50
+SEARCH_MAX_PAGE_SIZE = 200
+
+# 요약 생성에 사용하는 앞쪽 메시지 수와 요약 길이
+SUMMARY_MESSAGE_LIMIT = 20
+SUMMARY_MAX_LENGTH = 200
 
 # 불용어 목록
 stop_words = {'안녕', '네', '아니요', '그래', '음', '어', '저', '이', '그', '저거', '이거', '그거'}
@@ -27,96 +50,336 @@ def extract_nouns(text: str) -> List[str]:
     # 불용어가 아닌 단어만 필터링
     return [word for word in words if word not in stop_words]
 
+def _search_query(start_date: datetime, end_date: datetime, keyword: Optional[str]) -> Dict[str, Any]:
+    """날짜 범위 + 키워드 검색 조건"""
+    query = {
+        'consultation_start_time': {
+            '$gte': start_date,
+            '$lte': end_date
+        }
+    }
+    
+    # 키워드 검색이 있는 경우
+    if keyword:
+        keyword = keyword.lower()
+        # messages 배열의 content에서 키워드 검색
+        query['$or'] = [
+            {'messages.content': {'$regex': keyword, '$options': 'i'}},
+            {'utterances.text': {'$regex': keyword, '$options': 'i'}},
+            {'title': {'$regex': keyword, '$options': 'i'}}
+        ]
+    
+    return query
+
+def _encode_cursor(conv: Dict[str, Any]) -> str:
+    """마지막 항목의 (consultation_start_time, _id)를 다음 페이지 커서로 인코딩"""
+    payload = {'t': conv['consultation_start_time'].isoformat(), 'id': str(conv['_id'])}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode('utf-8')).decode('ascii')
+
+def _decode_cursor(cursor: str) -> Dict[str, Any]:
+    """커서를 (consultation_start_time, _id) 이후 항목 조건으로 변환 (최신순 정렬 기준)"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        start_time = datetime.fromisoformat(payload['t'])
+        last_id = ObjectId(payload['id'])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise HTTPException(status_code=400, detail="잘못된 cursor 값입니다.")
+    
+    return {'$or': [
+        {'consultation_start_time': {'$lt': start_time}},
+        {'consultation_start_time': start_time, '_id': {'$lt': last_id}}
+    ]}
+
+def _summary_projection() -> Dict[str, Any]:
+    """
+    목록용 요약 $project 단계 (메시지 배열은 내려보내지 않음)
+    - utterances가 있으면 utterances의 text, 없으면 messages의 content를 사용
+    - 요약은 앞쪽 SUMMARY_MESSAGE_LIMIT개 메시지만 $slice로 이어 붙이고 $substrCP로 자름
+    """
+    utterances = {'$cond': [{'$isArray': '$utterances'}, '$utterances', []]}
+    messages = {'$cond': [{'$isArray': '$messages'}, '$messages', []]}
+    use_utterances = {'$gt': [{'$size': utterances}, 0]}
+    
+    utterance_texts = {'$map': {
+        'input': {'$slice': [utterances, SUMMARY_MESSAGE_LIMIT]},
+        'as': 'u',
+        'in': {'$cond': [{'$eq': [{'$type': '$$u.text'}, 'string']}, '$$u.text', '']}
+    }}
+    message_texts = {'$map': {
+        'input': {'$filter': {
+            'input': {'$slice': [messages, SUMMARY_MESSAGE_LIMIT]},
+            'as': 'm',
+            'cond': {'$eq': [{'$type': '$$m.content'}, 'string']}
+        }},
+        'as': 'm',
+        'in': '$$m.content'
+    }}
+    joined = {'$ifNull': [{'$reduce': {
+        'input': {'$cond': [use_utterances, utterance_texts, message_texts]},
+        'initialValue': None,
+        'in': {'$cond': [
+            {'$eq': ['$$value', None]},
+            '$$this',
+            {'$concat': ['$$value', ' ', '$$this']}
+        ]}
+    }}, '']}
+    
+    return {'$project': {
+        'title': 1,
+        'consultation_start_time': 1,
+        'status': 1,
+        'message_count': {'$cond': [use_utterances, {'$size': utterances}, {'$size': messages}]},
+        'summary': {'$let': {
+            'vars': {'text': joined},
+            'in': {'$cond': [
+                {'$gt': [{'$strLenCP': '$$text'}, SUMMARY_MAX_LENGTH]},
+                {'$concat': [{'$substrCP': ['$$text', 0, SUMMARY_MAX_LENGTH]}, '...']},
+                '$$text'
+            ]}
+        }}
+    }}
+
+def _summary_item(conv: Dict[str, Any]) -> Dict[str, Any]:
+    """요약 $project 결과를 응답 항목으로 변환"""
+    return {
+        'id': str(conv['_id']),
+        'title': conv.get('title', ''),
+        'consultation_time': conv.get('consultation_start_time'),
+        'summary': conv.get('summary', ''),
+        'status': conv.get('status', 'unknown'),
+        'message_count': conv.get('message_count', 0)
+    }
+
+def _conversation_messages(conv: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """utterances가 있으면 messages 형식으로 변환, 없으면 messages를 그대로 사용"""
+    if 'utterances' in conv and conv['utterances']:
+        return [
+            {
+                'role': 'user' if utterance.get('speaker') == '고객' else 'assistant',
+                'content': utterance.get('text', ''),
+                'timestamp': utterance.get('timestamp')
+            }
+            for utterance in conv['utterances']
+        ]
+    if 'messages' in conv and conv['messages']:
+        return conv['messages']
+    return []
+
+def _detail_item(conv: Dict[str, Any]) -> Dict[str, Any]:
+    """대화 전체를 응답 항목으로 변환 (요약 포함)"""
+    messages = _conversation_messages(conv)
+    summary = " ".join(msg['content'] for msg in messages if 'content' in msg)
+    if len(summary) > SUMMARY_MAX_LENGTH:
+        summary = summary[:SUMMARY_MAX_LENGTH] + "..."
+    
+    return {
+        'id': str(conv['_id']),
+        'title': conv.get('title', ''),
+        'consultation_time': conv.get('consultation_start_time'),
+        'summary': summary,
+        'status': conv.get('status', 'unknown'),
+        'message_count': len(messages),
+        'messages': messages
+    }
+
+# 최신순 + 같은 시각이면 _id 역순 (keyset 페이지네이션 기준)
+_SEARCH_SORT = {'consultation_start_time': -1, '_id': -1}
+
 @router.post("/search")
 async def search_conversations(request: SearchRequest) -> Dict[str, Any]:
+    """상담 목록 검색 (요약만 반환, 전체 메시지는 /conversations/{id}로 조회)"""
     try:
         start_date = datetime.fromisoformat(request.startDate.replace('Z', '+00:00'))
         end_date = datetime.fromisoformat(request.endDate.replace('Z', '+00:00'))
+        limit = min(max(request.limit or SEARCH_PAGE_SIZE, 1), SEARCH_MAX_PAGE_SIZE)
         
         db = await get_database()
         collection = db.conversations
         
-        # 기본 쿼리: 날짜 범위
-        query = {
-            'consultation_start_time': {
-                '$gte': start_date,
-                '$lte': end_date
-            }
-        }
-        
-        # 키워드 검색이 있는 경우
-        if request.keyword:
-            keyword = request.keyword.lower()
-            # messages 배열의 content에서 키워드 검색
-            query['$or'] = [
-                {'messages.content': {'$regex': keyword, '$options': 'i'}},
-                {'utterances.text': {'$regex': keyword, '$options': 'i'}},
-                {'title': {'$regex': keyword, '$options': 'i'}}
-            ]
+        query = _search_query(start_date, end_date, request.keyword)
+        page_query = {'$and': [query, _decode_cursor(request.cursor)]} if request.cursor else query
         
-        # 필요한 필드만 선택
-        projection = {
-            '_id': 1,
-            'title': 1,
-            'consultation_start_time': 1,
-            'messages': 1,
-            'utterances': 1,
-            'status': 1
-        }
+        # 다음 페이지 존재 여부 확인을 위해 하나 더 조회
+        pipeline = [
+            {'$match': page_query},
+            {'$sort': _SEARCH_SORT},
+            {'$limit': limit + 1},
+            _summary_projection()
+        ]
+        conversations = await collection.aggregate(pipeline).to_list(length=limit + 1)
         
-        # 날짜순으로 정렬
-        cursor = collection.find(query, projection).sort('consultation_start_time', -1)
-        conversations = await cursor.to_list(length=None)
+        has_more = len(conversations) > limit
+        conversations = conversations[:limit]
         
-        # 응답 데이터 가공
-        result = []
-        for conv in conversations:
-            # 메시지 내용을 요약으로 사용
-            summary = ""
-            messages = []
-            
-            # utterances가 있는 경우 messages로 변환
-            if 'utterances' in conv and conv['utterances']:
-                for utterance in conv['utterances']:
-                    message = {
-                        'role': 'user' if utterance.get('speaker') == '고객' else 'assistant',
-                        'content': utterance.get('text', ''),
-                        'timestamp': utterance.get('timestamp')
-                    }
-                    messages.append(message)
-            # messages가 있는 경우 그대로 사용
-            elif 'messages' in conv and conv['messages']:
-                messages = conv['messages']
-            
-            # 요약 생성
-            if messages:
-                all_messages = []
-                for msg in messages:
-                    if 'content' in msg:
-                        all_messages.append(msg['content'])
-                summary = " ".join(all_messages)
-                if len(summary) > 200:  # 200자로 제한
-                    summary = summary[:200] + "..."
-            
-            result.append({
-                'id': str(conv['_id']),
-                'title': conv.get('title', ''),
-                'consultation_time': conv.get('consultation_start_time'),
-                'summary': summary,
-                'status': conv.get('status', 'unknown'),
-                'message_count': len(messages),
-                'messages': messages  # 전체 메시지 내용도 포함
-            })
+        # 전체 건수는 첫 페이지에서만 계산
+        total = await collection.count_documents(query) if not request.cursor else None
         
         return {
-            'total': len(result),
-            'conversations': result
+            'total': total,
+            'conversations': [_summary_item(conv) for conv in conversations],
+            'next_cursor': _encode_cursor(conversations[-1]) if has_more else None,
+            'has_more': has_more
         }
-            
+    
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Search error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/search/export")
+async def export_conversations(request: ExportRequest) -> StreamingResponse:
+    """검색 결과 전체를 NDJSON(한 줄에 대화 하나)으로 스트리밍 (결과 전체를 메모리에 모으지 않음)"""
+    try:
+        start_date = datetime.fromisoformat(request.startDate.replace('Z', '+00:00'))
+        end_date = datetime.fromisoformat(request.endDate.replace('Z', '+00:00'))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    db = await get_database()
+    collection = db.conversations
+    query = _search_query(start_date, end_date, request.keyword)
+    
+    async def ndjson_stream() -> AsyncIterator[str]:
+        try:
+            if request.include_messages:
+                projection = {'title': 1, 'consultation_start_time': 1, 'messages': 1, 'utterances': 1, 'status': 1}
+                cursor = collection.find(query, projection).sort(list(_SEARCH_SORT.items())).batch_size(100)
+                to_item = _detail_item
+            else:
+                pipeline = [{'$match': query}, {'$sort': _SEARCH_SORT}, _summary_projection()]
+                cursor = collection.aggregate(pipeline, allowDiskUse=True, batchSize=500)
+                to_item = _summary_item
+            
+            async for conv in cursor:
+                yield json.dumps(jsonable_encoder(to_item(conv)), ensure_ascii=False) + "\n"
+        except Exception as e:
+            print(f"Export error: {str(e)}")
+            yield json.dumps({'error': str(e)}, ensure_ascii=False) + "\n"
+    
+    return StreamingResponse(
+        ndjson_stream(),
+        media_type="application/x-ndjson",
+        headers={
+            "Content-Disposition": "attachment; filename=conversations.ndjson",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+@router.get("/conversations/{conversation_id}")
+async def get_conversation(conversation_id: str) -> Dict[str, Any]:
+    """상담 한 건의 전체 메시지 조회 (목록에서 선택했을 때 불러옴)"""
+    try:
+        object_id = ObjectId(conversation_id)
+    except (InvalidId, TypeError):
+        raise HTTPException(status_code=400, detail="잘못된 상담 ID입니다.")
+    
+    try:
+        db = await get_database()
+        conv = await db.conversations.find_one(
+            {'_id': object_id},
+            {'title': 1, 'consultation_start_time': 1, 'messages': 1, 'utterances': 1, 'status': 1}
+        )
+    except Exception as e:
+        print(f"Conversation detail error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    if not conv:
+        raise HTTPException(status_code=404, detail="상담 내역을 찾을 수 없습니다.")
+    return _detail_item(conv)
+
+def _date_range_match(start_date: datetime, end_date: datetime) -> Dict[str, Any]:
+    """상담 시작 시간 범위 $match 단계"""
+    return {'$match': {
+        'consultation_start_time': {
+            '$gte': start_date,
+            '$lte': end_date
+        }
+    }}
+
+def _stats_pipeline(start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
+    """
+    기본 통계/대화 패턴 집계 파이프라인 (대화 문서를 애플리케이션으로 가져오지 않음)
+    - role이 있는 메시지만 역할 통계와 턴 계산에 사용 (기존 Python 루프와 같은 기준)
+    - 턴: 같은 역할이 연속된 메시지 묶음, 대화별로 $reduce 해서 턴 수/최대 길이를 구함
+    """
+    messages = {'$cond': [{'$isArray': '$messages'}, '$messages', []]}
+    has_role = {'$ne': [{'$type': '$$m.role'}, 'missing']}
+    
+    return [
+        _date_range_match(start_date, end_date),
+        {'$project': {
+            '_id': 0,
+            'message_count': {'$size': messages},
+            'first_message': {'$arrayElemAt': [messages, 0]},
+            'roles': {'$map': {
+                'input': {'$filter': {'input': messages, 'as': 'm', 'cond': has_role}},
+                'as': 'm',
+                'in': '$$m.role'
+            }}
+        }},
+        {'$project': {
+            'message_count': 1,
+            'roles': 1,
+            'first_role_type': {'$type': '$first_message.role'},
+            'first_role': '$first_message.role',
+            'turns': {'$reduce': {
+                'input': '$roles',
+                'initialValue': {'started': False, 'prev': None, 'run': 0, 'max': 0, 'count': 0},
+                'in': {'$cond': [
+                    {'$and': ['$$value.started', {'$eq': ['$$this', '$$value.prev']}]},
+                    {
+                        'started': True,
+                        'prev': '$$this',
+                        'run': {'$add': ['$$value.run', 1]},
+                        'max': {'$max': ['$$value.max', {'$add': ['$$value.run', 1]}]},
+                        'count': '$$value.count'
+                    },
+                    {
+                        'started': True,
+                        'prev': '$$this',
+                        'run': 1,
+                        'max': {'$max': ['$$value.max', 1]},
+                        'count': {'$add': ['$$value.count', 1]}
+                    }
+                ]}
+            }}
+        }},
+        {'$facet': {
+            'totals': [
+                {'$group': {
+                    '_id': None,
+                    'total_conversations': {'$sum': 1},
+                    'total_messages': {'$sum': '$message_count'},
+                    'user_first': {'$sum': {'$cond': [{'$eq': ['$first_role', 'user']}, 1, 0]}},
+                    'assistant_first': {'$sum': {'$cond': [
+                        {'$and': [
+                            {'$ne': ['$first_role_type', 'missing']},
+                            {'$ne': ['$first_role', 'user']}
+                        ]}, 1, 0
+                    ]}},
+                    'turn_count': {'$sum': '$turns.count'},
+                    'turn_messages': {'$sum': {'$size': '$roles'}},
+                    'max_turn_length': {'$max': '$turns.max'}
+                }}
+            ],
+            'roles': [
+                {'$unwind': '$roles'},
+                {'$group': {'_id': '$roles', 'count': {'$sum': 1}}}
+            ]
+        }}
+    ]
+
+def _user_messages_pipeline(start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
+    """키워드 분석용 사용자 메시지 본문만 내보내는 파이프라인"""
+    return [
+        _date_range_match(start_date, end_date),
+        {'$project': {'_id': 0, 'messages.role': 1, 'messages.content': 1}},
+        {'$unwind': '$messages'},
+        {'$match': {'messages.role': 'user', 'messages.content': {'$type': 'string'}}},
+        {'$project': {'content': '$messages.content'}}
+    ]
+
 @router.post("")
 async def analyze_conversations(request: AnalysisRequest) -> Dict[str, Any]:
     try:
@@ -126,16 +389,13 @@ async def analyze_conversations(request: AnalysisRequest) -> Dict[str, Any]:
         db = await get_database()
         collection = db.conversations
         
-        # 상담 시작 시간으로 필터링
-        cursor = collection.find({
-            'consultation_start_time': {
-                '$gte': start_date,
-                '$lte': end_date
-            }
-        })
-        conversations = await cursor.to_list(length=None)
+        # 통계는 DB에서 집계 (기간이 길면 디스크 사용 허용)
+        facet_result = await collection.aggregate(
+            _stats_pipeline(start_date, end_date), allowDiskUse=True
+        ).to_list(length=1)
+        facets = facet_result[0] if facet_result else {'totals': [], 'roles': []}
         
-        if not conversations:
+        if not facets['totals']:
             return {
                 'basic_stats': {
                     'total_conversations': 0,
@@ -152,69 +412,27 @@ async def analyze_conversations(request: AnalysisRequest) -> Dict[str, Any]:
                 'keywords': {}
             }
         
-        # 기본 통계 계산
-        total_conversations = len(conversations)
-        total_messages = 0
-        role_stats = {'user': 0, 'assistant': 0}
+        totals = facets['totals'][0]
+        total_conversations = totals['total_conversations']
+        total_messages = totals['total_messages']
         
-        for conv in conversations:
-            if 'messages' in conv:
-                messages = conv['messages']
-                total_messages += len(messages)
-                for msg in messages:
-                    if 'role' in msg:
-                        role = msg['role']
-                        role_stats[role] = role_stats.get(role, 0) + 1
+        role_stats = {'user': 0, 'assistant': 0}
+        for role in facets['roles']:
+            role_stats[role['_id']] = role['count']
         
         avg_conversation_length = total_messages / total_conversations if total_conversations > 0 else 0
+        avg_turn_length = totals['turn_messages'] / totals['turn_count'] if totals['turn_count'] else 0
         
-        # 대화 패턴 분석
-        user_first = 0
-        assistant_first = 0
-        
-        for conv in conversations:
-            if 'messages' in conv and conv['messages']:
-                first_msg = conv['messages'][0]
-                if 'role' in first_msg:
-                    if first_msg['role'] == 'user':
-                        user_first += 1
-                    else:
-                        assistant_first += 1
-        
-        # 턴 길이 분석
-        turn_lengths = []
-        for conv in conversations:
-            if 'messages' in conv:
-                current_role = None
-                current_length = 0
-                for msg in conv['messages']:
-                    if 'role' in msg:
-                        if current_role != msg['role']:
-                            if current_length > 0:
-                                turn_lengths.append(current_length)
-                            current_role = msg['role']
-                            current_length = 1
-                        else:
-                            current_length += 1
-                if current_length > 0:
-                    turn_lengths.append(current_length)
-        
-        avg_turn_length = sum(turn_lengths) / len(turn_lengths) if turn_lengths else 0
-        max_turn_length = max(turn_lengths) if turn_lengths else 0
-        
-        # 키워드 분석 (명사만 추출)
-        keywords = {}
-        for conv in conversations:
-            if 'messages' in conv:
-                for msg in conv['messages']:
-                    if 'role' in msg and msg['role'] == 'user' and 'content' in msg:
-                        # 명사만 추출
-                        nouns = extract_nouns(msg['content'])
-                        for noun in nouns:
-                            keywords[noun] = keywords.get(noun, 0) + 1
+        # 키워드 분석 (명사만 추출): 사용자 메시지 본문만 스트리밍으로 받아 토큰화
+        keywords = Counter()
+        cursor = collection.aggregate(
+            _user_messages_pipeline(start_date, end_date), allowDiskUse=True, batchSize=1000
+        )
+        async for doc in cursor:
+            keywords.update(extract_nouns(doc['content']))
         
         # 상위 10개 키워드만 반환
-        top_keywords = dict(sorted(keywords.items(), key=lambda x: x[1], reverse=True)[:10])
+        top_keywords = dict(keywords.most_common(10))
         
         return {
             'basic_stats': {
@@ -224,10 +442,10 @@ async def analyze_conversations(request: AnalysisRequest) -> Dict[str, Any]:
                 'avg_conversation_length': round(avg_conversation_length, 2)
             },
             'patterns': {
-                'user_first': user_first,
-                'assistant_first': assistant_first,
+                'user_first': totals['user_first'],
+                'assistant_first': totals['assistant_first'],
                 'avg_turn_length': round(avg_turn_length, 2),
-                'max_turn_length': max_turn_length
+                'max_turn_length': totals['max_turn_length'] or 0
             },
             'keywords': top_keywords
         }
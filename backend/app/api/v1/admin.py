@@ -0,0 +1,56 @@
+"""
+관리자 API
+운영 점검용 엔드포인트 (인덱스 상태 등)
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Dict, Any
+
+from ...dependencies import get_database
+from ...models.user import Permission
+from ...services.index_registry import INDEX_REGISTRY, ensure_indexes, inspect_indexes
+from .auth import get_current_user
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+def _require_system_monitor(current_user: Dict[str, Any]):
+    """시스템 모니터링 권한 확인"""
+    if Permission.SYSTEM_MONITOR not in current_user["permissions"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Insufficient permissions"
+        )
+
+
+@router.get("/indexes")
+async def get_index_report(
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    db = Depends(get_database)
+):
+    """레지스트리 대비 누락/미사용/미등록 인덱스와 인덱스별 사용량($indexStats)을 조회합니다."""
+    _require_system_monitor(current_user)
+    try:
+        collections = await inspect_indexes(db)
+        return {
+            "registered_count": len(INDEX_REGISTRY),
+            "missing_count": sum(len(entry["missing"]) for entry in collections.values()),
+            "unused_count": sum(len(entry["unused"]) for entry in collections.values()),
+            "collections": collections
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"인덱스 조회 중 오류: {str(e)}")
+
+
+@router.post("/indexes/apply")
+async def apply_indexes(
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    db = Depends(get_database)
+):
+    """레지스트리에 선언된 인덱스를 다시 적용합니다 (시작 시와 같은 멱등 적용)."""
+    _require_system_monitor(current_user)
+    try:
+        results = await ensure_indexes(db)
+        return {"results": results}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"인덱스 적용 중 오류: {str(e)}")
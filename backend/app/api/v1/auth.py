@@ -5,7 +5,7 @@ from typing import Optional, Dict, Any
 from datetime import datetime
 
 from ...services.auth_service import AuthService
-from ...database import get_database
+from ... import dependencies
 from ...models.user import UserRole, Permission
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
@@ -50,9 +50,9 @@ class UserInfoResponse(BaseModel):
     last_login_at: Optional[datetime] = None
 
 # 의존성
-async def get_auth_service():
-    db = await get_database()
-    return AuthService(db)
+async def get_auth_service() -> AuthService:
+    # 세션 캐시를 요청 간에 공유하도록 싱글톤 사용
+    return await dependencies.get_auth_service()
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), 
                     auth_service: AuthService = Depends(get_auth_service)) -> Dict[str, Any]:
@@ -178,7 +178,7 @@ async def get_user_permissions(
 ):
     """사용자 권한 조회"""
     user_id = current_user["user_id"]
-    permissions = auth_service.get_user_permissions(user_id)
+    permissions = await auth_service.get_user_permissions(user_id)
     
     return {
         "permissions": permissions,
@@ -214,7 +214,7 @@ async def logout(
 ):
     """로그아웃"""
     token = credentials.credentials
-    success = auth_service.logout(token)
+    success = await auth_service.logout(token)
     
     if success:
         return {"message": "Successfully logged out"}
@@ -238,7 +238,7 @@ async def get_users(
             detail="Insufficient permissions"
         )
     
-    users = list(auth_service.users_collection.find({}, {"password_hash": 0}))
+    users = await auth_service.list_users()
     return {"users": users}
 
 @router.get("/check-email")
@@ -290,5 +290,5 @@ async def get_admin_roles(
             detail="Insufficient permissions"
         )
     
-    roles = list(auth_service.admin_roles_collection.find())
+    roles = await auth_service.list_admin_roles()
     return {"roles": roles} 
\ No newline at end of file
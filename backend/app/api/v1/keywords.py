@@ -9,6 +9,7 @@ from datetime import datetime
 from pydantic import BaseModel
 from ...database import get_database
 from ...services.db_based_input_classifier import DBBasedInputClassifier
+from ...services.keyword_frequency_table import KeywordFrequencyTable
 
 router = APIRouter()
 
@@ -131,11 +132,10 @@ async def auto_extract_keywords(
 ):
     """knowledge_base에서 자동으로 키워드를 추출하여 technical 카테고리에 추가합니다."""
     try:
-        # knowledge_base의 모든 키워드 수집
-        all_keywords = set()
-        async for item in db.knowledge_base.find({}):
-            if 'keywords' in item and item['keywords']:
-                all_keywords.update(item['keywords'])
+        # knowledge_base 전체를 읽지 않고 증분 유지되는 키워드 빈도 테이블에서 조회
+        frequency_table = KeywordFrequencyTable(db)
+        await frequency_table.ensure_initialized()
+        all_keywords = await frequency_table.all_keywords()
         
         if all_keywords:
             # technical 카테고리 업데이트
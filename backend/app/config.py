@@ -56,15 +56,83 @@ class Settings(BaseSettings):
     
     # Clarification 모듈 활성화 여부 - 모호한 질문에 대한 추가 질문 생성
     ENABLE_CLARIFICATION: bool = True
+    CLARIFICATION_SESSION_TTL_SECONDS: int = 1800         # 마지막 갱신 후 세션 유지 시간 (conversation_contexts TTL 인덱스)
+    CLARIFICATION_SESSION_CACHE_MAX_ENTRIES: int = 5000   # 진행 중 세션 인메모리 캐시 최대 항목 수
     
     # DB 우선 모드 (True: DB 검색 우선, False: LLM 우선)
     DB_PRIORITY_MODE: bool = False
     
+    # 지식 베이스 키워드 검색 랭킹 엔진 ("keyword": 가중치 키워드 점수, "bm25": BM25F)
+    KNOWLEDGE_RANKING_ENGINE: str = "keyword"
+    BM25_MIN_SCORE: float = 0.5      # BM25 답변 채택 최소 점수
+    BM25_TOP_K: int = 5              # BM25 상위 후보 수
+    
+    # 시작 시 인덱스 레지스트리(services/index_registry.py) 적용
+    ENABLE_INDEX_BOOTSTRAP: bool = True
+    
+    # 인메모리 색인 동기화 (change stream, 미지원 시 폴링)
+    ENABLE_INDEX_SYNC: bool = True
+    INDEX_SYNC_POLL_INTERVAL: float = 10.0  # 폴링 모드 변경 확인 주기(초)
+    INDEX_SYNC_POLL_OVERLAP: float = 5.0    # 폴링 시 마지막 확인 시각 이전으로 다시 조회하는 구간(초)
+    INDEX_SYNC_ID_SCAN_EVERY: int = 6       # 몇 번의 폴링마다 _id 전체 비교(삭제 감지)를 할지
+    
+    # context_patterns 후보 생성 ($text 대신 인메모리 토큰/문자 n-gram 역색인 사용)
+    ENABLE_PATTERN_MEMORY_INDEX: bool = True
+    PATTERN_INDEX_NGRAM_EXPANSION: bool = False  # 토큰 후보가 부족하면 문자 n-gram 겹침으로 보충
+    
+    # context_patterns 벡터라이저 ("word": 단어 1-3그램 TF-IDF, "char_hash": char_wb n-gram 해시 + IDF)
+    # 매칭 임계값(0.3)과 hybrid 가중치(×1.2)는 word 기준으로 맞춰져 있으므로 char_hash는
+    # scripts/test_optimized_pattern_matching.py의 모드별 정확도 비교로 임계값을 확인한 뒤 선택
+    PATTERN_VECTORIZER_MODE: str = "word"
+    PATTERN_HASH_FEATURES: int = 2 ** 18    # 해시 특징 공간 크기 (IDF 배열 메모리 상한)
+    PATTERN_CHAR_NGRAM_MIN: int = 2
+    PATTERN_CHAR_NGRAM_MAX: int = 4
+    
+    # 상주 색인 디스크 스냅샷 (변경 토큰이 같으면 부팅 시 재벡터화 없이 메모리 매핑 로드)
+    ENABLE_INDEX_SNAPSHOT: bool = True
+    INDEX_SNAPSHOT_DIR: str = "data/index_snapshots"
+    
+    # context_patterns 사용 횟수 쓰기 지연 (메모리 누적 후 bulk_write)
+    PATTERN_USAGE_FLUSH_INTERVAL: float = 5.0   # 주기적 반영 간격(초)
+    PATTERN_USAGE_FLUSH_MAX_PENDING: int = 200  # 대기 문서 수가 이만큼이면 즉시 반영
+    
+    # 대화 자동화(대화 저장/knowledge_base/키워드 갱신) 백그라운드 파이프라인
+    ENABLE_AUTOMATION_PIPELINE: bool = True
+    AUTOMATION_QUEUE_MAX_SIZE: int = 1000       # 최대 대기 작업 수
+    AUTOMATION_BATCH_SIZE: int = 20             # 배치당 최대 작업 수
+    AUTOMATION_BATCH_WINDOW_MS: float = 200.0   # 작업 수집 시간 창(ms)
+    AUTOMATION_MAX_RETRIES: int = 3             # 배치 실패 시 재시도 횟수
+    AUTOMATION_RETRY_BACKOFF: float = 0.5       # 첫 재시도 대기(초, 재시도마다 2배)
+    AUTOMATION_DROP_POLICY: str = "drop_oldest"  # 큐가 가득 찼을 때 "drop_oldest" / "drop_newest"
+    
     # LLM 모델 타입 설정
     USE_LLAMA_CPP: bool = False      # llama-cpp-python 사용 여부
     USE_FINETUNED: bool = False      # 파인튜닝된 모델 사용 여부
     USE_TRANSFORMERS: bool = True    # transformers 라이브러리 사용 여부
     
+    # 추론 실행기 설정 (model.generate를 이벤트 루프 밖 스레드에서 실행)
+    INFERENCE_MAX_WORKERS: int = 1          # 동시 추론 수
+    INFERENCE_MAX_QUEUE_SIZE: int = 16      # 최대 대기 요청 수 (초과 시 즉시 거절)
+    INFERENCE_TIMEOUT: float = 180.0        # 요청별 추론 타임아웃(초)
+    
+    # 생성 요청 마이크로 배칭 (동시 요청을 한 번의 배치 디코딩으로 처리)
+    ENABLE_GENERATION_BATCHING: bool = True
+    GENERATION_BATCH_MAX_SIZE: int = 4      # 배치당 최대 요청 수
+    GENERATION_BATCH_WINDOW_MS: float = 20.0  # 요청 수집 시간 창(ms)
+    
+    # 고정 프롬프트 접두부(시스템 프롬프트/지시문) KV 캐시
+    ENABLE_PREFIX_CACHE: bool = True
+    PREFIX_CACHE_MAX_ENTRIES: int = 8       # 유지할 (스타일, 템플릿) 접두부 수
+    
+    # DB 답변 강화 응답 캐시 ((지식 문서 _id, 정규화 질문) 키)
+    ENABLE_RESPONSE_CACHE: bool = True
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1000
+    RESPONSE_CACHE_MAX_BYTES: int = 16 * 1024 * 1024  # 캐시 답변 누적 크기 상한 (16MB)
+    RESPONSE_CACHE_TTL: float = 3600.0      # 항목 유효 시간(초)
+    
+    # 배치로 미리 생성해 knowledge_base에 저장한 강화 답변(enhanced_answer) 사용
+    ENABLE_PRECOMPUTED_ENHANCEMENT: bool = True
+    
     # 로깅 설정
     log_level: str = "INFO"          # 로그 레벨 설정
     
@@ -22,6 +22,10 @@ class Settings(BaseModel):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # 검증된 세션 캐시 (JWT jti 기준, 토큰 만료보다 오래 유지하지 않음)
+    AUTH_SESSION_CACHE_MAX_ENTRIES: int = 10000
+    AUTH_SESSION_CACHE_TTL: int = 300  # 최대 유효 시간(초): 다른 워커의 로그아웃/권한 변경이 반영되기까지의 상한
+    
     class Config:
         env_file = ".env"
 
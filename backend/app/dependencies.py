@@ -15,6 +15,8 @@ from .services.model_manager import get_model_manager, ModelType
 from .services.clarification_service import ClarificationService
 from .services.conversation_context_service import ConversationContextService
 from .services.ambiguity_detector import AmbiguityDetector
+from .services.index_sync_service import IndexSyncService
+from .services.keyword_automaton import get_keyword_matcher
 import logging
 from typing import Optional
 import os
@@ -29,6 +31,8 @@ _input_filter: Optional[InputFilter] = None                  # 입력 필터 인
 _clarification_service: Optional[ClarificationService] = None  # Clarification 서비스 인스턴스
 _context_service: Optional[ConversationContextService] = None  # 대화 맥락 서비스 인스턴스
 _ambiguity_detector: Optional[AmbiguityDetector] = None       # 모호함 감지기 인스턴스
+_index_sync_service: Optional[IndexSyncService] = None       # 인덱스 동기화 서비스 인스턴스
+_auth_service: Optional["AuthService"] = None                # 인증 서비스 인스턴스
 
 def _should_use_llama_cpp() -> bool:
     """
@@ -58,9 +62,8 @@ async def get_llm_service() -> LLMService:
             logging.info("DB 연동 모드로 LLM 서비스를 초기화합니다.")
             _llm_service = LLMService(use_db_mode=True, use_llama_cpp=False, use_finetuned=False)
             
-            # DB 서비스 주입
-            db = await get_database()
-            search_service = MongoDBSearchService(db)
+            # DB 서비스 주입 (역색인을 공유하도록 싱글톤 검색 서비스 사용)
+            search_service = await get_search_service()
             _llm_service.inject_db_service(search_service)
         else:
             logging.info("순수 LLM 모드로 LLM 서비스를 초기화합니다.")
@@ -118,7 +121,8 @@ async def get_clarification_service() -> ClarificationService:
     if _clarification_service is None:
         db = await get_database()
         llm_service = await get_llm_service()
-        _clarification_service = ClarificationService(db, llm_service)
+        context_service = await get_conversation_context_service()
+        _clarification_service = ClarificationService(db, llm_service, context_service)
         logging.info("Clarification 서비스 인스턴스 생성 완료")
     return _clarification_service
 
@@ -139,9 +143,104 @@ def get_ambiguity_detector() -> AmbiguityDetector:
         logging.info("모호함 감지기 인스턴스 생성 완료")
     return _ambiguity_detector
 
+async def get_index_sync_service() -> IndexSyncService:
+    """
+    인덱스 동기화 서비스 인스턴스를 반환합니다.
+    knowledge_base 역색인/근사 중복 색인, context_patterns 벡터, input_keywords 키워드 오토마톤을
+    컬렉션 변경에 맞춰 갱신하도록 핸들러를 등록합니다.
+    """
+    global _index_sync_service
+    if _index_sync_service is None:
+        from .config import settings
+        db = await get_database()
+        _index_sync_service = IndexSyncService(
+            db,
+            poll_interval=settings.INDEX_SYNC_POLL_INTERVAL,
+            poll_overlap=settings.INDEX_SYNC_POLL_OVERLAP,
+            id_scan_every=settings.INDEX_SYNC_ID_SCAN_EVERY
+        )
+        
+        search_service = await get_search_service()
+        _index_sync_service.register(
+            "knowledge_base",
+            search_service.apply_knowledge_upsert,
+            search_service.apply_knowledge_delete
+        )
+        
+        # 지식 문서가 수정/삭제되면 해당 문서의 강화 답변 캐시 무효화
+        llm_service = await get_llm_service()
+        if llm_service.response_cache is not None:
+            _index_sync_service.register(
+                "knowledge_base",
+                llm_service.response_cache.invalidate_document,
+                llm_service.response_cache.invalidate
+            )
+        
+        chat_service = await get_chat_service()
+        
+        # 자동 knowledge_base 갱신의 근사 중복 색인 (MinHash/LSH)
+        _index_sync_service.register(
+            "knowledge_base",
+            chat_service.automation_service.apply_knowledge_upsert,
+            chat_service.automation_service.apply_knowledge_delete
+        )
+        
+        # knowledge_base 키워드 문서 빈도 테이블 증분 갱신
+        keyword_frequencies = chat_service.automation_service.keyword_frequencies
+        try:
+            await keyword_frequencies.ensure_initialized()
+        except Exception as e:
+            logging.error(f"키워드 빈도 테이블 구성 실패: {str(e)}")
+        _index_sync_service.register(
+            "knowledge_base",
+            keyword_frequencies.apply_knowledge_upsert,
+            keyword_frequencies.apply_knowledge_delete
+        )
+        
+        pattern_matcher = getattr(chat_service.input_filter, 'optimized_matcher', None)
+        if pattern_matcher is not None:
+            _index_sync_service.register(
+                "context_patterns",
+                pattern_matcher.upsert_pattern,
+                pattern_matcher.remove_pattern
+            )
+        
+        # input_keywords가 바뀌면 공유 키워드 오토마톤을 다시 만들어 교체
+        keyword_matcher = get_keyword_matcher()
+        try:
+            await keyword_matcher.load_db_keywords(db)
+        except Exception as e:
+            logging.error(f"input_keywords 로드 실패: {str(e)}")
+        _index_sync_service.register(
+            "input_keywords",
+            keyword_matcher.apply_db_upsert,
+            keyword_matcher.apply_db_delete
+        )
+        
+        logging.info("인덱스 동기화 서비스 인스턴스 생성 완료")
+    return _index_sync_service
+
+async def get_auth_service() -> "AuthService":
+    """
+    인증 서비스 인스턴스를 반환합니다.
+    검증된 세션 캐시를 요청 간에 공유하도록 싱글톤으로 관리하고, 기본 데이터는 생성 시 한 번만 확인합니다.
+    """
+    global _auth_service
+    if _auth_service is None:
+        from .services.auth_service import AuthService
+        db = await get_database()
+        auth_service = AuthService(db)
+        try:
+            await auth_service.ensure_default_data()
+        except Exception as e:
+            logging.error(f"인증 기본 데이터 초기화 실패: {str(e)}")
+        _auth_service = auth_service
+        logging.info("인증 서비스 인스턴스 생성 완료")
+    return _auth_service
+
 def reset_services():
     """모든 서비스 인스턴스를 초기화합니다."""
-    global _llm_service, _chat_service, _search_service, _conversation_algorithm, _formatting_service, _input_filter, _clarification_service, _context_service, _ambiguity_detector
+    global _llm_service, _chat_service, _search_service, _conversation_algorithm, _formatting_service, _input_filter, _clarification_service, _context_service, _ambiguity_detector, _index_sync_service, _auth_service
     _llm_service = None
     _chat_service = None
     _search_service = None
@@ -151,6 +250,8 @@ def reset_services():
     _clarification_service = None
     _context_service = None
     _ambiguity_detector = None
+    _index_sync_service = None
+    _auth_service = None
     logging.info("모든 서비스 인스턴스 초기화 완료")
 
 def get_model_manager():
@@ -35,11 +35,22 @@ async def lifespan(app: FastAPI):
         await connect_to_mongo()
         logger.info("데이터베이스 연결 완료")
         
+        # 선언된 컬렉션 인덱스 적용 (멱등, 실패해도 시작은 계속)
+        from .config import settings
+        if settings.ENABLE_INDEX_BOOTSTRAP:
+            from .services.index_registry import ensure_indexes
+            await ensure_indexes(await get_database())
+        
         # LLM 서비스 초기화 (llama-cpp-python 사용)
         from .dependencies import get_llm_service
         llm_service = await get_llm_service()
         logger.info("LLM 서비스 초기화 완료")
         
+        # 지식 베이스 역색인 구성
+        from .dependencies import get_search_service
+        search_service = await get_search_service()
+        await search_service.initialize_index()
+        
         # 채팅 서비스 초기화
         from .dependencies import get_chat_service
         chat_service = await get_chat_service()
@@ -49,6 +60,12 @@ async def lifespan(app: FastAPI):
         
         logger.info("채팅 서비스 초기화 완료")
         
+        # 인메모리 색인 동기화 시작 (change stream / 폴링)
+        if settings.ENABLE_INDEX_SYNC:
+            from .dependencies import get_index_sync_service
+            index_sync_service = await get_index_sync_service()
+            await index_sync_service.start()
+        
         # 서비스 초기화 완료
         logger.info("모든 서비스 초기화 완료")
         
@@ -60,6 +77,27 @@ async def lifespan(app: FastAPI):
     # 종료 시 정리
     logger.info("애플리케이션 종료 중...")
     try:
+        # 인덱스 동기화 중지
+        from . import dependencies
+        if dependencies._index_sync_service is not None:
+            await dependencies._index_sync_service.stop()
+        
+        # 쓰기 지연 중인 패턴 사용 횟수 마지막 반영
+        if dependencies._chat_service is not None:
+            usage_buffer = getattr(dependencies._chat_service.input_filter, 'usage_buffer', None)
+            if usage_buffer is not None:
+                await usage_buffer.stop()
+            
+            # 대기 중인 대화 자동화 작업 처리 후 파이프라인 종료
+            if dependencies._chat_service.automation_pipeline is not None:
+                await dependencies._chat_service.automation_pipeline.stop(drain=True)
+        
+        # 생성 배치 스케줄러 및 추론 실행기 종료
+        if dependencies._llm_service is not None:
+            if dependencies._llm_service.generation_batcher is not None:
+                await dependencies._llm_service.generation_batcher.stop()
+            dependencies._llm_service.inference_executor.shutdown()
+        
         # 서비스 정리
         from .dependencies import reset_services
         reset_services()
@@ -97,6 +135,9 @@ app.include_router(keywords.router, prefix="/api/v1")
 # 문맥 관리 API 추가
 from .api.v1 import context
 app.include_router(context.router, prefix="/api/v1")
+# 관리자 API 추가
+from .api.v1 import admin
+app.include_router(admin.router, prefix="/api/v1")
 
 @app.get("/")
 async def root():
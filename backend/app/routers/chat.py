@@ -1,11 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from ..dependencies import get_db, get_chat_service_dependency, get_llm_service_dependency
 from ..services.chat_service import ChatService
 from ..services.llm_service import LLMService
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
+import json
 import logging
+import time
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
@@ -67,6 +70,46 @@ async def send_message(
         logging.error(f"채팅 메시지 처리 오류: {str(e)}")
         raise HTTPException(status_code=500, detail=f"메시지 처리 중 오류가 발생했습니다: {str(e)}")
 
+@router.post("/send/stream")
+async def send_message_stream(
+    request: ChatRequest,
+    chat_service: ChatService = Depends(get_chat_service_dependency)
+):
+    """
+    채팅 메시지를 처리하고 응답을 SSE(text/event-stream)로 스트리밍합니다.
+    
+    이벤트:
+        delta: {"lines": 새로 완성된 포맷팅 줄 목록, "pending": 아직 끝나지 않은 줄}
+        done: {"response": 최종 응답, "conversation_id": 대화 ID, "processing_time": 처리 시간(ms)}
+        error: {"message": 오류 메시지}
+    """
+    start_time = time.time()
+    
+    async def event_stream():
+        try:
+            async for event in chat_service.process_message_stream(
+                request.message,
+                request.conversation_id
+            ):
+                event_type = event.pop("type")
+                if event_type == "done":
+                    event["conversation_id"] = request.conversation_id
+                    event["processing_time"] = (time.time() - start_time) * 1000
+                yield f"event: {event_type}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+        except Exception as e:
+            logging.error(f"채팅 스트리밍 오류: {str(e)}")
+            payload = json.dumps({"message": "메시지 처리 중 오류가 발생했습니다."}, ensure_ascii=False)
+            yield f"event: error\ndata: {payload}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
 @router.post("/switch-model")
 async def switch_model(
     request: ModelSwitchRequest,
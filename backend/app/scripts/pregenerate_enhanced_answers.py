@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+knowledge_base 강화 답변 사전 생성 스크립트
+1. 모든 knowledge_base 답변에 실시간 강화와 같은 프롬프트(_enhance_db_answer_with_llm)를 적용
+2. 생성 배치 스케줄러로 여러 문서를 한 번에 디코딩
+3. 결과를 문서의 enhanced_answer / enhanced_source_hash / enhanced_at 필드에 저장
+4. 체크포인트 파일로 중단 지점부터 재개
+
+서빙 시 search_and_enhance_answer는 enhanced_source_hash가 현재 답변과 일치하는 경우에만
+저장된 답변을 쓰고, 배치 이후 새로 추가/수정된 문서는 실시간 생성으로 처리한다.
+
+사용법:
+    python app/scripts/pregenerate_enhanced_answers.py [--batch-size 4] [--limit N] [--force] [--restart]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+# 프로젝트 루트 경로 추가
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, backend_dir)
+
+from bson import ObjectId
+
+from app.database import get_database, close_mongo_connection
+from app.services.generation_batcher import GenerationBatcher
+from app.services.llm_service import LLMService
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT = os.path.join(current_dir, "pregenerate_enhanced_answers.checkpoint.json")
+
+
+class EnhancedAnswerPregenerator:
+    """knowledge_base 강화 답변 배치 생성기"""
+
+    def __init__(self, db, llm_service: LLMService, checkpoint_path: str, batch_size: int = 4):
+        self.db = db
+        self.knowledge_collection = db.knowledge_base
+        self.llm_service = llm_service
+        self.checkpoint_path = checkpoint_path
+        self.batch_size = batch_size
+
+        self._ensure_batcher()
+
+        self.checkpoint = {
+            'started_at': datetime.now().isoformat(),
+            'last_id': None,
+            'processed': 0,
+            'updated': 0,
+            'skipped': 0,
+            'failed_ids': [],
+            'completed': False
+        }
+
+    def _ensure_batcher(self):
+        """동시에 제출한 생성 요청이 한 배치로 묶이도록 배치 스케줄러를 준비합니다."""
+        batcher = self.llm_service.generation_batcher
+        if batcher is None:
+            batcher = GenerationBatcher(
+                self.llm_service.model,
+                self.llm_service.tokenizer,
+                self.llm_service.inference_executor,
+                max_batch_size=self.batch_size,
+                batch_window_ms=50.0,
+                prefix_cache=self.llm_service.prefix_cache
+            )
+            self.llm_service.generation_batcher = batcher
+        batcher.max_batch_size = self.batch_size
+        # 배치 전체를 한 번에 대기열에 넣으므로 실행기 대기열 제한도 배치 크기 이상으로
+        executor = self.llm_service.inference_executor
+        executor.max_queue_size = max(executor.max_queue_size, self.batch_size)
+
+    # ===== 체크포인트 =====
+
+    def load_checkpoint(self) -> bool:
+        """미완료 체크포인트가 있으면 불러옵니다."""
+        if not os.path.exists(self.checkpoint_path):
+            return False
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+            if checkpoint.get('completed'):
+                logger.info("이전 실행이 완료되어 처음부터 다시 확인합니다.")
+                return False
+            self.checkpoint.update(checkpoint)
+            logger.info(f"체크포인트에서 재개: last_id={checkpoint.get('last_id')}, "
+                        f"처리 {checkpoint.get('processed', 0)}건")
+            return True
+        except Exception as e:
+            logger.warning(f"체크포인트 읽기 실패, 처음부터 시작합니다: {e}")
+            return False
+
+    def save_checkpoint(self):
+        """체크포인트를 임시 파일에 쓴 뒤 교체합니다 (중간 종료 시에도 파일이 깨지지 않도록)."""
+        self.checkpoint['saved_at'] = datetime.now().isoformat()
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.checkpoint, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    # ===== 배치 처리 =====
+
+    def needs_generation(self, doc: Dict, force: bool) -> bool:
+        """저장된 강화 답변이 없거나 원본 답변이 바뀐 문서인지 확인합니다."""
+        if not doc.get('answer'):
+            return False
+        if force:
+            return True
+        return (not doc.get('enhanced_answer')
+                or doc.get('enhanced_source_hash') != self.llm_service.enhancement_source_hash(doc['answer']))
+
+    async def enhance_document(self, doc: Dict) -> Optional[str]:
+        """문서 하나를 실시간 경로와 같은 프롬프트로 강화합니다. 실패 시 None."""
+        db_answer = doc['answer']
+        question = doc.get('question') or ''
+        enhanced = await self.llm_service._enhance_db_answer_with_llm(question, db_answer)
+        # 강화 실패 시 _enhance_db_answer_with_llm은 정리된 DB 답변을 그대로 돌려줌
+        if not enhanced or enhanced == self.llm_service._format_db_answer(db_answer):
+            return None
+        return enhanced
+
+    async def store_result(self, doc: Dict, enhanced: str) -> bool:
+        """
+        강화 답변을 저장합니다.
+        생성 도중 답변이 수정된 문서는 answer 조건이 맞지 않아 저장되지 않습니다.
+        updated_at도 갱신해 폴링 모드의 색인 동기화가 강화 필드를 상주 색인에 반영하도록 합니다.
+        """
+        now = datetime.now()
+        result = await self.knowledge_collection.update_one(
+            {"_id": doc['_id'], "answer": doc['answer']},
+            {"$set": {
+                "enhanced_answer": enhanced,
+                "enhanced_source_hash": self.llm_service.enhancement_source_hash(doc['answer']),
+                "enhanced_at": now,
+                "updated_at": now
+            }}
+        )
+        return result.matched_count > 0
+
+    async def process_batch(self, docs: List[Dict]):
+        """배치를 동시에 제출해 배치 스케줄러가 한 번에 디코딩하도록 합니다."""
+        results = await asyncio.gather(*(self.enhance_document(doc) for doc in docs), return_exceptions=True)
+
+        for doc, enhanced in zip(docs, results):
+            if isinstance(enhanced, Exception) or enhanced is None:
+                logger.warning(f"❌ 강화 실패: {doc['_id']} {str(enhanced) if enhanced else ''}")
+                self.checkpoint['failed_ids'].append(str(doc['_id']))
+                continue
+            if await self.store_result(doc, enhanced):
+                self.checkpoint['updated'] += 1
+            else:
+                self.checkpoint['skipped'] += 1
+
+    async def run(self, limit: Optional[int] = None, force: bool = False, retry_failed: bool = False):
+        """
+        대상 문서를 _id 순서로 훑으며 배치 단위로 강화하고 체크포인트를 남깁니다.
+        retry_failed면 이전에 실패한 문서(모두 last_id 이전)를 먼저 다시 처리한 뒤 last_id부터 이어서 진행합니다.
+        """
+        query: Dict = {"answer": {"$exists": True, "$ne": ""}}
+        projection = {"question": 1, "answer": 1, "enhanced_answer": 1, "enhanced_source_hash": 1}
+        start_time = time.time()
+        generated = 0
+
+        if retry_failed and self.checkpoint['failed_ids']:
+            retry_ids = [ObjectId(doc_id) for doc_id in self.checkpoint['failed_ids']]
+            self.checkpoint['failed_ids'] = []
+            logger.info(f"이전 실패 문서 {len(retry_ids)}건 다시 시도")
+            cursor = self.knowledge_collection.find({**query, "_id": {"$in": retry_ids}}, projection).sort("_id", 1)
+            consumed: Set[str] = set()
+            generated = await self._process_cursor(cursor, limit, force, start_time, generated,
+                                                   advance=False, consumed=consumed)
+            if limit is not None and generated >= limit:
+                # limit에 걸려 이번에 다루지 못한 실패 문서는 다음 실행에서 다시 시도
+                self.checkpoint['failed_ids'].extend(
+                    str(doc_id) for doc_id in retry_ids if str(doc_id) not in consumed
+                )
+
+        if self.checkpoint['last_id']:
+            query["_id"] = {"$gt": ObjectId(self.checkpoint['last_id'])}
+        cursor = self.knowledge_collection.find(query, projection).sort("_id", 1)
+        generated = await self._process_cursor(cursor, limit, force, start_time, generated, advance=True)
+
+        self.checkpoint['completed'] = limit is None or generated < limit
+        self.save_checkpoint()
+
+        logger.info("=" * 50)
+        logger.info(f"🎉 강화 답변 생성 {'완료' if self.checkpoint['completed'] else '중단 (limit)'}")
+        logger.info(f"처리: {self.checkpoint['processed']}건, 저장: {self.checkpoint['updated']}건, "
+                    f"건너뜀(도중 수정): {self.checkpoint['skipped']}건, 실패: {len(self.checkpoint['failed_ids'])}건")
+        logger.info("=" * 50)
+
+    async def _process_cursor(self, cursor, limit: Optional[int], force: bool, start_time: float,
+                              generated: int, advance: bool, consumed: Optional[Set[str]] = None) -> int:
+        """
+        커서의 문서를 배치로 묶어 처리하고 누적 생성 수를 반환합니다.
+
+        Args:
+            advance: True면 처리한 위치까지 last_id를 전진 (실패 재시도 패스는 last_id 이전 문서라 False)
+            consumed: 지정하면 확인한 문서 _id(문자열)를 기록
+        """
+        batch: List[Dict] = []
+        async for doc in cursor:
+            if limit is not None and generated >= limit:
+                break
+            if consumed is not None:
+                consumed.add(str(doc['_id']))
+            if not self.needs_generation(doc, force):
+                if advance:
+                    self.checkpoint['last_id'] = str(doc['_id'])
+                continue
+
+            batch.append(doc)
+            generated += 1
+            if len(batch) >= self.batch_size:
+                await self._flush(batch, start_time, advance)
+                batch = []
+
+        if batch:
+            await self._flush(batch, start_time, advance)
+        return generated
+
+    async def _flush(self, batch: List[Dict], start_time: float, advance: bool = True):
+        """배치 하나를 처리하고 체크포인트를 갱신합니다."""
+        await self.process_batch(batch)
+        self.checkpoint['processed'] += len(batch)
+        if advance:
+            self.checkpoint['last_id'] = str(batch[-1]['_id'])
+        self.save_checkpoint()
+
+        elapsed = time.time() - start_time
+        logger.info(f"✅ {self.checkpoint['processed']}건 처리 "
+                    f"({elapsed:.1f}s, 문서당 {elapsed / max(self.checkpoint['processed'], 1):.2f}s)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="knowledge_base 강화 답변 사전 생성")
+    parser.add_argument("--batch-size", type=int, default=4, help="한 번에 디코딩할 문서 수")
+    parser.add_argument("--limit", type=int, default=None, help="이번 실행에서 생성할 최대 문서 수")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="체크포인트 파일 경로")
+    parser.add_argument("--force", action="store_true", help="이미 최신인 문서도 다시 생성")
+    parser.add_argument("--restart", action="store_true", help="체크포인트를 무시하고 처음부터 시작")
+    parser.add_argument("--retry-failed", action="store_true", help="이전에 실패한 문서도 다시 시도")
+    return parser.parse_args()
+
+
+async def main():
+    """메인 함수"""
+    args = parse_args()
+    try:
+        # 데이터베이스 연결
+        db = await get_database()
+        logger.info("데이터베이스 연결 완료")
+
+        # 순수 LLM 모드로 모델 로드 (검색 서비스 불필요)
+        llm_service = LLMService(use_db_mode=False, use_llama_cpp=False, use_finetuned=False)
+
+        pregenerator = EnhancedAnswerPregenerator(db, llm_service, args.checkpoint, args.batch_size)
+        if not args.restart:
+            pregenerator.load_checkpoint()
+
+        await pregenerator.run(limit=args.limit, force=args.force, retry_failed=args.retry_failed)
+
+        if llm_service.generation_batcher is not None:
+            await llm_service.generation_batcher.stop()
+        llm_service.inference_executor.shutdown()
+
+    except Exception as e:
+        logger.error(f"메인 함수 실행 중 오류: {e}")
+    finally:
+        await close_mongo_connection()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -2,14 +2,24 @@
 knowledge_base 중복 데이터 제거 스크립트
 """
 
+import argparse
 import asyncio
 import motor.motor_asyncio
 from datetime import datetime
 import logging
+import os
+import sys
 from typing import List, Dict, Set
 import hashlib
 import re
 
+# 프로젝트 루트 경로 추가
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, backend_dir)
+
+from app.services.near_duplicate_index import NearDuplicateIndex, load_question_index
+
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -74,11 +84,52 @@ class DuplicateRemover:
         
         return duplicates
     
-    async def remove_duplicates(self, keep_strategy: str = "latest") -> Dict:
-        """중복 데이터 제거"""
+    async def find_near_duplicates(self, threshold: float = 0.8) -> Dict[str, List]:
+        """
+        근사 중복 데이터 찾기 (MinHash/LSH 색인)
+        자동 업데이트와 같은 기준(SequenceMatcher 비율 >= threshold)으로 묶되,
+        같은 LSH 버킷에 들어간 문서끼리만 비교해 전체 쌍 비교를 피한다.
+        """
+        logger.info("근사 중복 데이터 검색 중...")
+        
+        index = NearDuplicateIndex()
+        # 저장된 서명을 쓰되, 정리 도구는 문서를 고치지 않음
+        await load_question_index(self.knowledge_collection, index, backfill=False)
+        groups = index.duplicate_groups(threshold)
+        
+        group_ids = [doc_id for group in groups for doc_id in group]
+        docs_by_id = {}
+        async for doc in self.knowledge_collection.find({"_id": {"$in": group_ids}}):
+            docs_by_id[doc["_id"]] = doc
+        
+        duplicates = {}
+        for group in groups:
+            docs = [docs_by_id[doc_id] for doc_id in group if doc_id in docs_by_id]
+            if len(docs) > 1:
+                duplicates[self._normalize_text(docs[0].get("question", ""))] = docs
+        
+        logger.info(f"근사 중복 그룹 수: {len(duplicates)}")
+        for question, docs in duplicates.items():
+            logger.info(f"  - '{question[:50]}...': {len(docs)}개")
+        
+        return duplicates
+    
+    async def remove_duplicates(self, keep_strategy: str = "latest", near: bool = False,
+                                threshold: float = 0.8) -> Dict:
+        """
+        중복 데이터 제거
+        
+        Args:
+            keep_strategy: 그룹에서 남길 문서 ("latest", "longest_answer", 그 외 첫 문서)
+            near: True면 정규화 질문 일치 대신 근사 중복(MinHash/LSH) 기준으로 묶음
+            threshold: 근사 중복 판정 비율
+        """
         logger.info("중복 데이터 제거 시작...")
         
-        duplicates = await self.find_duplicates()
+        if near:
+            duplicates = await self.find_near_duplicates(threshold)
+        else:
+            duplicates = await self.find_duplicates()
         
         total_removed = 0
         total_kept = 0
@@ -145,7 +196,7 @@ class DuplicateRemover:
             "source_statistics": source_stats
         }
 
-async def main():
+async def main(args):
     """메인 함수"""
     # MongoDB 연결
     client = motor.motor_asyncio.AsyncIOMotorClient("mongodb://localhost:27017")
@@ -162,7 +213,9 @@ async def main():
             print(f"   - {source_stat['source']}: {source_stat['count']}개")
         
         # 중복 제거
-        result = await remover.remove_duplicates(keep_strategy="longest_answer")
+        result = await remover.remove_duplicates(
+            keep_strategy="longest_answer", near=args.near, threshold=args.threshold
+        )
         
         print(f"\n✅ 중복 제거 완료!")
         print(f"   - 중복 그룹 수: {result['total_duplicate_groups']}")
@@ -182,4 +235,7 @@ async def main():
         client.close()
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="knowledge_base 중복 데이터 제거")
+    parser.add_argument("--near", action="store_true", help="근사 중복(MinHash/LSH + 유사도 비율) 기준으로 제거")
+    parser.add_argument("--threshold", type=float, default=0.8, help="근사 중복 판정 유사도 비율")
+    asyncio.run(main(parser.parse_args())) 
\ No newline at end of file
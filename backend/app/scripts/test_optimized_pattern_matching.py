@@ -13,6 +13,9 @@ import os
 from datetime import datetime
 import time
 
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+
 # 프로젝트 루트 경로 추가
 current_dir = os.path.dirname(os.path.abspath(__file__))
 backend_dir = os.path.dirname(os.path.dirname(current_dir))
@@ -20,6 +23,8 @@ sys.path.insert(0, backend_dir)
 
 from app.database import get_database
 from app.services.optimized_pattern_matcher import OptimizedPatternMatcher
+from app.services.pattern_vectorizer import create_pattern_vectorizer
+from app.config import settings
 from app.services.context_aware_classifier import ContextAwareClassifier, InputType
 
 # 로깅 설정
@@ -221,6 +226,129 @@ class OptimizedPatternMatchingTester:
             "performance_stats": performance_stats
         }
     
+    async def scoring_micro_benchmark(self, test_questions: List[str], candidate_count: int = 10, iterations: int = 200):
+        """
+        후보 채점 마이크로 벤치마크
+        같은 후보 집합(Text Search 상위 10개에 해당)을 두 방식으로 채점해 지연 시간을 비교한다.
+        - 이전 방식: 후보마다 입력/패턴을 각각 transform 후 cosine_similarity (후보 10개당 변환 20회)
+        - 현재 방식: 입력 1회 transform + 미리 계산된 pattern_vectors 행과 희소 행렬-벡터 곱 1회
+        DB 왕복 없이 채점 구간만 측정한다.
+        """
+        logger.info(f"=== 후보 채점 마이크로 벤치마크 시작 (후보 {candidate_count}개, 반복 {iterations}회) ===")
+        
+        matcher = self.optimized_matcher
+        if matcher.pattern_vectors is None:
+            logger.warning("패턴 벡터가 없어 벤치마크를 건너뜁니다")
+            return None
+        
+        def legacy_scores(question: str, candidates: List[Dict]) -> List[float]:
+            scores = []
+            for doc in candidates:
+                user_vector = matcher.vectorizer.transform([question])
+                pattern_vector = matcher.vectorizer.transform([doc['pattern']])
+                scores.append(float(cosine_similarity(user_vector, pattern_vector)[0][0]))
+            return scores
+        
+        def vectorized_scores(question: str, candidates: List[Dict]) -> np.ndarray:
+            return matcher._score_candidates(matcher._vectorize_input(question), candidates)
+        
+        # 질문별 후보 집합 (Text Search 대신 벡터 상위 후보로 고정)
+        workloads = []
+        for question in test_questions:
+            candidates = [doc for doc, _ in await matcher.find_top_matches(question, k=candidate_count)]
+            if candidates:
+                workloads.append((question, candidates))
+        if not workloads:
+            logger.warning("후보가 있는 질문이 없어 벤치마크를 건너뜁니다")
+            return None
+        
+        # 두 방식의 점수가 같은지 먼저 확인
+        max_diff = max(
+            float(np.max(np.abs(np.array(legacy_scores(q, c)) - vectorized_scores(q, c))))
+            for q, c in workloads
+        )
+        
+        timings = {}
+        for name, scorer in (("legacy", legacy_scores), ("vectorized", vectorized_scores)):
+            samples = []
+            for _ in range(iterations):
+                for question, candidates in workloads:
+                    start_time = time.perf_counter()
+                    scorer(question, candidates)
+                    samples.append((time.perf_counter() - start_time) * 1000)
+            samples.sort()
+            timings[name] = {
+                "avg_ms": sum(samples) / len(samples),
+                "p50_ms": samples[len(samples) // 2],
+                "p95_ms": samples[int(len(samples) * 0.95)]
+            }
+        
+        speedup = timings["legacy"]["avg_ms"] / max(timings["vectorized"]["avg_ms"], 1e-9)
+        logger.info(f"이전 방식:  평균 {timings['legacy']['avg_ms']:.3f}ms, "
+                    f"p50 {timings['legacy']['p50_ms']:.3f}ms, p95 {timings['legacy']['p95_ms']:.3f}ms")
+        logger.info(f"현재 방식:  평균 {timings['vectorized']['avg_ms']:.3f}ms, "
+                    f"p50 {timings['vectorized']['p50_ms']:.3f}ms, p95 {timings['vectorized']['p95_ms']:.3f}ms")
+        logger.info(f"속도 향상: {speedup:.1f}배, 최대 점수 차이: {max_diff:.2e}")
+        
+        return {**timings, "speedup": speedup, "max_score_diff": max_diff}
+    
+    async def vectorizer_accuracy_comparison(self, labelled_cases: List[tuple],
+                                             thresholds: tuple = (0.2, 0.25, 0.3, 0.35, 0.4, 0.5)):
+        """
+        벡터라이저 모드별 정확도 비교 (word / char_hash)
+        labelled_cases: (질문, 정답 패턴 접두어 또는 None) 목록. None은 매칭되지 않아야 하는 질문.
+        매칭 결과의 패턴이 정답 접두어로 시작하거나, 정답이 None인데 매칭이 없으면 정답으로 센다.
+        임계값별로 측정해 모드마다 find_best_match 임계값을 다시 맞출 근거로 쓴다.
+        """
+        logger.info(f"=== 벡터라이저 모드별 정확도 비교 (레이블 {len(labelled_cases)}개) ===")
+        
+        report = {}
+        for mode in ("word", "char_hash"):
+            matcher = OptimizedPatternMatcher(self.db)
+            matcher.vectorizer = create_pattern_vectorizer(
+                mode=mode,
+                n_features=settings.PATTERN_HASH_FEATURES,
+                ngram_min=settings.PATTERN_CHAR_NGRAM_MIN,
+                ngram_max=settings.PATTERN_CHAR_NGRAM_MAX
+            )
+            matcher.snapshot_store = None  # 설정 모드의 스냅샷을 읽지 않도록
+            await matcher.initialize()
+            
+            report[mode] = {}
+            for threshold in thresholds:
+                correct = false_positive = false_negative = wrong_pattern = 0
+                for question, expected in labelled_cases:
+                    matcher.cache.clear()
+                    result = await matcher.find_best_match(question, threshold=threshold)
+                    matched = result[0]['pattern'] if result else None
+                    if expected is None:
+                        if matched is None:
+                            correct += 1
+                        else:
+                            false_positive += 1
+                    elif matched is None:
+                        false_negative += 1
+                    elif matched.startswith(expected):
+                        correct += 1
+                    else:
+                        wrong_pattern += 1
+                
+                accuracy = correct / len(labelled_cases) if labelled_cases else 0
+                report[mode][threshold] = {
+                    "accuracy": accuracy,
+                    "false_positive": false_positive,
+                    "false_negative": false_negative,
+                    "wrong_pattern": wrong_pattern
+                }
+                logger.info(f"   {mode:9s} 임계값 {threshold:.2f}: 정확도 {accuracy:.2%} "
+                            f"(오탐 {false_positive}, 미탐 {false_negative}, 다른 패턴 {wrong_pattern})")
+            
+            best_threshold = max(report[mode], key=lambda t: report[mode][t]["accuracy"])
+            logger.info(f"📊 {mode}: 최고 정확도 임계값 {best_threshold:.2f} "
+                        f"({report[mode][best_threshold]['accuracy']:.2%})")
+        
+        return report
+    
     def print_results_summary(self, matcher_results: List[Dict], classifier_results: List[Dict]):
         """결과 요약 출력"""
         logger.info("\n" + "="*60)
@@ -320,7 +448,32 @@ async def main():
         # 3. 성능 벤치마크
         performance_results = await tester.performance_benchmark(test_questions[:10], iterations=5)
         
-        # 4. 결과 요약
+        # 4. 후보 채점 마이크로 벤치마크 (이전/현재 방식 비교)
+        await tester.scoring_micro_benchmark(test_questions)
+        
+        # 5. 벡터라이저 모드별 정확도 비교 (레이블: 정답 패턴 접두어, None은 매칭되면 안 되는 질문)
+        labelled_cases = [
+            ("견적서 단위 변경", "견적서 단위"),
+            ("견적서 단위 바꾸고 싶어", "견적서 단위"),
+            ("견적서 단위 수정하고 싶어", "견적서 단위"),
+            ("이거 견적서 단위 바꾸고 싶은데", "견적서 단위"),
+            ("직인 설정", "직인"),
+            ("직인 등록하고 싶어", "직인"),
+            ("직인 설정하는 방법 알려주세요", "직인"),
+            ("프린터 설정", "프린터"),
+            ("프린터 설치하고 싶어", "프린터"),
+            ("프린터 설정이 안돼요", "프린터"),
+            ("프린터가 안 나와요", "프린터"),
+            ("매출 통계 보는 법", "매출"),
+            ("상품코드를 등록하려면", "상품코드"),
+            ("안녕하세요", None),
+            ("날씨가 좋네요", None),
+            ("한국 역사에 대해 알려주세요", None),
+            ("점심 뭐 먹을까요", None)
+        ]
+        await tester.vectorizer_accuracy_comparison(labelled_cases)
+        
+        # 6. 결과 요약
         tester.print_results_summary(matcher_results, classifier_results)
         
         logger.info("🎉 최적화된 패턴 매칭 테스트가 성공적으로 완료되었습니다!")
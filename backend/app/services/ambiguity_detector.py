@@ -7,6 +7,7 @@
 import re
 import logging
 from typing import Dict, List, Tuple
+from .keyword_automaton import get_keyword_matcher
 
 logger = logging.getLogger(__name__)
 
@@ -41,24 +42,32 @@ class AmbiguityDetector:
             '상품', '엑셀', '쇼핑몰', '매출작업', '통신', '에러', '실패',
             '견적서', '거래명세서', '직인', '도장', '단위', '상품코드'
         ]
+        
+        # 표현/키워드 목록을 공유 키워드 오토마톤에 등록
+        self.keyword_matcher = get_keyword_matcher()
+        self.keyword_matcher.set_source("ambiguity", {
+            'ambiguous': self.ambiguous_expressions,
+            'incomplete': self.incomplete_expressions,
+            'technical': self.technical_keywords
+        })
     
     def is_ambiguous(self, question: str) -> bool:
         """질문이 모호한지 판단"""
         try:
-            question_lower = question.lower()
+            hits = self._match(question)
             
             # 1. 모호한 표현 체크
-            if self._has_ambiguous_expressions(question_lower):
+            if self._has_ambiguous_expressions(hits):
                 logger.info(f"모호한 표현 감지: {question}")
                 return True
             
             # 2. 불완전한 표현 체크
-            if self._has_incomplete_expressions(question_lower):
+            if self._has_incomplete_expressions(hits):
                 logger.info(f"불완전한 표현 감지: {question}")
                 return True
             
             # 3. 키워드 부족 체크
-            if self._has_insufficient_keywords(question_lower):
+            if self._has_insufficient_keywords(hits):
                 logger.info(f"키워드 부족 감지: {question}")
                 return True
             
@@ -73,38 +82,31 @@ class AmbiguityDetector:
             logger.error(f"모호함 감지 중 오류: {e}")
             return False
     
-    def _has_ambiguous_expressions(self, question: str) -> bool:
+    def _match(self, question: str) -> Dict[str, List[str]]:
+        """질문을 한 번 훑어 표현/키워드 카테고리별 매칭 결과를 구합니다."""
+        return self.keyword_matcher.find(question.lower(), "ambiguity")
+    
+    def _has_ambiguous_expressions(self, hits: Dict[str, List[str]]) -> bool:
         """모호한 표현이 있는지 체크"""
-        for expression in self.ambiguous_expressions:
-            if expression in question:
-                return True
-        return False
+        return bool(hits.get('ambiguous'))
     
-    def _has_incomplete_expressions(self, question: str) -> bool:
+    def _has_incomplete_expressions(self, hits: Dict[str, List[str]]) -> bool:
         """불완전한 표현이 있는지 체크"""
-        for expression in self.incomplete_expressions:
-            if expression in question:
-                return True
-        return False
+        return bool(hits.get('incomplete'))
     
-    def _has_insufficient_keywords(self, question: str) -> bool:
+    def _has_insufficient_keywords(self, hits: Dict[str, List[str]]) -> bool:
         """technical 키워드가 부족한지 체크"""
-        found_keywords = []
-        for keyword in self.technical_keywords:
-            if keyword.lower() in question:
-                found_keywords.append(keyword)
-        
-        return len(found_keywords) < self.min_technical_keywords
+        return len(hits.get('technical', [])) < self.min_technical_keywords
     
     def get_ambiguity_reason(self, question: str) -> str:
         """모호함의 이유를 반환"""
-        question_lower = question.lower()
+        hits = self._match(question)
         
-        if self._has_ambiguous_expressions(question_lower):
+        if self._has_ambiguous_expressions(hits):
             return "모호한 표현 사용"
-        elif self._has_incomplete_expressions(question_lower):
+        elif self._has_incomplete_expressions(hits):
             return "불완전한 표현 사용"
-        elif self._has_insufficient_keywords(question_lower):
+        elif self._has_insufficient_keywords(hits):
             return "키워드 부족"
         elif len(question.strip()) < 10:
             return "질문이 너무 짧음"
@@ -114,11 +116,6 @@ class AmbiguityDetector:
     def get_missing_keywords(self, question: str) -> List[str]:
         """부족한 키워드들을 반환"""
         question_lower = question.lower()
-        found_keywords = []
-        
-        for keyword in self.technical_keywords:
-            if keyword.lower() in question_lower:
-                found_keywords.append(keyword)
         
         # 부족한 키워드들 (예시)
         missing_keywords = []
@@ -2,35 +2,47 @@ import hashlib
 import hmac
 import jwt
 import time
+import uuid
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List
-from pymongo import MongoClient
-from pymongo.collection import Collection
-from pymongo.database import Database
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
 
 from ..models.user import User, UserRole, AdminLevel, LoginType, Permission, CustomerIntegration, AdminRole
 from ..core.config import settings
+from .lru_cache import LRUCache
 
 class AuthService:
-    def __init__(self, db: Database):
+    """
+    인증 서비스 (Motor 기반 비동기)
+    
+    검증을 통과한 세션은 JWT jti 기준으로 프로세스 내 캐시에 보관해
+    같은 토큰의 다음 요청에서는 sessions/users 조회를 건너뛴다.
+    캐시 유효 시간은 토큰/세션 만료 시각과 AUTH_SESSION_CACHE_TTL 중 가장 이른 시각까지이며,
+    logout 시 바로 무효화된다.
+    """
+    
+    def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
-        self.users_collection: Collection = db.users
-        self.admin_roles_collection: Collection = db.admin_roles
-        self.customer_integrations_collection: Collection = db.customer_integrations
-        self.sessions_collection: Collection = db.sessions
+        self.users_collection: AsyncIOMotorCollection = db.users
+        self.admin_roles_collection: AsyncIOMotorCollection = db.admin_roles
+        self.customer_integrations_collection: AsyncIOMotorCollection = db.customer_integrations
+        self.sessions_collection: AsyncIOMotorCollection = db.sessions
         
         # JWT 설정
         self.secret_key = settings.SECRET_KEY
         self.algorithm = "HS256"
         self.access_token_expire_minutes = 30
         
-        # 초기 데이터 설정
-        self._init_default_data()
+        # 검증된 세션 캐시 (jti -> 사용자 정보)
+        self.session_cache = LRUCache(
+            max_entries=settings.AUTH_SESSION_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.AUTH_SESSION_CACHE_TTL
+        )
     
-    def _init_default_data(self):
-        """기본 데이터 초기화"""
+    async def ensure_default_data(self):
+        """기본 데이터 초기화 (서비스 생성 시 한 번 호출)"""
         # 기본 관리자 역할 생성
-        if not self.admin_roles_collection.find_one({"name": "Super Admin"}):
+        if not await self.admin_roles_collection.find_one({"name": "Super Admin"}):
             super_admin_role = AdminRole(
                 name="Super Admin",
                 level=AdminLevel.SUPER_ADMIN,
@@ -50,10 +62,10 @@ class AuthService:
                 can_view_reports=True,
                 can_monitor_system=True
             )
-            self.admin_roles_collection.insert_one(super_admin_role.dict())
+            await self.admin_roles_collection.insert_one(super_admin_role.dict())
         
         # 아름넷 고객사 통합 설정
-        if not self.customer_integrations_collection.find_one({"customer_id": "arumnet"}):
+        if not await self.customer_integrations_collection.find_one({"customer_id": "arumnet"}):
             arumnet_integration = CustomerIntegration(
                 customer_id="arumnet",
                 name="아름넷",
@@ -64,10 +76,10 @@ class AuthService:
                 session_timeout=3600,
                 max_sessions=5
             )
-            self.customer_integrations_collection.insert_one(arumnet_integration.dict())
+            await self.customer_integrations_collection.insert_one(arumnet_integration.dict())
         
         # 기본 텔리젠 관리자 생성
-        if not self.users_collection.find_one({"username": "admin"}):
+        if not await self.users_collection.find_one({"username": "admin"}):
             admin_user = User(
                 username="admin",
                 email="admin@telizen.com",
@@ -84,7 +96,7 @@ class AuthService:
                     Permission.REPORTS_EXPORT, Permission.SYSTEM_MONITOR
                 ]
             )
-            self.users_collection.insert_one(admin_user.dict())
+            await self.users_collection.insert_one(admin_user.dict())
     
     def _hash_password(self, password: str) -> str:
         """비밀번호 해싱"""
@@ -102,13 +114,29 @@ class AuthService:
         else:
             expire = datetime.utcnow() + timedelta(minutes=self.access_token_expire_minutes)
         
-        to_encode.update({"exp": expire})
+        # jti: 세션 캐시 키 (토큰마다 고유)
+        to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
         encoded_jwt = jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
         return encoded_jwt
     
-    def _verify_signature(self, customer_id: str, user_id: str, timestamp: int, signature: str) -> bool:
+    async def _issue_session(self, user: Dict[str, Any]) -> str:
+        """액세스 토큰을 만들고 세션을 저장합니다."""
+        access_token = self._create_access_token(
+            data={"sub": user["id"], "role": user["role"], "company": user["company"]}
+        )
+        
+        session_data = {
+            "user_id": user["id"],
+            "access_token": access_token,
+            "created_at": datetime.now(),
+            "expires_at": datetime.now() + timedelta(hours=1)
+        }
+        await self.sessions_collection.insert_one(session_data)
+        return access_token
+    
+    async def _verify_signature(self, customer_id: str, user_id: str, timestamp: int, signature: str) -> bool:
         """서명 검증"""
-        customer = self.customer_integrations_collection.find_one({"customer_id": customer_id})
+        customer = await self.customer_integrations_collection.find_one({"customer_id": customer_id})
         if not customer:
             return False
         
@@ -128,7 +156,7 @@ class AuthService:
         """자동 로그인"""
         try:
             # 서명 검증
-            if not self._verify_signature(customer_id, user_id, timestamp, signature):
+            if not await self._verify_signature(customer_id, user_id, timestamp, signature):
                 raise ValueError("Invalid signature")
             
             # 타임스탬프 검증 (5분 이내)
@@ -151,8 +179,8 @@ class AuthService:
                     store_id=store_id,
                     login_type=LoginType.AUTO,
                     permissions=[Permission.CHAT_ACCESS, Permission.CHAT_HISTORY]
-                )
-                await self.users_collection.insert_one(user.dict())
+                ).dict()
+                await self.users_collection.insert_one(user)
             else:
                 # 로그인 시간 업데이트
                 await self.users_collection.update_one(
@@ -160,19 +188,8 @@ class AuthService:
                     {"$set": {"last_login_at": datetime.now()}}
                 )
             
-            # 액세스 토큰 생성
-            access_token = self._create_access_token(
-                data={"sub": user["id"], "role": user["role"], "company": user["company"]}
-            )
-            
-            # 세션 저장
-            session_data = {
-                "user_id": user["id"],
-                "access_token": access_token,
-                "created_at": datetime.now(),
-                "expires_at": datetime.now() + timedelta(hours=1)
-            }
-            await self.sessions_collection.insert_one(session_data)
+            # 액세스 토큰 생성 및 세션 저장
+            access_token = await self._issue_session(user)
             
             return {
                 "success": True,
@@ -226,19 +243,8 @@ class AuthService:
                 {"$set": {"last_login_at": datetime.now()}}
             )
             
-            # 액세스 토큰 생성
-            access_token = self._create_access_token(
-                data={"sub": user["id"], "role": user["role"], "company": user["company"]}
-            )
-            
-            # 세션 저장
-            session_data = {
-                "user_id": user["id"],
-                "access_token": access_token,
-                "created_at": datetime.now(),
-                "expires_at": datetime.now() + timedelta(hours=1)
-            }
-            await self.sessions_collection.insert_one(session_data)
+            # 액세스 토큰 생성 및 세션 저장
+            access_token = await self._issue_session(user)
             
             return {
                 "success": True,
@@ -317,7 +323,7 @@ class AuthService:
                 "error": str(e)
             }
 
-    def manual_login(self, username: str, password: str, customer_id: Optional[str] = None) -> Dict[str, Any]:
+    async def manual_login(self, username: str, password: str, customer_id: Optional[str] = None) -> Dict[str, Any]:
         """수동 로그인"""
         try:
             # 사용자 조회
@@ -325,7 +331,7 @@ class AuthService:
             if customer_id:
                 query["company"] = customer_id
             
-            user = self.users_collection.find_one(query)
+            user = await self.users_collection.find_one(query)
             if not user:
                 raise ValueError("User not found")
             
@@ -338,24 +344,13 @@ class AuthService:
                 raise ValueError("Account is disabled")
             
             # 로그인 시간 업데이트
-            self.users_collection.update_one(
+            await self.users_collection.update_one(
                 {"_id": user["_id"]},
                 {"$set": {"last_login_at": datetime.now()}}
             )
             
-            # 액세스 토큰 생성
-            access_token = self._create_access_token(
-                data={"sub": user["id"], "role": user["role"], "company": user["company"]}
-            )
-            
-            # 세션 저장
-            session_data = {
-                "user_id": user["id"],
-                "access_token": access_token,
-                "created_at": datetime.now(),
-                "expires_at": datetime.now() + timedelta(hours=1)
-            }
-            self.sessions_collection.insert_one(session_data)
+            # 액세스 토큰 생성 및 세션 저장
+            access_token = await self._issue_session(user)
             
             return {
                 "success": True,
@@ -380,13 +375,20 @@ class AuthService:
             }
     
     async def verify_token(self, token: str) -> Optional[Dict[str, Any]]:
-        """토큰 검증"""
+        """토큰 검증 (jti 세션 캐시 적중 시 DB 조회 없음)"""
         try:
             payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
             user_id = payload.get("sub")
             if user_id is None:
                 return None
             
+            # 검증된 세션 캐시 확인 (jti가 없는 이전 토큰은 매번 DB 확인)
+            jti = payload.get("jti")
+            if jti:
+                cached = self.session_cache.get(jti)
+                if cached is not None:
+                    return {**cached, "permissions": list(cached["permissions"])}
+            
             # 세션 확인
             session = await self.sessions_collection.find_one({
                 "access_token": token,
@@ -401,26 +403,38 @@ class AuthService:
             if not user:
                 return None
             
-            return {
+            user_info = {
                 "user_id": user_id,
                 "role": user["role"],
                 "company": user["company"],
                 "permissions": user["permissions"]
             }
             
+            if jti:
+                # 토큰 만료, 세션 만료, 캐시 최대 유효 시간 중 가장 이른 시각까지 캐시
+                ttl = min(
+                    float(settings.AUTH_SESSION_CACHE_TTL),
+                    payload["exp"] - time.time(),
+                    (session["expires_at"] - datetime.now()).total_seconds()
+                )
+                if ttl > 0:
+                    self.session_cache.put(jti, {**user_info, "permissions": list(user_info["permissions"])}, ttl_seconds=ttl)
+            
+            return user_info
+            
         except jwt.PyJWTError:
             return None
     
-    def get_user_permissions(self, user_id: str) -> List[str]:
+    async def get_user_permissions(self, user_id: str) -> List[str]:
         """사용자 권한 조회"""
-        user = self.users_collection.find_one({"id": user_id})
+        user = await self.users_collection.find_one({"id": user_id}, {"permissions": 1})
         if not user:
             return []
         return user.get("permissions", [])
     
-    def check_page_access(self, user_id: str, page_id: str) -> bool:
+    async def check_page_access(self, user_id: str, page_id: str) -> bool:
         """페이지 접근 권한 확인"""
-        user = self.users_collection.find_one({"id": user_id})
+        user = await self.users_collection.find_one({"id": user_id})
         if not user:
             return False
         
@@ -428,11 +442,33 @@ class AuthService:
         # (PAGE_PERMISSIONS에서 해당 페이지의 권한 요구사항 확인)
         return True  # 임시로 True 반환
     
-    def logout(self, token: str) -> bool:
-        """로그아웃"""
+    async def list_users(self) -> List[Dict[str, Any]]:
+        """사용자 목록 조회 (비밀번호 해시 제외)"""
+        return await self.users_collection.find({}, {"password_hash": 0, "_id": 0}).to_list(None)
+    
+    async def list_admin_roles(self) -> List[Dict[str, Any]]:
+        """관리자 역할 목록 조회"""
+        return await self.admin_roles_collection.find({}, {"_id": 0}).to_list(None)
+    
+    async def logout(self, token: str) -> bool:
+        """로그아웃 (세션 삭제 및 세션 캐시 무효화)"""
         try:
+            self._invalidate_cached_session(token)
+            
             # 세션 삭제
-            result = self.sessions_collection.delete_one({"access_token": token})
+            result = await self.sessions_collection.delete_one({"access_token": token})
             return result.deleted_count > 0
         except Exception:
-            return False 
\ No newline at end of file
+            return False
+    
+    def _invalidate_cached_session(self, token: str):
+        """토큰의 jti로 세션 캐시 항목을 제거합니다 (만료된 토큰도 처리)."""
+        try:
+            payload = jwt.decode(
+                token, self.secret_key, algorithms=[self.algorithm], options={"verify_exp": False}
+            )
+        except jwt.PyJWTError:
+            return
+        jti = payload.get("jti")
+        if jti:
+            self.session_cache.pop(jti)
@@ -0,0 +1,205 @@
+"""
+대화 자동화 백그라운드 파이프라인 모듈
+응답 경로에서 기다리던 대화 저장/knowledge_base 갱신/키워드 갱신을 asyncio 큐로 넘겨
+채팅 응답은 생성 직후 바로 반환되게 한다.
+- 용량 제한: 큐가 가득 차면 drop_policy에 따라 가장 오래된 작업 또는 새 작업을 버리고 집계
+- 배치: 첫 작업 이후 batch_window 동안 최대 batch_size개를 모아 AutomationService.process_batch로 처리
+- 재시도: 배치 처리 실패 시 지수 백오프로 max_retries번까지 다시 시도
+- 워커는 하나만 둔다 (knowledge_base 중복 체크가 배치 순서대로 이루어져야 하므로)
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from bson import ObjectId
+
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+
+
+@dataclass
+class AutomationJob:
+    """큐에 들어가는 대화 한 건"""
+    user_message: str
+    ai_response: str
+    classification: str
+    conversation_id: ObjectId = field(default_factory=ObjectId)  # 재시도 시 중복 저장 방지용 고정 _id
+    created_at: datetime = field(default_factory=datetime.now)   # 처리 시각이 아닌 대화 시각
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class AutomationPipeline:
+    """AutomationService 앞단의 비동기 수집 파이프라인"""
+
+    def __init__(self, automation_service, max_queue_size: int = 1000, batch_size: int = 20,
+                 batch_window_ms: float = 200.0, max_retries: int = 3, retry_backoff: float = 0.5,
+                 drop_policy: str = DROP_OLDEST):
+        """
+        Args:
+            automation_service: process_batch를 제공하는 AutomationService
+            max_queue_size: 대기 가능한 최대 작업 수
+            batch_size: 한 배치에 넣을 최대 작업 수
+            batch_window_ms: 첫 작업 이후 추가 작업을 기다리는 시간(ms)
+            max_retries: 배치 실패 시 재시도 횟수
+            retry_backoff: 첫 재시도 대기 시간(초, 재시도마다 2배)
+            drop_policy: 큐가 가득 찼을 때 "drop_oldest"(가장 오래된 작업 제거) 또는 "drop_newest"(새 작업 거절)
+        """
+        if drop_policy not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(f"지원하지 않는 drop_policy: {drop_policy}")
+
+        self.automation_service = automation_service
+        self.max_queue_size = max_queue_size
+        self.batch_size = max(batch_size, 1)
+        self.batch_window = batch_window_ms / 1000.0
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.drop_policy = drop_policy
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_task: Optional[asyncio.Task] = None
+        self._accepting = True
+
+        self.stats = {
+            'submitted': 0,
+            'enqueued': 0,
+            'dropped_oldest': 0,
+            'dropped_newest': 0,
+            'dropped_on_shutdown': 0,
+            'processed': 0,
+            'failed': 0,
+            'retries': 0,
+            'batches': 0,
+            'max_queue_depth': 0,
+            'total_lag_ms': 0.0
+        }
+        self.last_error: Optional[str] = None
+
+    def submit(self, user_message: str, ai_response: str, classification: str) -> bool:
+        """
+        대화를 큐에 넣습니다 (대기 없음). 이벤트 루프 안에서 호출합니다.
+
+        Returns:
+            bool: 큐에 들어갔으면 True, 버려졌으면 False
+        """
+        self.stats['submitted'] += 1
+        if not self._accepting:
+            self.stats['dropped_newest'] += 1
+            return False
+
+        self._ensure_worker()
+        job = AutomationJob(user_message, ai_response, classification)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            if self.drop_policy == DROP_NEWEST:
+                self.stats['dropped_newest'] += 1
+                logging.warning(f"⚠️ 자동화 큐 가득 참 ({self.max_queue_size}), 새 작업 버림")
+                return False
+            self._queue.get_nowait()
+            self._queue.task_done()
+            self.stats['dropped_oldest'] += 1
+            logging.warning(f"⚠️ 자동화 큐 가득 참 ({self.max_queue_size}), 가장 오래된 작업 버림")
+            self._queue.put_nowait(job)
+
+        self.stats['enqueued'] += 1
+        self.stats['max_queue_depth'] = max(self.stats['max_queue_depth'], self._queue.qsize())
+        return True
+
+    async def stop(self, drain: bool = True, timeout: float = 10.0):
+        """
+        새 작업을 받지 않고 워커를 중지합니다 (애플리케이션 종료 시).
+
+        Args:
+            drain: True면 남은 작업을 timeout 동안 처리한 뒤 중지
+            timeout: 남은 작업 처리 대기 시간(초)
+        """
+        self._accepting = False
+        if self._queue is None:
+            return
+
+        if drain and self._worker_task is not None and not self._worker_task.done():
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                logging.warning(f"⚠️ 자동화 큐 비우기 시간 초과, 남은 작업 {self._queue.qsize()}건 버림")
+
+        if self._worker_task is not None:
+            self._worker_task.cancel()
+            try:
+                await self._worker_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._worker_task = None
+
+        while not self._queue.empty():
+            self._queue.get_nowait()
+            self._queue.task_done()
+            self.stats['dropped_on_shutdown'] += 1
+
+    def get_stats(self) -> Dict:
+        """파이프라인 통계를 반환합니다."""
+        finished = self.stats['processed'] + self.stats['failed']
+        return {
+            **self.stats,
+            'queue_depth': self._queue.qsize() if self._queue is not None else 0,
+            'max_queue_size': self.max_queue_size,
+            'drop_policy': self.drop_policy,
+            'avg_batch_size': finished / max(self.stats['batches'], 1),
+            'avg_lag_ms': self.stats['total_lag_ms'] / max(finished, 1),
+            'last_error': self.last_error,
+            'is_running': self._worker_task is not None and not self._worker_task.done()
+        }
+
+    def _ensure_worker(self):
+        """이벤트 루프 위에서 워커 태스크를 한 번만 시작합니다."""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        if self._worker_task is None or self._worker_task.done():
+            self._worker_task = asyncio.create_task(self._worker_loop())
+
+    async def _worker_loop(self):
+        """시간 창 동안 작업을 모아 배치로 처리합니다."""
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + self.batch_window
+
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self._process_with_retry(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _process_with_retry(self, batch: List[AutomationJob]):
+        """배치를 처리하고, 실패하면 지수 백오프로 재시도합니다."""
+        self.stats['batches'] += 1
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.automation_service.process_batch(batch)
+                self.stats['processed'] += len(batch)
+                break
+            except Exception as e:
+                self.last_error = str(e)
+                if attempt >= self.max_retries:
+                    self.stats['failed'] += len(batch)
+                    logging.error(f"자동화 배치 처리 실패 ({len(batch)}건, 재시도 {self.max_retries}회 후 포기): {str(e)}")
+                    break
+                self.stats['retries'] += 1
+                delay = self.retry_backoff * (2 ** attempt)
+                logging.warning(f"⚠️ 자동화 배치 처리 실패 ({len(batch)}건), {delay:.1f}초 후 재시도: {str(e)}")
+                await asyncio.sleep(delay)
+
+        now = time.monotonic()
+        self.stats['total_lag_ms'] += sum((now - job.enqueued_at) * 1000 for job in batch)
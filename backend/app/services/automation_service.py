@@ -4,11 +4,20 @@
 """
 
 import logging
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from datetime import datetime
+import asyncio
 import re
-from difflib import SequenceMatcher
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+from .keyword_frequency_table import KeywordFrequencyTable, filter_domain_keywords
+from .near_duplicate_index import NearDuplicateIndex, SIGNATURE_FIELD, load_question_index
+
+# 중복 키 오류 코드 (재시도 시 이미 저장된 문서)
+_DUPLICATE_KEY_ERROR = 11000
 
 class AutomationService:
     """자동화 서비스 클래스"""
@@ -25,6 +34,13 @@ class AutomationService:
         self.knowledge_collection = db.knowledge_base
         self.keyword_collection = db.input_keywords
         
+        # knowledge_base 질문 근사 중복 색인 (첫 사용 시 구성, 이후 증분 갱신)
+        self.duplicate_index = NearDuplicateIndex()
+        self._duplicate_index_lock = asyncio.Lock()
+        
+        # knowledge_base 키워드 문서 빈도 테이블 (도메인 키워드 조회용)
+        self.keyword_frequencies = KeywordFrequencyTable(db)
+        
     async def process_conversation_automation(self, user_message: str, ai_response: str, classification: str) -> Dict:
         """
         대화 자동화 처리
@@ -65,6 +81,125 @@ class AutomationService:
             logging.error(f"자동화 처리 중 오류: {str(e)}")
             return {"error": str(e)}
     
+    async def process_batch(self, jobs: Sequence) -> Dict:
+        """
+        여러 대화를 한 번에 자동화 처리합니다 (백그라운드 파이프라인용).
+        건별 처리와 같은 결과를 내되 DB 왕복을 배치 단위로 묶는다.
+        - 대화 저장: insert_many 한 번
+        - 중복 체크: 근사 중복 색인(MinHash/LSH) 조회, 같은 배치 안의 질문끼리도 비교
+        - 키워드: 키워드 빈도 테이블 반영, 도메인 키워드 조회와 input_keywords 갱신을 배치당 한 번
+        오류는 삼키지 않고 그대로 올려 파이프라인이 배치를 재시도하게 한다.
+        재시도해도 결과가 같도록 대화 _id를 미리 정하고, 이미 저장된 문서의 중복 키 오류는 무시한다.
+
+        Args:
+            jobs: user_message, ai_response, classification, created_at, conversation_id 속성을 가진 작업 목록
+
+        Returns:
+            Dict: 저장한 대화 수, 추가한 지식 수, 키워드 갱신 여부
+        """
+        result = {
+            "conversations_saved": 0,
+            "knowledge_added": 0,
+            "keywords_updated": False
+        }
+        if not jobs:
+            return result
+
+        # 1. 대화 일괄 저장
+        conversations = [
+            {
+                "_id": job.conversation_id,
+                "user_message": job.user_message,
+                "ai_response": job.ai_response,
+                "classification": job.classification,
+                "timestamp": job.created_at,
+                "created_at": job.created_at
+            }
+            for job in jobs
+        ]
+        result["conversations_saved"] = await self._insert_many_idempotent(self.conversations_collection, conversations)
+
+        technical_jobs = [job for job in jobs if job.classification == "technical"]
+        if not technical_jobs:
+            return result
+
+        # 2. knowledge_base 중복 체크 후 일괄 추가
+        # 배치 안의 질문끼리도 걸러지도록 먼저 색인에 넣고, 저장에 실패한 문서만 되돌린다
+        # (지식 _id는 대화 _id를 그대로 써서 재시도해도 같은 문서로 저장됨)
+        await self._ensure_duplicate_index()
+        knowledge_items = []
+        for job in technical_jobs:
+            if await self._check_similarity(job.user_message):
+                continue
+            knowledge_item = self._build_knowledge_item(job.user_message, job.ai_response, job.created_at,
+                                                         doc_id=job.conversation_id)
+            self.duplicate_index.add(knowledge_item["_id"], job.user_message, knowledge_item[SIGNATURE_FIELD]["values"])
+            knowledge_items.append(knowledge_item)
+        if knowledge_items:
+            try:
+                await self._insert_many_idempotent(self.knowledge_collection, knowledge_items)
+            except BulkWriteError as e:
+                # ordered=False라 나머지는 저장됨: 실패한 문서만 색인에서 빼고, 저장된 문서는 키워드 빈도에 반영
+                failed_indexes = {error.get('index') for error in e.details.get('writeErrors', [])
+                                  if error.get('code') != _DUPLICATE_KEY_ERROR}
+                for position, knowledge_item in enumerate(knowledge_items):
+                    if position in failed_indexes:
+                        self.duplicate_index.remove(knowledge_item["_id"])
+                    else:
+                        await self.keyword_frequencies.apply_knowledge_upsert(knowledge_item)
+                raise
+            except Exception:
+                # 어느 문서가 저장됐는지 알 수 없으므로 모두 되돌림 (재시도 시 같은 _id라 중복 저장되지 않음)
+                for knowledge_item in knowledge_items:
+                    self.duplicate_index.remove(knowledge_item["_id"])
+                raise
+            result["knowledge_added"] = len(knowledge_items)
+            # 색인 동기화로도 반영되지만, 같은 배치의 키워드 갱신에 바로 쓰이도록 먼저 반영 (중복 반영해도 결과 동일)
+            for knowledge_item in knowledge_items:
+                await self.keyword_frequencies.apply_knowledge_upsert(knowledge_item)
+
+        # 3. 키워드 추출 및 input_keywords 갱신 (배치당 한 번)
+        extracted_keywords = []
+        for job in technical_jobs:
+            extracted_keywords.extend(self._extract_keywords_soynlp(job.user_message))
+        domain_keywords = await self._extract_domain_keywords_from_knowledge_base()
+        all_keywords = list(set(extracted_keywords + domain_keywords))
+        if all_keywords:
+            result["keywords_updated"] = await self._replace_technical_keywords(all_keywords)
+
+        logging.info(f"자동화 배치 처리 완료 ({len(jobs)}건): {result}")
+        return result
+
+    def _build_knowledge_item(self, user_message: str, ai_response: str, created_at: datetime,
+                              doc_id: Optional[ObjectId] = None) -> Dict:
+        """
+        knowledge_base에 추가할 문서 (재시도 시 중복 저장되지 않도록 _id, 근사 중복 서명 포함)
+
+        Args:
+            doc_id: 재시도해도 바뀌지 않는 _id (배치 처리에서는 대화 _id, 없으면 새로 생성)
+        """
+        return {
+            "_id": doc_id if doc_id is not None else ObjectId(),
+            "question": user_message,
+            "answer": ai_response,
+            "keywords": self._extract_keywords_soynlp(user_message),
+            "category": "technical",
+            SIGNATURE_FIELD: self.duplicate_index.stored_signature(user_message),
+            "created_at": created_at,
+            "updated_at": created_at
+        }
+
+    @staticmethod
+    async def _insert_many_idempotent(collection, documents: List[Dict]) -> int:
+        """_id가 정해진 문서를 insert_many로 저장합니다. 이미 있는 문서(중복 키)는 저장된 것으로 봅니다."""
+        try:
+            await collection.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            write_errors = e.details.get('writeErrors', [])
+            if any(error.get('code') != _DUPLICATE_KEY_ERROR for error in write_errors):
+                raise
+        return len(documents)
+
     async def _save_conversation(self, user_message: str, ai_response: str, classification: str) -> bool:
         """대화를 conversations 테이블에 저장"""
         try:
@@ -91,19 +226,11 @@ class AutomationService:
             is_duplicate = await self._check_similarity(user_message)
             
             if not is_duplicate:
-                # 키워드 추출
-                keywords = self._extract_keywords_soynlp(user_message)
-                
-                knowledge_item = {
-                    "question": user_message,
-                    "answer": ai_response,
-                    "keywords": keywords,
-                    "category": "technical",
-                    "created_at": datetime.now(),
-                    "updated_at": datetime.now()
-                }
+                knowledge_item = self._build_knowledge_item(user_message, ai_response, datetime.now())
                 
                 await self.knowledge_collection.insert_one(knowledge_item)
+                self.duplicate_index.add(knowledge_item["_id"], user_message, knowledge_item[SIGNATURE_FIELD]["values"])
+                await self.keyword_frequencies.apply_knowledge_upsert(knowledge_item)
                 logging.info(f"knowledge_base 업데이트 완료: {user_message[:50]}...")
                 return True
             else:
@@ -115,25 +242,38 @@ class AutomationService:
             return False
     
     async def _check_similarity(self, user_message: str, threshold: float = 0.8) -> bool:
-        """유사성 체크로 중복 방지"""
+        """유사성 체크로 중복 방지 (근사 중복 색인 후보만 SequenceMatcher로 확인)"""
         try:
-            # 기존 질문들과 유사도 비교
-            existing_questions = await self.knowledge_collection.find({}).to_list(None)
-            
-            for item in existing_questions:
-                existing_question = item.get('question', '')
-                similarity = SequenceMatcher(None, user_message.lower(), existing_question.lower()).ratio()
-                
-                if similarity >= threshold:
-                    logging.info(f"유사도 {similarity:.2f}로 중복 감지: {existing_question[:50]}...")
-                    return True
-            
+            await self._ensure_duplicate_index()
+            matches = self.duplicate_index.find_similar(user_message, threshold)
+            if matches:
+                logging.info(f"유사도 {matches[0][1]:.2f}로 중복 감지: {user_message[:50]}...")
+                return True
             return False
             
         except Exception as e:
             logging.error(f"유사성 체크 실패: {str(e)}")
             return False
     
+    async def _ensure_duplicate_index(self):
+        """근사 중복 색인이 없으면 knowledge_base에서 구성합니다 (서명 없는 문서는 계산 후 저장)."""
+        if self.duplicate_index.is_ready:
+            return
+        async with self._duplicate_index_lock:
+            if not self.duplicate_index.is_ready:
+                await load_question_index(self.knowledge_collection, self.duplicate_index)
+    
+    def apply_knowledge_upsert(self, doc: Dict):
+        """knowledge_base 문서 추가/수정을 근사 중복 색인에 반영합니다 (색인 동기화 핸들러)."""
+        if not self.duplicate_index.is_ready:
+            return
+        question = doc.get('question') or ''
+        self.duplicate_index.add(doc['_id'], question, self.duplicate_index.signature_from_doc(doc))
+    
+    def apply_knowledge_delete(self, doc_id):
+        """knowledge_base 문서 삭제를 근사 중복 색인에 반영합니다 (색인 동기화 핸들러)."""
+        self.duplicate_index.remove(doc_id)
+    
     def _extract_keywords_soynlp(self, text: str) -> List[str]:
         """soynlp를 사용한 키워드 추출"""
         try:
@@ -175,15 +315,8 @@ class AutomationService:
             all_keywords = list(set(extracted_keywords + domain_keywords))
             
             if all_keywords:
-                # technical 카테고리에 키워드 추가
-                await self.keyword_collection.update_one(
-                    {"category": "technical"},
-                    {"$set": {
-                        "keywords": all_keywords,
-                        "updated_at": datetime.now()
-                    }},
-                    upsert=True
-                )
+                # technical 카테고리에 키워드 반영
+                await self._replace_technical_keywords(all_keywords)
                 
                 logging.info(f"키워드 업데이트 완료: {len(all_keywords)}개 키워드")
                 return True
@@ -195,58 +328,36 @@ class AutomationService:
             return False
     
     async def _extract_domain_keywords_from_knowledge_base(self) -> List[str]:
-        """knowledge_base에서 도메인 키워드 자동 추출"""
+        """knowledge_base 도메인 키워드 조회 (증분 유지되는 키워드 빈도 테이블에서 읽음)"""
         try:
-            # knowledge_base의 모든 키워드 수집
-            all_keywords = []
-            async for item in self.knowledge_collection.find({}):
-                if 'keywords' in item and item['keywords']:
-                    all_keywords.extend(item['keywords'])
-            
-            # 도메인 키워드 필터링
-            domain_keywords = self._filter_domain_keywords(all_keywords)
-            
-            return domain_keywords
+            await self.keyword_frequencies.ensure_initialized()
+            return await self.keyword_frequencies.domain_keywords()
             
         except Exception as e:
             logging.error(f"도메인 키워드 추출 실패: {str(e)}")
             return []
     
     def _filter_domain_keywords(self, keywords: List[str]) -> List[str]:
-        """도메인 관련 키워드만 필터링"""
-        # 도메인 관련 키워드 패턴
-        domain_patterns = [
-            r'.*설치.*', r'.*설정.*', r'.*오류.*', r'.*에러.*', r'.*문제.*', r'.*해결.*', r'.*방법.*',
-            r'.*프로그램.*', r'.*소프트웨어.*', r'.*하드웨어.*', r'.*기기.*', r'.*장비.*',
-            r'.*스캐너.*', r'.*프린터.*', r'.*포스.*', r'.*pos.*', r'.*시스템.*', r'.*네트워크.*',
-            r'.*연결.*', r'.*인터넷.*', r'.*데이터.*', r'.*백업.*', r'.*복구.*', r'.*업데이트.*',
-            r'.*영수증.*', r'.*결제.*', r'.*카드.*', r'.*키오스크.*', r'.*kiosk.*',
-            r'.*듀얼모니터.*', r'.*모니터.*', r'.*화면.*', r'.*디스플레이.*',
-            r'.*포트.*', r'.*장치관리자.*', r'.*디바이스.*', r'.*device.*',
-            r'.*재연결.*', r'.*출력.*', r'.*정상출력.*', r'.*정상작동.*',
-            r'.*다운로드.*', r'.*업로드.*', r'.*설치파일.*', r'.*드라이버.*',
-            r'.*재부팅.*', r'.*리부팅.*', r'.*부팅.*', r'.*인터페이스.*',
-            r'.*ui.*', r'.*ux.*', r'.*사용자.*', r'.*사용법.*', r'.*매뉴얼.*',
-            r'.*설명서.*', r'.*가이드.*', r'.*도움말.*', r'.*help.*',
-            r'.*거래명세서.*', r'.*직인.*', r'.*계좌번호.*', r'.*로그인.*', r'.*단말기.*',
-            r'.*클라우드.*', r'.*재설치.*', r'.*설치요구.*', r'.*작동.*', r'.*재시작.*'
-        ]
-        
-        # 비도메인 키워드 제외
-        exclude_keywords = [
-            '고객님', '팀장', '아침', '커피', '감사', '안녕', '반갑', '좋은', '하이', 'hello',
-            '바쁘', '식사', '점심', '저녁', '차', '날씨', '기분', '피곤', '힘드시', '지내',
-            '너는', '당신은', 'ai', '인공지능', '로봇'
-        ]
-        
-        # 도메인 키워드 필터링
-        domain_keywords = []
-        for keyword in keywords:
-            if (keyword not in exclude_keywords and 
-                any(re.match(pattern, keyword, re.IGNORECASE) for pattern in domain_patterns)):
-                domain_keywords.append(keyword)
-        
-        return list(set(domain_keywords))  # 중복 제거
+        """도메인 관련 키워드만 필터링 (미리 컴파일한 단일 정규식)"""
+        return filter_domain_keywords(keywords)
+    
+    async def _replace_technical_keywords(self, keywords: List[str]) -> bool:
+        """
+        input_keywords technical 목록을 교체합니다.
+        목록이 그대로면 쓰지 않아 키워드 오토마톤 재구성(색인 동기화)을 일으키지 않습니다.
+        """
+        current = await self.keyword_collection.find_one({"category": "technical"}, {"keywords": 1})
+        if current is not None and set(current.get('keywords') or []) == set(keywords):
+            return False
+        await self.keyword_collection.update_one(
+            {"category": "technical"},
+            {"$set": {
+                "keywords": keywords,
+                "updated_at": datetime.now()
+            }},
+            upsert=True
+        )
+        return True
     
     async def get_automation_stats(self) -> Dict:
         """자동화 통계 조회"""
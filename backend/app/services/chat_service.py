@@ -2,7 +2,7 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 from .llm_service import LLMService
 from .db_enhancement_service import DBEnhancementService
 from .conversation_algorithm import ConversationAlgorithm
-from .formatting_service import FormattingService
+from .formatting_service import FormattingService, StreamingFormatter
 from .model_manager import get_model_manager, ModelType
 from .input_filter import InputFilter, InputType as InputFilterType
 from .clarification_service import ClarificationService
@@ -12,7 +12,7 @@ from ..config import settings, enable_module, disable_module, get_module_status
 import logging
 import time
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Dict, List, Optional, Any
 import asyncio
 
 class ChatService:
@@ -56,6 +56,20 @@ class ChatService:
         from .automation_service import AutomationService
         self.automation_service = AutomationService(db)
         
+        # 자동화를 응답 경로 밖에서 처리하는 백그라운드 파이프라인
+        self.automation_pipeline = None
+        if settings.ENABLE_AUTOMATION_PIPELINE:
+            from .automation_pipeline import AutomationPipeline
+            self.automation_pipeline = AutomationPipeline(
+                self.automation_service,
+                max_queue_size=settings.AUTOMATION_QUEUE_MAX_SIZE,
+                batch_size=settings.AUTOMATION_BATCH_SIZE,
+                batch_window_ms=settings.AUTOMATION_BATCH_WINDOW_MS,
+                max_retries=settings.AUTOMATION_MAX_RETRIES,
+                retry_backoff=settings.AUTOMATION_RETRY_BACKOFF,
+                drop_policy=settings.AUTOMATION_DROP_POLICY
+            )
+        
         # Clarification 서비스들 초기화
         self.clarification_service = None
         self.context_service = None
@@ -257,10 +271,8 @@ class ChatService:
                 response = await self._handle_casual_conversation(message)
                 logging.info(f"✅ 일상 대화 처리 완료: {response[:100]}...")
             
-            # 3. 자동화 처리 (대화 저장 및 knowledge_base 업데이트)
-            automation_result = await self.automation_service.process_conversation_automation(
-                message, response, input_type.value
-            )
+            # 3. 자동화 처리 (대화 저장 및 knowledge_base 업데이트, 백그라운드 큐로 전달)
+            await self._run_automation(message, response, input_type)
             
             # 4. 응답 포맷팅
             formatted_response = await self._format_response(response, input_type)
@@ -278,6 +290,92 @@ class ChatService:
             logging.error(f"메시지 처리 중 오류: {str(e)}")
             return "죄송합니다. 일시적인 오류가 발생했습니다. 잠시 후 다시 시도해주세요."
 
+    async def process_message_stream(self, message: str, conversation_id: str = None,
+                                     user_id: str = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        process_message의 스트리밍 버전
+        생성된 토큰을 완성된 줄 단위로 포맷팅해 이벤트로 내보내고, 마지막에 최종 응답을 내보낸다.
+        
+        Args:
+            message: 사용자 메시지
+            conversation_id: 대화 ID
+            user_id: 사용자 ID (Clarification 기능용)
+            
+        Yields:
+            Dict: {"type": "delta", "lines": [...], "pending": str}
+                  {"type": "done", "response": str}
+                  {"type": "error", "message": str}
+        """
+        try:
+            logging.info(f"스트리밍 메시지 처리 시작: {message[:20]}...")
+            
+            # Clarification 응답은 스트리밍 없이 한 번에 처리
+            if message.startswith("[CLARIFICATION_RESPONSE:"):
+                response = await self._handle_clarification_response(message, user_id)
+                yield {"type": "done", "response": response}
+                return
+            
+            # 1. 입력 분류
+            input_type, details = await self.input_filter.classify_input(message)
+            logging.info(f"입력 분류: {input_type.value} - {details.get('reason', '')}")
+            
+            from ..dependencies import get_llm_service
+            llm_service = await get_llm_service()
+            
+            # 2. 분류에 따른 토큰 스트림 선택
+            if input_type == self.InputType.PROFANITY:
+                chunks = llm_service.stream_conversation_response(self._profanity_prompt(message))
+            elif input_type == self.InputType.NON_COUNSELING:
+                chunks = llm_service.stream_conversation_response(self._non_counseling_prompt(message))
+            elif input_type == self.InputType.TECHNICAL:
+                if settings.ENABLE_CLARIFICATION and user_id and self.clarification_service:
+                    # Clarification 질문 여부를 먼저 판단해야 하므로 기존 방식으로 처리
+                    response = await self._handle_technical_conversation(message, user_id)
+                    async for event in self._finish_stream(message, response, input_type):
+                        yield event
+                    return
+                chunks = llm_service.stream_search_and_enhance_answer(message)
+            else:
+                chunks = llm_service.stream_conversation_response(message)
+            
+            # 3. 완성된 줄 단위로 포맷팅해 전달
+            formatter = StreamingFormatter()
+            parts = []
+            async for text in chunks:
+                parts.append(text)
+                lines = formatter.feed(text)
+                yield {"type": "delta", "lines": lines, "pending": formatter.pending}
+            
+            lines = formatter.flush()
+            if lines:
+                yield {"type": "delta", "lines": lines, "pending": ""}
+            
+            response = "".join(parts).strip()
+            async for event in self._finish_stream(message, response, input_type):
+                yield event
+                
+        except Exception as e:
+            logging.error(f"스트리밍 메시지 처리 중 오류: {str(e)}")
+            yield {"type": "error", "message": "죄송합니다. 일시적인 오류가 발생했습니다. 잠시 후 다시 시도해주세요."}
+
+    async def _finish_stream(self, message: str, response: str, input_type) -> AsyncIterator[Dict[str, Any]]:
+        """스트림 종료 처리: 자동화(대화 저장 등) 등록 후 최종 응답 전송"""
+        # done 이후 클라이언트가 연결을 끊어도 대화가 저장되도록 먼저 등록 (파이프라인은 연결과 무관하게 처리)
+        await self._run_automation(message, response, input_type)
+        
+        formatted_response = await self._format_response(response, input_type)
+        yield {"type": "done", "response": formatted_response}
+        logging.info(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] 스트리밍 응답 완료:\n{formatted_response}")
+
+    async def _run_automation(self, message: str, response: str, input_type):
+        """대화 자동화를 파이프라인 큐에 넣습니다. 파이프라인이 꺼져 있으면 기존처럼 직접 처리합니다."""
+        if self.automation_pipeline is not None:
+            self.automation_pipeline.submit(message, response, input_type.value)
+            return
+        await self.automation_service.process_conversation_automation(
+            message, response, input_type.value
+        )
+
     async def _handle_clarification_response(self, message: str, user_id: str) -> str:
         """Clarification 응답 처리"""
         try:
@@ -464,6 +562,10 @@ class ChatService:
     def get_response_stats(self) -> Dict:
         """응답 통계 반환"""
         stats = self.response_stats.copy()
+        if self.automation_pipeline is not None:
+            stats['automation_pipeline'] = self.automation_pipeline.get_stats()
+        if self.context_service is not None:
+            stats['clarification_session_cache'] = self.context_service.get_cache_stats()
         
         if stats['total_requests'] > 0:
             stats['avg_processing_time'] = stats['total_processing_time'] / stats['total_requests']
@@ -522,16 +624,7 @@ class ChatService:
             from ..dependencies import get_llm_service
             llm_service = await get_llm_service()
             
-            prompt = f"""사용자가 부적절한 표현을 사용했습니다: "{message}"
-
-친절하고 전문적으로 경고 메시지를 작성해주세요. 
-- 30분 후 재문의를 안내
-- 상담사의 전문성과 친절함을 유지
-- 짧고 명확하게 작성
-
-답변만 출력하고 다른 설명은 하지 마세요."""
-
-            response = await llm_service.get_conversation_response(prompt)
+            response = await llm_service.get_conversation_response(self._profanity_prompt(message))
             return response
         except Exception as e:
             logging.error(f"욕설 처리 오류: {str(e)}")
@@ -543,7 +636,26 @@ class ChatService:
             from ..dependencies import get_llm_service
             llm_service = await get_llm_service()
             
-            prompt = f"""사용자가 상담 범위를 벗어나는 질문을 했습니다: "{message}"
+            response = await llm_service.get_conversation_response(self._non_counseling_prompt(message))
+            return response
+        except Exception as e:
+            logging.error(f"비상담 처리 오류: {str(e)}")
+            return "죄송합니다. 저는 텔리젠 AI 상담사로 해당 질문은 답변 드릴 수 없습니다."
+
+    def _profanity_prompt(self, message: str) -> str:
+        """욕설 경고 메시지 생성 프롬프트"""
+        return f"""사용자가 부적절한 표현을 사용했습니다: "{message}"
+
+친절하고 전문적으로 경고 메시지를 작성해주세요. 
+- 30분 후 재문의를 안내
+- 상담사의 전문성과 친절함을 유지
+- 짧고 명확하게 작성
+
+답변만 출력하고 다른 설명은 하지 마세요."""
+
+    def _non_counseling_prompt(self, message: str) -> str:
+        """비상담 안내 메시지 생성 프롬프트"""
+        return f"""사용자가 상담 범위를 벗어나는 질문을 했습니다: "{message}"
 
 친절하고 전문적으로 안내 메시지를 작성해주세요.
 - 텔리젠 AI 상담사의 역할 설명
@@ -552,9 +664,3 @@ class ChatService:
 - 짧고 명확하게 작성
 
 답변만 출력하고 다른 설명은 하지 마세요."""
-
-            response = await llm_service.get_conversation_response(prompt)
-            return response
-        except Exception as e:
-            logging.error(f"비상담 처리 오류: {str(e)}")
-            return "죄송합니다. 저는 텔리젠 AI 상담사로 해당 질문은 답변 드릴 수 없습니다."
\ No newline at end of file
@@ -17,11 +17,13 @@ logger = logging.getLogger(__name__)
 class ClarificationService:
     """Clarification 서비스"""
     
-    def __init__(self, db: AsyncIOMotorDatabase, llm_service: LLMService):
+    def __init__(self, db: AsyncIOMotorDatabase, llm_service: LLMService,
+                 context_service: Optional[ConversationContextService] = None):
         self.db = db
         self.llm_service = llm_service
         self.ambiguity_detector = AmbiguityDetector()
-        self.context_service = ConversationContextService(db)
+        # 세션 캐시를 공유하도록 의존성 주입 싱글톤을 받음 (없으면 새로 생성)
+        self.context_service = context_service or ConversationContextService(db)
     
     async def process_question(self, question: str, user_id: str, search_results: List[Dict] = None) -> Dict:
         """질문 처리 및 Clarification 필요 여부 판단"""
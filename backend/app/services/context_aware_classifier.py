@@ -9,6 +9,9 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 import logging
 import re
 from .optimized_pattern_matcher import OptimizedPatternMatcher
+from .keyword_automaton import get_keyword_matcher
+from .usage_counter_buffer import UsageCounterBuffer
+from ..config import settings
 
 class InputType(Enum):
     """입력 타입 분류"""
@@ -30,6 +33,14 @@ class ContextAwareClassifier:
         self.optimized_matcher = OptimizedPatternMatcher(db)
         self.matcher_initialized = False
         
+        # 패턴 사용 횟수는 메모리에 모았다가 주기적으로 bulk_write (요청 경로에서 DB 쓰기 제거)
+        self.usage_buffer = UsageCounterBuffer(
+            self.pattern_collection,
+            field="usage_count",
+            flush_interval=settings.PATTERN_USAGE_FLUSH_INTERVAL,
+            max_pending=settings.PATTERN_USAGE_FLUSH_MAX_PENDING
+        )
+        
         # 명확한 키워드 정의 (100% 확실한 경우만)
         self.clear_keywords = {
             'casual': [
@@ -61,6 +72,10 @@ class ContextAwareClassifier:
             ]
         }
         
+        # 모든 clear_keywords 카테고리를 공유 키워드 오토마톤에 등록 (입력당 한 번만 훑음)
+        self.keyword_matcher = get_keyword_matcher()
+        self.keyword_matcher.set_source("clear_keywords", self.clear_keywords)
+        
         # LLM 서비스 (나중에 주입)
         self.llm_service = None
     
@@ -119,24 +134,24 @@ class ContextAwareClassifier:
             }
     
     def _check_casual_profanity_keywords(self, input_lower: str) -> Optional[Tuple[InputType, Dict]]:
-        """casual/profanity 키워드만 체크"""
-        # casual 키워드 체크
-        for keyword in self.clear_keywords['casual']:
-            if keyword.lower() in input_lower:
-                return InputType.CASUAL, {
-                    "reason": "명확한 casual 키워드",
-                    "matched_words": [keyword],
-                    "source": "clear_keywords"
-                }
+        """casual/profanity 키워드만 체크 (오토마톤 한 번의 스캔으로 모든 카테고리 매칭)"""
+        hits = self.keyword_matcher.find(input_lower, "clear_keywords")
+        
+        # casual 키워드 체크 (목록 앞쪽 키워드 우선)
+        if hits.get('casual'):
+            return InputType.CASUAL, {
+                "reason": "명확한 casual 키워드",
+                "matched_words": [hits['casual'][0]],
+                "source": "clear_keywords"
+            }
         
         # profanity 키워드 체크
-        for keyword in self.clear_keywords['profanity']:
-            if keyword.lower() in input_lower:
-                return InputType.PROFANITY, {
-                    "reason": "명확한 profanity 키워드",
-                    "matched_words": [keyword],
-                    "source": "clear_keywords"
-                }
+        if hits.get('profanity'):
+            return InputType.PROFANITY, {
+                "reason": "명확한 profanity 키워드",
+                "matched_words": [hits['profanity'][0]],
+                "source": "clear_keywords"
+            }
         
         return None
     
@@ -175,7 +190,7 @@ class ContextAwareClassifier:
                     input_type = InputType(context)
                     
                     # 사용 통계 업데이트
-                    await self._update_pattern_usage(pattern_doc["_id"])
+                    self._update_pattern_usage(pattern_doc["_id"])
                     
                     return input_type, {
                         "reason": f"최적화된 패턴 매칭: {pattern} (유사도: {similarity_score:.3f}, 방법: {method})",
@@ -226,7 +241,7 @@ class ContextAwareClassifier:
                 input_type = InputType(context)
                 
                 # 사용 통계 업데이트
-                await self._update_pattern_usage(pattern_doc["_id"])
+                self._update_pattern_usage(pattern_doc["_id"])
                 
                 return input_type, {
                     "reason": f"기존 패턴 매칭: {pattern} (매칭율: {match_ratio:.2f})",
@@ -418,13 +433,10 @@ class ContextAwareClassifier:
     
 
     
-    async def _update_pattern_usage(self, pattern_id):
-        """패턴 사용 통계 업데이트"""
+    def _update_pattern_usage(self, pattern_id):
+        """패턴 사용 통계 업데이트 (쓰기 지연 버퍼에 누적, 주기적으로 일괄 반영)"""
         try:
-            await self.pattern_collection.update_one(
-                {"_id": pattern_id},
-                {"$inc": {"usage_count": 1}}
-            )
+            self.usage_buffer.increment(pattern_id)
         except Exception as e:
             logging.error(f"패턴 사용 통계 업데이트 중 오류: {str(e)}")
     
@@ -477,6 +489,9 @@ class ContextAwareClassifier:
     async def get_pattern_stats(self):
         """패턴 사용 통계 조회"""
         try:
+            # 아직 반영되지 않은 사용 횟수를 먼저 반영해 집계에 포함
+            await self.usage_buffer.flush()
+            
             stats = await self.pattern_collection.aggregate([
                 {"$group": {
                     "_id": "$context",
@@ -493,6 +508,7 @@ class ContextAwareClassifier:
             return {
                 "pattern_stats": stats,
                 "optimized_matcher_stats": matcher_stats,
+                "usage_buffer_stats": self.usage_buffer.get_stats(),
                 "matcher_initialized": self.matcher_initialized
             }
         except Exception as e:
@@ -2,27 +2,51 @@
 """
 대화 맥락 관리 모듈
 대화 세션을 관리하고 맥락 정보를 저장/복원
+- 만료: conversation_contexts의 updated_at TTL 인덱스(index_registry)가 오래된 세션을 삭제
+  (TTL 모니터는 약 60초 주기로 돌므로 조회 시에도 updated_at으로 만료를 확인, DB에는 쓰지 않음)
+- 캐시: 진행 중 세션을 write-through로 메모리에 두어 [CLARIFICATION_RESPONSE:...] 왕복 시 DB를 다시 읽지 않음
+  (DB 갱신이 성공한 변경만 캐시에 반영, 캐시는 프로세스 단위)
 """
 
+import copy
 import logging
+import uuid
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+
+from ..config import settings
+from .lru_cache import LRUCache
 
 logger = logging.getLogger(__name__)
 
+
+def _utcnow() -> datetime:
+    """MongoDB 저장 정밀도(ms)에 맞춘 현재 UTC 시각 (캐시와 DB의 updated_at 비교용)"""
+    now = datetime.utcnow()
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+
 class ConversationContextService:
     """대화 맥락 관리 서비스"""
     
     def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
         self.context_collection = db.conversation_contexts
-        self.session_timeout = timedelta(minutes=30)  # 30분 세션 타임아웃
+        self.session_timeout = timedelta(seconds=settings.CLARIFICATION_SESSION_TTL_SECONDS)  # TTL 인덱스와 같은 값
+        # 진행 중 세션 캐시 (갱신할 때마다 다시 넣어 TTL도 updated_at 기준으로 연장)
+        self.active_sessions = LRUCache(
+            max_entries=settings.CLARIFICATION_SESSION_CACHE_MAX_ENTRIES,
+            ttl_seconds=self.session_timeout.total_seconds()
+        )
     
     async def create_context(self, user_id: str, original_question: str) -> str:
         """새로운 대화 맥락 생성"""
         try:
-            session_id = f"{user_id}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
+            # 초 단위 시각 대신 uuid를 붙여 같은 사용자의 동시 요청에서도 겹치지 않게 함
+            session_id = f"{user_id}_{uuid.uuid4().hex}"
+            now = _utcnow()
             
             context_data = {
                 "user_id": user_id,
@@ -32,13 +56,14 @@ class ConversationContextService:
                 "user_responses": [],
                 "context_data": {},
                 "status": "waiting_clarification",  # waiting_clarification, completed, expired
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow(),
+                "created_at": now,
+                "updated_at": now,
                 "clarification_count": 0,
                 "max_clarifications": 3
             }
             
             await self.context_collection.insert_one(context_data)
+            self.active_sessions.put(session_id, context_data)
             logger.info(f"대화 맥락 생성: {session_id}")
             return session_id
             
@@ -47,19 +72,21 @@ class ConversationContextService:
             return None
     
     async def get_context(self, session_id: str) -> Optional[Dict]:
-        """대화 맥락 조회"""
+        """대화 맥락 조회 (진행 중 세션은 캐시에서, 호출자가 수정해도 캐시에 영향이 없도록 복사본 반환)"""
         try:
-            context = await self.context_collection.find_one({"session_id": session_id})
-            
-            if context:
-                # 세션 타임아웃 체크
-                if self._is_session_expired(context):
-                    await self.expire_context(session_id)
+            context = self.active_sessions.get(session_id)
+            if context is None:
+                context = await self.context_collection.find_one({"session_id": session_id})
+                if not context:
                     return None
-                
-                return context
+                self.active_sessions.put(session_id, context)
             
-            return None
+            # 세션 타임아웃 체크 (TTL 인덱스가 아직 지우지 않은 문서)
+            if self._is_session_expired(context):
+                self.active_sessions.pop(session_id)
+                return None
+            
+            return copy.deepcopy(context)
             
         except Exception as e:
             logger.error(f"대화 맥락 조회 중 오류: {e}")
@@ -68,16 +95,10 @@ class ConversationContextService:
     async def add_clarification_question(self, session_id: str, question: str) -> bool:
         """추가 질문 저장"""
         try:
-            result = await self.context_collection.update_one(
-                {"session_id": session_id},
-                {
-                    "$push": {"clarification_questions": question},
-                    "$inc": {"clarification_count": 1},
-                    "$set": {"updated_at": datetime.utcnow()}
-                }
-            )
-            
-            if result.modified_count > 0:
+            if await self._update_context(session_id, {
+                "$push": {"clarification_questions": question},
+                "$inc": {"clarification_count": 1}
+            }):
                 logger.info(f"추가 질문 저장: {session_id}")
                 return True
             
@@ -90,15 +111,7 @@ class ConversationContextService:
     async def add_user_response(self, session_id: str, response: str) -> bool:
         """사용자 응답 저장"""
         try:
-            result = await self.context_collection.update_one(
-                {"session_id": session_id},
-                {
-                    "$push": {"user_responses": response},
-                    "$set": {"updated_at": datetime.utcnow()}
-                }
-            )
-            
-            if result.modified_count > 0:
+            if await self._update_context(session_id, {"$push": {"user_responses": response}}):
                 logger.info(f"사용자 응답 저장: {session_id}")
                 return True
             
@@ -111,17 +124,7 @@ class ConversationContextService:
     async def update_context_data(self, session_id: str, key: str, value: Any) -> bool:
         """맥락 데이터 업데이트"""
         try:
-            result = await self.context_collection.update_one(
-                {"session_id": session_id},
-                {
-                    "$set": {
-                        f"context_data.{key}": value,
-                        "updated_at": datetime.utcnow()
-                    }
-                }
-            )
-            
-            if result.modified_count > 0:
+            if await self._update_context(session_id, {"$set": {f"context_data.{key}": value}}):
                 logger.info(f"맥락 데이터 업데이트: {session_id} - {key}")
                 return True
             
@@ -134,19 +137,13 @@ class ConversationContextService:
     async def complete_context(self, session_id: str, final_answer: str) -> bool:
         """대화 맥락 완료"""
         try:
-            result = await self.context_collection.update_one(
-                {"session_id": session_id},
-                {
-                    "$set": {
-                        "status": "completed",
-                        "final_answer": final_answer,
-                        "completed_at": datetime.utcnow(),
-                        "updated_at": datetime.utcnow()
-                    }
+            if await self._update_context(session_id, {
+                "$set": {
+                    "status": "completed",
+                    "final_answer": final_answer,
+                    "completed_at": datetime.utcnow()
                 }
-            )
-            
-            if result.modified_count > 0:
+            }):
                 logger.info(f"대화 맥락 완료: {session_id}")
                 return True
             
@@ -157,15 +154,15 @@ class ConversationContextService:
             return False
     
     async def expire_context(self, session_id: str) -> bool:
-        """대화 맥락 만료"""
+        """대화 맥락 만료 (문서 삭제는 TTL 인덱스가 처리)"""
         try:
+            self.active_sessions.pop(session_id)
             result = await self.context_collection.update_one(
                 {"session_id": session_id},
                 {
                     "$set": {
                         "status": "expired",
-                        "expired_at": datetime.utcnow(),
-                        "updated_at": datetime.utcnow()
+                        "expired_at": datetime.utcnow()
                     }
                 }
             )
@@ -180,6 +177,30 @@ class ConversationContextService:
             logger.error(f"대화 맥락 만료 중 오류: {e}")
             return False
     
+    async def _update_context(self, session_id: str, update: Dict) -> bool:
+        """
+        DB를 갱신하고 갱신된 문서로 캐시를 교체합니다 (write-through, 같은 왕복 한 번).
+        updated_at도 함께 갱신하므로 TTL 인덱스 기준 시각과 캐시 유효 시간이 같이 연장된다.
+        """
+        update = {**update, "$set": {**update.get("$set", {}), "updated_at": _utcnow()}}
+        context = await self.context_collection.find_one_and_update(
+            {"session_id": session_id},
+            update,
+            return_document=ReturnDocument.AFTER
+        )
+        
+        if context is None:
+            # TTL로 삭제된 세션 등: 캐시에 남은 맥락도 버림
+            self.active_sessions.pop(session_id)
+            return False
+        
+        with self.active_sessions.lock:
+            # 동시 갱신의 응답 순서가 뒤바뀌어도 더 오래된 문서로 덮어쓰지 않음
+            cached = self.active_sessions.get(session_id)
+            if cached is None or not cached.get("updated_at") or cached["updated_at"] <= context["updated_at"]:
+                self.active_sessions.put(session_id, context)
+        return True
+    
     def _is_session_expired(self, context: Dict) -> bool:
         """세션이 만료되었는지 체크"""
         try:
@@ -232,20 +253,6 @@ class ConversationContextService:
             logger.error(f"대화 요약 조회 중 오류: {e}")
             return {}
     
-    async def cleanup_expired_contexts(self) -> int:
-        """만료된 대화 맥락 정리"""
-        try:
-            cutoff_time = datetime.utcnow() - self.session_timeout
-            
-            result = await self.context_collection.delete_many({
-                "updated_at": {"$lt": cutoff_time},
-                "status": {"$in": ["waiting_clarification", "expired"]}
-            })
-            
-            deleted_count = result.deleted_count
-            logger.info(f"만료된 대화 맥락 {deleted_count}개 정리 완료")
-            return deleted_count
-            
-        except Exception as e:
-            logger.error(f"만료된 대화 맥락 정리 중 오류: {e}")
-            return 0 
\ No newline at end of file
+    def get_cache_stats(self) -> Dict:
+        """진행 중 세션 캐시 통계를 반환합니다."""
+        return self.active_sessions.get_stats()
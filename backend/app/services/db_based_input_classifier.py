@@ -4,10 +4,12 @@ MongoDB의 키워드 테이블을 활용하여 동적으로 입력을 분류하
 """
 
 import re
+from datetime import datetime
 from typing import Dict, List, Tuple, Optional
 from enum import Enum
 from motor.motor_asyncio import AsyncIOMotorDatabase
 import logging
+from .keyword_automaton import get_keyword_matcher, DB_KEYWORD_SOURCE
 
 class InputType(Enum):
     """입력 타입 분류"""
@@ -31,6 +33,7 @@ class DBBasedInputClassifier:
         self.keyword_collection = db.input_keywords
         self.cached_keywords = {}  # 키워드 캐시
         self.cache_updated = False
+        self.keyword_matcher = get_keyword_matcher()  # 공유 키워드 오토마톤
         
     async def load_keywords_from_db(self) -> Dict[str, List[str]]:
         """DB에서 키워드를 로드하여 캐시에 저장"""
@@ -38,12 +41,8 @@ class DBBasedInputClassifier:
             if self.cache_updated:
                 return self.cached_keywords
             
-            # DB에서 모든 키워드 카테고리 가져오기
-            categories = {}
-            async for item in self.keyword_collection.find({}):
-                category = item.get('category', 'unknown')
-                keywords = item.get('keywords', [])
-                categories[category] = keywords
+            # DB에서 모든 키워드 카테고리를 가져와 공유 오토마톤의 DB 소스를 교체
+            categories = await self.keyword_matcher.load_db_keywords(self.db)
             
             # 캐시 업데이트
             self.cached_keywords = categories
@@ -73,11 +72,12 @@ class DBBasedInputClassifier:
             # DB에서 키워드 로드
             categories = await self.load_keywords_from_db()
             input_lower = user_input.lower().strip()
+            # 오토마톤 한 번의 스캔으로 모든 카테고리 매칭
+            hits = self.keyword_matcher.find(input_lower, DB_KEYWORD_SOURCE)
             
             # 욕설 체크 (가장 우선순위)
             if 'profanity' in categories:
-                profanity_keywords = categories['profanity']
-                matched_profanity = self._find_matched_words(input_lower, profanity_keywords)
+                matched_profanity = hits.get('profanity')
                 if matched_profanity:
                     return InputType.PROFANITY, {
                         "reason": "욕설 감지",
@@ -87,8 +87,7 @@ class DBBasedInputClassifier:
             
             # 비상담 질문 체크
             if 'non_counseling' in categories:
-                non_counseling_keywords = categories['non_counseling']
-                matched_non_counseling = self._find_matched_words(input_lower, non_counseling_keywords)
+                matched_non_counseling = hits.get('non_counseling')
                 if matched_non_counseling:
                     return InputType.NON_COUNSELING, {
                         "reason": "상담 범위 외 질문",
@@ -98,8 +97,7 @@ class DBBasedInputClassifier:
             
             # 일상 대화 체크 (인사말 포함)
             if 'casual' in categories:
-                casual_keywords = categories['casual']
-                matched_casual = self._find_matched_words(input_lower, casual_keywords)
+                matched_casual = hits.get('casual')
                 if matched_casual:
                     return InputType.CASUAL, {
                         "reason": "일상 대화 또는 인사말",
@@ -109,8 +107,7 @@ class DBBasedInputClassifier:
             
             # 기술적 질문 체크
             if 'technical' in categories:
-                technical_keywords = categories['technical']
-                matched_technical = self._find_matched_words(input_lower, technical_keywords)
+                matched_technical = hits.get('technical')
                 if matched_technical:
                     return InputType.TECHNICAL, {
                         "reason": "기술적 질문",
@@ -133,14 +130,6 @@ class DBBasedInputClassifier:
                 "source": "error"
             }
     
-    def _find_matched_words(self, text: str, keywords: List[str]) -> List[str]:
-        """텍스트에서 매칭되는 키워드를 찾습니다."""
-        matched = []
-        for keyword in keywords:
-            if keyword.lower() in text:
-                matched.append(keyword)
-        return matched
-    
     async def add_keyword(self, category: str, keyword: str) -> bool:
         """
         새로운 키워드를 DB에 추가
@@ -156,7 +145,7 @@ class DBBasedInputClassifier:
             # 기존 카테고리에 키워드 추가
             result = await self.keyword_collection.update_one(
                 {"category": category},
-                {"$addToSet": {"keywords": keyword}}
+                {"$addToSet": {"keywords": keyword}, "$set": {"updated_at": datetime.now()}}
             )
             
             if result.modified_count > 0:
@@ -187,7 +176,7 @@ class DBBasedInputClassifier:
             # 기존 카테고리에서 키워드 제거
             result = await self.keyword_collection.update_one(
                 {"category": category},
-                {"$pull": {"keywords": keyword}}
+                {"$pull": {"keywords": keyword}, "$set": {"updated_at": datetime.now()}}
             )
             
             if result.modified_count > 0:
@@ -1,9 +1,9 @@
 import os
 import torch
-from transformers import AutoTokenizer, AutoModelForCausalLM, BitsAndBytesConfig
-from peft import PeftModel, PeftConfig
+from transformers import BitsAndBytesConfig
 import logging
 from typing import Optional
+from .model_runtime import get_model_runtime
 
 class FinetunedProcessor:
     def __init__(self, base_model_path: str, adapter_path: str):
@@ -18,6 +18,7 @@ class FinetunedProcessor:
         self.adapter_path = adapter_path
         self.tokenizer = None
         self.model = None
+        self.model_handle = None
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         
         logging.info(f"FinetunedProcessor 초기화: base_model={base_model_path}, adapter={adapter_path}")
@@ -45,26 +46,19 @@ class FinetunedProcessor:
                 torch_dtype = torch.float32
                 logging.info("CPU 환경에서 일반 모드로 로딩합니다.")
             
-            # 기본 모델 로드
+            # 기본 모델 + LoRA 어댑터를 공유 모델 런타임에서 획득
             logging.info(f"기본 모델 로딩: {self.base_model_path}")
-            self.model = AutoModelForCausalLM.from_pretrained(
-                self.base_model_path,
-                quantization_config=quantization_config,
-                device_map="auto" if torch.cuda.is_available() else None,
-                torch_dtype=torch_dtype,
-                trust_remote_code=True
-            )
-            
-            # LoRA 어댑터 로드
             logging.info(f"LoRA 어댑터 로딩: {self.adapter_path}")
-            self.model = PeftModel.from_pretrained(self.model, self.adapter_path)
-            
-            # 토크나이저 로드
-            logging.info("토크나이저 로딩...")
-            self.tokenizer = AutoTokenizer.from_pretrained(
+            self.model_handle = get_model_runtime().acquire(
                 self.base_model_path,
-                trust_remote_code=True
+                consumer="finetuned_processor",
+                torch_dtype=torch_dtype,
+                adapter_path=self.adapter_path,
+                quantization_config=quantization_config,
+                device_map="auto" if torch.cuda.is_available() else None
             )
+            self.model = self.model_handle.model
+            self.tokenizer = self.model_handle.tokenizer
             
             # 패딩 토큰 설정
             if self.tokenizer.pad_token is None:
@@ -126,11 +120,11 @@ class FinetunedProcessor:
     
     def cleanup(self):
         """리소스 정리"""
-        if self.model is not None:
-            del self.model
-        if self.tokenizer is not None:
-            del self.tokenizer
-        torch.cuda.empty_cache()
+        self.model = None
+        self.tokenizer = None
+        if getattr(self, 'model_handle', None) is not None:
+            self.model_handle.release()
+            self.model_handle = None
         logging.info("파인튜닝된 모델 리소스 정리 완료")
 
 # 싱글톤 인스턴스
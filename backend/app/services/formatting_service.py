@@ -1,6 +1,6 @@
 import re
 import logging
-from typing import Optional
+from typing import List, Optional
 
 class FormattingService:
     """응답 포맷팅을 담당하는 독립적인 서비스"""
@@ -151,4 +151,45 @@ class FormattingService:
             
         except Exception as e:
             logging.error(f"Error formatting DB answer: {str(e)}")
-            return db_answer 
\ No newline at end of file
+            return db_answer
+
+
+class StreamingFormatter:
+    """
+    토큰 스트림용 점진 포맷터
+    완성된 줄(줄바꿈 또는 문장 끝)까지만 FormattingService로 포맷팅하고,
+    아직 끝나지 않은 꼬리는 pending으로 남겨 둔다.
+    """
+    
+    # 줄 경계: 줄바꿈, 또는 문장 부호/한국어 종결 어미 뒤의 공백 ('1. ' 같은 번호는 제외)
+    _boundary = re.compile(r'\n|(?<=\D[.!?])\s+|(?<=[다요])\s+')
+    
+    def __init__(self):
+        self.pending = ""
+    
+    def feed(self, text: str) -> List[str]:
+        """텍스트 조각을 추가하고 새로 완성된 포맷팅 줄 목록을 반환합니다."""
+        self.pending += text
+        
+        last_end = None
+        for match in self._boundary.finditer(self.pending):
+            last_end = match.end()
+        
+        if last_end is None:
+            return []
+        
+        completed = self.pending[:last_end]
+        self.pending = self.pending[last_end:]
+        return self._format_lines(completed)
+    
+    def flush(self) -> List[str]:
+        """남은 꼬리를 포맷팅해 반환합니다."""
+        completed, self.pending = self.pending, ""
+        return self._format_lines(completed)
+    
+    @staticmethod
+    def _format_lines(text: str) -> List[str]:
+        if not text.strip():
+            return []
+        formatted = FormattingService.format_response(text)
+        return [line for line in formatted.split('\n') if line.strip()]
@@ -0,0 +1,529 @@
+"""
+생성 요청 연속 배칭 모듈
+짧은 시간 창 안에 들어온 생성 요청을 모아 왼쪽 패딩 후 하나의 배치로 디코딩하고,
+끝난 시퀀스는 매 스텝마다 배치에서 빼내 해당 요청에 바로 결과를 돌려준다.
+디코딩 중에 들어온 같은 설정의 요청은 다음 스텝 경계에서 빈 자리에 합류한다.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import torch
+
+from .inference_executor import InferenceExecutor
+from .prefix_cache import PrefixKVCache
+
+
+@dataclass
+class GenerationRequest:
+    """배치에 들어가는 단일 생성 요청"""
+    input_ids: torch.Tensor                 # 1차원 프롬프트 토큰
+    max_new_tokens: int
+    sampling_key: Tuple                     # (do_sample, temperature, top_p, repetition_penalty, top_k)
+    eos_token_ids: Tuple[int, ...]
+    pad_token_id: int
+    future: asyncio.Future
+    loop: asyncio.AbstractEventLoop
+    prefix_key: Optional[Tuple] = None      # 공유 접두부 KV 캐시 키
+    enqueued_at: float = field(default_factory=time.monotonic)
+    cancelled: bool = False
+    generated: List[int] = field(default_factory=list)  # 지금까지 생성한 토큰 (추론 스레드에서만 갱신)
+
+
+@dataclass
+class _DecodeState:
+    """디코딩 중인 배치 상태 (행 순서 = rows 순서)"""
+    rows: List[GenerationRequest]
+    past: Any                               # KV 캐시 (Cache 객체 또는 레거시 튜플)
+    attention_mask: torch.Tensor            # (행 수, 캐시 길이 + 1)
+    positions: torch.Tensor                 # (행 수, 1) 다음 입력 토큰 위치
+    step_input: torch.Tensor                # (행 수, 1) 다음 입력 토큰
+    seen: Optional[torch.Tensor] = None     # 반복 패널티용 등장 토큰 마스크
+
+
+class _RunningGroup:
+    """
+    실행 중인 배치 그룹의 합류 대기열
+    수집 태스크(이벤트 루프)가 요청을 넣고, 디코딩 루프(추론 스레드)가 스텝 경계에서 꺼낸다.
+    """
+
+    def __init__(self, max_batch_size: int, initial_size: int, admission_seconds: Optional[float]):
+        """
+        Args:
+            max_batch_size: 그룹의 최대 동시 행 수
+            initial_size: 처음 prefill 하는 요청 수
+            admission_seconds: 그룹 시작 후 합류를 받는 시간(초, None이면 제한 없음)
+        """
+        self.max_batch_size = max_batch_size
+        self.deadline = time.monotonic() + admission_seconds if admission_seconds else float('inf')
+        self._lock = threading.Lock()
+        self._admissions: List[GenerationRequest] = []
+        self._active = initial_size
+        self._accepting = True
+        self.admitted: List[GenerationRequest] = []  # 디코딩 중 합류한 요청 (실패 시 예외 전달용)
+
+    def try_admit(self, request: GenerationRequest) -> bool:
+        """빈 자리가 있으면 합류 대기열에 넣습니다 (이벤트 루프에서 호출)."""
+        with self._lock:
+            if (not self._accepting or time.monotonic() >= self.deadline
+                    or self._active + len(self._admissions) >= self.max_batch_size):
+                return False
+            self._admissions.append(request)
+            return True
+
+    def take(self, free_slots: int, active: int) -> List[GenerationRequest]:
+        """
+        스텝 경계에서 합류할 요청을 꺼냅니다 (추론 스레드에서 호출).
+        실행 중인 행도 합류할 요청도 없으면 더 이상 받지 않도록 닫는다.
+        """
+        with self._lock:
+            taken = [request for request in self._admissions[:max(free_slots, 0)] if not request.cancelled]
+            del self._admissions[:max(free_slots, 0)]
+            self._active = active + len(taken)
+            self.admitted.extend(taken)
+            if not taken and active == 0 and not self._admissions:
+                self._accepting = False
+            return taken
+
+    def close(self) -> List[GenerationRequest]:
+        """합류를 막고 아직 꺼내지 않은 요청을 반환합니다."""
+        with self._lock:
+            self._accepting = False
+            leftover, self._admissions = self._admissions, []
+            return leftover
+
+
+class GenerationBatcher:
+    """
+    LLMService 앞단의 생성 배치 스케줄러
+
+    - batch_window_ms 동안 요청을 모아 샘플링 설정이 같은 요청끼리 한 배치로 실행
+    - KV 캐시를 쓰는 수동 디코딩 루프로 EOS/최대 길이에 도달한 행을 즉시 제거하고 결과 반환
+    - 같은 (샘플링 설정, 접두부) 그룹이 실행 중이면 새 요청은 다음 스텝 경계에서 빈 자리에 합류
+      (실행기 타임아웃 안에 끝나도록 그룹 시작 후 타임아웃의 절반까지만 합류를 받음)
+    - 배치 실행은 InferenceExecutor를 거치므로 동시 추론 수 제한이 그대로 적용됨
+    - 같은 접두부 키를 가진 요청은 접두부 KV 캐시에서 이어서 prefill
+    """
+
+    def __init__(self, model, tokenizer, executor: InferenceExecutor,
+                 max_batch_size: int = 4, batch_window_ms: float = 20.0,
+                 prefix_cache: Optional[PrefixKVCache] = None):
+        """
+        Args:
+            model: transformers CausalLM 모델
+            tokenizer: 모델 토크나이저
+            executor: 배치 실행에 사용할 추론 실행기
+            max_batch_size: 한 배치에 넣을 최대 요청 수
+            batch_window_ms: 첫 요청 이후 추가 요청을 기다리는 시간(ms)
+            prefix_cache: 고정 접두부 KV 캐시 (없으면 항상 전체 프롬프트 prefill)
+        """
+        self.model = model
+        self.tokenizer = tokenizer
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window_ms / 1000.0
+        self.prefix_cache = prefix_cache
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._collector_task: Optional[asyncio.Task] = None
+        self._group_tasks = set()  # 실행 중인 배치 태스크 (GC 방지)
+        self._running: Dict[Tuple, _RunningGroup] = {}  # 합류를 받는 실행 중 그룹
+
+        self.stats = {
+            'requests': 0,
+            'batches': 0,
+            'batched_requests': 0,
+            'max_batch_size_seen': 0,
+            'early_finished': 0,
+            'admitted_mid_decode': 0,
+            'decode_steps': 0
+        }
+
+    async def generate(self, input_ids: torch.Tensor, max_new_tokens: int = 256,
+                       temperature: float = 1.0, top_p: float = 1.0, do_sample: bool = False,
+                       repetition_penalty: float = 1.0, top_k: Optional[int] = None,
+                       eos_token_id=None, pad_token_id=None, timeout: Optional[float] = None, prefix_key: Optional[Tuple] = None,
+                       **unused_kwargs) -> torch.Tensor:
+        """
+        생성 요청을 배치 대기열에 넣고 결과를 기다립니다.
+
+        Args:
+            input_ids: (1, L) 또는 (L,) 프롬프트 토큰
+            max_new_tokens 등: model.generate와 같은 의미의 샘플링 설정
+            top_k: 지정하지 않으면 model.generate처럼 model.generation_config.top_k 사용 (0이면 미적용)
+            prefix_key: input_ids 앞부분에 해당하는 접두부 KV 캐시 키
+
+        Returns:
+            torch.Tensor: model.generate와 같은 (1, L + 생성 길이) 토큰 텐서
+        """
+        self._ensure_collector()
+        loop = asyncio.get_running_loop()
+
+        eos_ids = eos_token_id if isinstance(eos_token_id, (list, tuple)) else [eos_token_id]
+        eos_ids = tuple(t for t in eos_ids if t is not None) or (self.tokenizer.eos_token_id,)
+        if pad_token_id is None:
+            pad_token_id = eos_ids[0]
+        if top_k is None:
+            generation_config = getattr(self.model, 'generation_config', None)
+            top_k = getattr(generation_config, 'top_k', None) or 0
+
+        request = GenerationRequest(
+            input_ids=input_ids.reshape(-1).cpu(),
+            max_new_tokens=max_new_tokens,
+            sampling_key=(do_sample, float(temperature), float(top_p), float(repetition_penalty), int(top_k)),
+            eos_token_ids=eos_ids,
+            pad_token_id=pad_token_id,
+            future=loop.create_future(),
+            loop=loop,
+            prefix_key=prefix_key
+        )
+        self.stats['requests'] += 1
+        await self._queue.put(request)
+
+        timeout = self.executor.default_timeout if timeout is None else timeout
+        try:
+            return await asyncio.wait_for(asyncio.shield(request.future), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            # 디코딩 루프가 다음 스텝에서 이 행을 제거
+            request.cancelled = True
+            raise
+
+    async def stop(self):
+        """수집 태스크를 중지합니다."""
+        if self._collector_task is not None:
+            self._collector_task.cancel()
+            try:
+                await self._collector_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._collector_task = None
+
+    def get_stats(self) -> Dict:
+        """배치 통계를 반환합니다."""
+        return {
+            **self.stats,
+            'avg_batch_size': self.stats['batched_requests'] / max(self.stats['batches'], 1),
+            'pending': self._queue.qsize() if self._queue is not None else 0,
+            'running_groups': len(self._running),
+            'max_batch_size': self.max_batch_size,
+            'batch_window_ms': self.batch_window * 1000
+        }
+
+    def _ensure_collector(self):
+        """이벤트 루프 위에서 수집 태스크를 한 번만 시작합니다."""
+        if self._collector_task is None or self._collector_task.done():
+            self._queue = self._queue or asyncio.Queue()
+            self._collector_task = asyncio.create_task(self._collect_loop())
+
+    async def _collect_loop(self):
+        """시간 창 동안 요청을 모아 샘플링 설정별로 배치를 실행합니다."""
+        while True:
+            first = await self._queue.get()
+            if self._try_admit(first):
+                continue
+            pending = [first]
+            deadline = time.monotonic() + self.batch_window
+
+            while len(pending) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if not self._try_admit(request):
+                    pending.append(request)
+
+            groups: Dict[Tuple, List[GenerationRequest]] = {}
+            for request in pending:
+                if not request.cancelled:
+                    groups.setdefault((request.sampling_key, request.prefix_key), []).append(request)
+
+            for key, requests in groups.items():
+                task = asyncio.create_task(self._run_group(key, requests))
+                self._group_tasks.add(task)
+                task.add_done_callback(self._group_tasks.discard)
+
+    def _try_admit(self, request: GenerationRequest) -> bool:
+        """같은 설정의 그룹이 디코딩 중이면 합류 대기열에 넣습니다 (취소된 요청은 버림)."""
+        if request.cancelled:
+            return True
+        group = self._running.get((request.sampling_key, request.prefix_key))
+        return group is not None and group.try_admit(request)
+
+    async def _run_group(self, key: Tuple, requests: List[GenerationRequest]):
+        """한 배치를 추론 실행기에서 실행하고, 실패 시 남은 요청에 예외를 전달합니다."""
+        self.stats['batches'] += 1
+        self.stats['batched_requests'] += len(requests)
+        self.stats['max_batch_size_seen'] = max(self.stats['max_batch_size_seen'], len(requests))
+
+        timeout = self.executor.default_timeout
+        group = _RunningGroup(self.max_batch_size, len(requests), timeout / 2 if timeout else None)
+        self._running[key] = group
+        try:
+            await self.executor.submit(self._decode_batch, requests, group, cancellable=True)
+        except Exception as e:
+            logging.error(f"배치 생성 실패 ({len(requests) + len(group.admitted)}건): {str(e)}")
+            for request in requests + group.admitted:
+                if not request.future.done():
+                    request.future.set_exception(e)
+        finally:
+            if self._running.get(key) is group:
+                del self._running[key]
+            # 합류 대기 중이던 요청은 다시 대기열로 (다음 배치에서 처리)
+            for request in group.close():
+                self._queue.put_nowait(request)
+
+    def _decode_batch(self, requests: List[GenerationRequest], group: Optional["_RunningGroup"],
+                      cancel_event: threading.Event):
+        """
+        연속 배칭 디코딩 루프 (추론 스레드에서 실행)
+        - EOS/최대 길이/취소에 도달한 행은 결과를 돌려준 뒤 KV 캐시와 함께 배치에서 제거
+        - 스텝 사이마다 같은 그룹에 들어온 대기 요청을 빈 자리만큼 받아 따로 prefill 한 뒤,
+          KV 캐시를 왼쪽 패딩해 실행 중인 배치에 이어 붙임 (max_batch_size 이내)
+        """
+        sampling_key = requests[0].sampling_key
+
+        with torch.no_grad():
+            state = self._prefill(requests, sampling_key)
+
+            while not cancel_event.is_set():
+                if group is not None:
+                    admitted = group.take(self.max_batch_size - len(state.rows), active=len(state.rows))
+                    if admitted:
+                        self.stats['admitted_mid_decode'] += len(admitted)
+                        state = self._merge(state, self._prefill(admitted, sampling_key))
+                if not state.rows:
+                    break
+
+                outputs = self.model(
+                    input_ids=state.step_input,
+                    attention_mask=state.attention_mask,
+                    position_ids=state.positions,
+                    past_key_values=state.past,
+                    use_cache=True
+                )
+                state.past = outputs.past_key_values
+                self.stats['decode_steps'] += 1
+                self._advance(state, outputs.logits[:, -1, :].float(), sampling_key)
+
+        # 실행기 타임아웃 등으로 루프가 중단된 경우 남은 요청은 지금까지의 결과로 종료
+        for request in state.rows:
+            self._resolve(request, request.generated)
+
+    def _prefill(self, requests: List[GenerationRequest], sampling_key: Tuple) -> "_DecodeState":
+        """
+        요청들을 왼쪽 패딩해 한 번에 prefill 하고 첫 토큰까지 고른 디코딩 상태를 만듭니다.
+        공유 접두부가 있으면 [접두부 KV][패딩][가변 부분] 배치로 가변 부분만 prefill 한다.
+        """
+        device = self.model.device
+        repetition_penalty = sampling_key[3]
+        batch_size = len(requests)
+        prefix_len, past_key_values = self._prefix_past(requests)
+        bodies = [r.input_ids[prefix_len:] for r in requests]
+        max_len = max(len(body) for body in bodies)
+
+        input_ids = torch.full((batch_size, max_len), requests[0].pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros((batch_size, prefix_len + max_len), dtype=torch.long)
+        attention_mask[:, :prefix_len] = 1
+        for row, body in enumerate(bodies):
+            length = len(body)
+            input_ids[row, max_len - length:] = body
+            attention_mask[row, prefix_len + max_len - length:] = 1
+
+        input_ids = input_ids.to(device)
+        attention_mask = attention_mask.to(device)
+        position_ids = (attention_mask.cumsum(-1) - 1).clamp(min=0)[:, prefix_len:]
+
+        # 반복 패널티용 등장 토큰 마스크 (패딩 제외)
+        seen = None
+        if repetition_penalty != 1.0:
+            seen = torch.zeros((batch_size, self.model.config.vocab_size), dtype=torch.bool, device=device)
+            for row, request in enumerate(requests):
+                seen[row, request.input_ids.to(device)] = True
+
+        outputs = self.model(
+            input_ids=input_ids,
+            attention_mask=attention_mask,
+            position_ids=position_ids,
+            past_key_values=past_key_values,
+            use_cache=True
+        )
+        state = _DecodeState(
+            rows=list(requests),
+            past=outputs.past_key_values,
+            attention_mask=attention_mask,
+            positions=position_ids[:, -1:],
+            step_input=input_ids[:, -1:],
+            seen=seen
+        )
+        self._advance(state, outputs.logits[:, -1, :].float(), sampling_key)
+        return state
+
+    def _advance(self, state: "_DecodeState", logits: torch.Tensor, sampling_key: Tuple):
+        """다음 토큰을 고르고, 끝난 행은 결과를 돌려준 뒤 KV 캐시와 함께 상태에서 제거합니다."""
+        device = logits.device
+        do_sample, temperature, top_p, repetition_penalty, top_k = sampling_key
+        next_tokens = self._sample(logits, state.seen, do_sample, temperature, top_p, repetition_penalty, top_k)
+        if state.seen is not None:
+            state.seen[torch.arange(len(state.rows), device=device), next_tokens] = True
+
+        keep_rows = []
+        for row, request in enumerate(state.rows):
+            token = int(next_tokens[row])
+            request.generated.append(token)
+            finished = (token in request.eos_token_ids
+                        or len(request.generated) >= request.max_new_tokens
+                        or request.cancelled)
+            if finished:
+                if len(state.rows) > 1:
+                    self.stats['early_finished'] += 1
+                self._resolve(request, request.generated)
+            else:
+                keep_rows.append(row)
+
+        state.attention_mask = torch.cat(
+            [state.attention_mask,
+             torch.ones((len(state.rows), 1), dtype=state.attention_mask.dtype, device=state.attention_mask.device)],
+            dim=-1)
+        state.positions = state.positions[:, -1:] + 1
+        state.step_input = next_tokens.unsqueeze(-1)
+
+        if len(keep_rows) < len(state.rows):
+            if not keep_rows:
+                state.rows = []
+                return
+            index = torch.tensor(keep_rows, device=state.step_input.device)
+            state.rows = [state.rows[row] for row in keep_rows]
+            state.step_input = state.step_input.index_select(0, index)
+            state.positions = state.positions.index_select(0, index)
+            state.attention_mask = state.attention_mask.index_select(0, index)
+            if state.seen is not None:
+                state.seen = state.seen.index_select(0, index)
+            state.past = self._select_cache(state.past, index)
+
+    def _merge(self, running: "_DecodeState", admitted: "_DecodeState") -> "_DecodeState":
+        """
+        실행 중인 배치에 새로 prefill 한 행을 이어 붙입니다.
+        KV 캐시 길이가 짧은 쪽을 왼쪽에 0으로 채우고 attention mask도 같은 만큼 0으로 채운다
+        (위치 정보는 캐시된 키에 이미 반영되어 있고, 행별 position_ids는 그대로 유지).
+        """
+        if not admitted.rows:
+            return running
+        if not running.rows:
+            return admitted
+
+        running_layers = self._legacy_cache(running.past)
+        admitted_layers = self._legacy_cache(admitted.past)
+        running_len = running_layers[0][0].shape[2]
+        admitted_len = admitted_layers[0][0].shape[2]
+        cache_len = max(running_len, admitted_len)
+
+        def pad_left(tensor: torch.Tensor, length: int) -> torch.Tensor:
+            if length == cache_len:
+                return tensor
+            return torch.nn.functional.pad(tensor, (0, 0, cache_len - length, 0))
+
+        layers = tuple(
+            (torch.cat([pad_left(rk, running_len), pad_left(ak, admitted_len)], dim=0),
+             torch.cat([pad_left(rv, running_len), pad_left(av, admitted_len)], dim=0))
+            for (rk, rv), (ak, av) in zip(running_layers, admitted_layers)
+        )
+        attention_mask = torch.cat([
+            torch.nn.functional.pad(running.attention_mask, (cache_len - running_len, 0)),
+            torch.nn.functional.pad(admitted.attention_mask, (cache_len - admitted_len, 0))
+        ], dim=0)
+
+        return _DecodeState(
+            rows=running.rows + admitted.rows,
+            past=self._as_cache(layers),
+            attention_mask=attention_mask,
+            positions=torch.cat([running.positions, admitted.positions], dim=0),
+            step_input=torch.cat([running.step_input, admitted.step_input], dim=0),
+            seen=torch.cat([running.seen, admitted.seen], dim=0) if running.seen is not None else None
+        )
+
+    def _prefix_past(self, requests: List[GenerationRequest]):
+        """배치 전체가 같은 접두부로 시작하면 (접두부 길이, 배치 크기 KV 캐시)를, 아니면 (0, None)을 반환합니다."""
+        key = requests[0].prefix_key
+        if key is None or self.prefix_cache is None:
+            return 0, None
+        entry = self.prefix_cache.get_entry(key)
+        if entry is None or not all(self.prefix_cache.matches(entry, r.input_ids) for r in requests):
+            return 0, None
+        return self.prefix_cache.past_for(key, requests[0].input_ids, batch_size=len(requests))
+
+    def _sample(self, logits: torch.Tensor, seen: Optional[torch.Tensor], do_sample: bool,
+                temperature: float, top_p: float, repetition_penalty: float, top_k: int = 0) -> torch.Tensor:
+        """반복 패널티, temperature, top-k, top-p를 model.generate와 같은 순서로 적용해 다음 토큰을 고릅니다."""
+        if seen is not None:
+            penalized = torch.where(logits < 0, logits * repetition_penalty, logits / repetition_penalty)
+            logits = torch.where(seen, penalized, logits)
+
+        if not do_sample:
+            return logits.argmax(dim=-1)
+
+        if temperature > 0 and temperature != 1.0:
+            logits = logits / temperature
+
+        if 0 < top_k < logits.size(-1):
+            # 상위 top_k개 로짓보다 작은 토큰 제외 (동점은 유지, TopKLogitsWarper와 동일)
+            kth_logits = torch.topk(logits, top_k, dim=-1).values[..., -1:]
+            logits = logits.masked_fill(logits < kth_logits, float('-inf'))
+
+        if top_p < 1.0:
+            sorted_logits, sorted_indices = torch.sort(logits, descending=True)
+            sorted_probs = torch.softmax(sorted_logits, dim=-1)
+            cumulative = sorted_probs.cumsum(dim=-1)
+            # 누적 확률이 top_p를 넘기 전까지의 토큰만 유지 (최소 1개)
+            sorted_remove = (cumulative - sorted_probs) > top_p
+            sorted_logits = sorted_logits.masked_fill(sorted_remove, float('-inf'))
+            logits = torch.full_like(logits, float('-inf')).scatter(-1, sorted_indices, sorted_logits)
+
+        probs = torch.softmax(logits, dim=-1)
+        return torch.multinomial(probs, num_samples=1).squeeze(-1)
+
+    def _select_cache(self, past_key_values, index: torch.Tensor):
+        """KV 캐시에서 남은 행만 선택합니다 (Cache 객체/레거시 튜플 모두 지원)."""
+        if hasattr(past_key_values, 'batch_select_indices'):
+            past_key_values.batch_select_indices(index)
+            return past_key_values
+        return tuple(
+            tuple(tensor.index_select(0, index) for tensor in layer)
+            for layer in past_key_values
+        )
+
+    @staticmethod
+    def _legacy_cache(past_key_values) -> Tuple[Tuple[torch.Tensor, torch.Tensor], ...]:
+        """KV 캐시를 레이어별 (key, value) 텐서 튜플로 변환합니다 ((batch, heads, length, dim))."""
+        if hasattr(past_key_values, 'to_legacy_cache'):
+            past_key_values = past_key_values.to_legacy_cache()
+        elif hasattr(past_key_values, 'layers'):
+            past_key_values = [(layer.keys, layer.values) for layer in past_key_values.layers]
+        return tuple((layer[0], layer[1]) for layer in past_key_values)
+
+    @staticmethod
+    def _as_cache(layers: tuple):
+        """레이어별 (key, value) 텐서를 forward에 넘길 캐시 객체로 만듭니다."""
+        try:
+            from transformers import DynamicCache
+        except ImportError:
+            return layers
+        if hasattr(DynamicCache, 'from_legacy_cache'):
+            return DynamicCache.from_legacy_cache(layers)
+        return DynamicCache(layers)
+
+    def _resolve(self, request: GenerationRequest, new_tokens: List[int]):
+        """생성 결과를 요청의 이벤트 루프로 전달합니다 (프롬프트 + 생성 토큰)."""
+        sequence = torch.cat([request.input_ids, torch.tensor(new_tokens, dtype=torch.long)]).unsqueeze(0)
+
+        def _set_result():
+            if not request.future.done():
+                request.future.set_result(sequence)
+
+        request.loop.call_soon_threadsafe(_set_result)
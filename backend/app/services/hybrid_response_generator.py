@@ -6,10 +6,10 @@ DB 정확성과 LLM 자연스러움을 결합한 고품질 응답 생성 시스
 import logging
 from typing import Dict, List, Optional, Tuple
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from transformers import AutoTokenizer, AutoModelForCausalLM
 import torch
 import os
 import re
+from .model_runtime import get_model_runtime
 
 class HybridResponseGenerator:
     """
@@ -36,13 +36,11 @@ class HybridResponseGenerator:
                                     "models", "Llama-3.1-8B-Instruct")
             
             if os.path.exists(model_path):
-                self.tokenizer = AutoTokenizer.from_pretrained(model_path)
-                self.model = AutoModelForCausalLM.from_pretrained(
-                    model_path,
-                    torch_dtype=torch.float16,
-                    device_map="auto",
-                    trust_remote_code=True
-                )
+                # LLMService와 같은 가중치를 공유 (별도 로드 없음)
+                self.model_handle = get_model_runtime().acquire(
+                    model_path, consumer="hybrid_response_generator", torch_dtype=torch.float16)
+                self.tokenizer = self.model_handle.tokenizer
+                self.model = self.model_handle.model
                 self.llm_available = True
                 logging.info("✅ 하이브리드 응답 생성기 LLM 모델 로딩 완료")
             else:
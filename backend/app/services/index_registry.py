@@ -0,0 +1,256 @@
+"""
+MongoDB 인덱스 레지스트리 모듈
+자주 쓰는 조회가 사용하는 인덱스를 한곳에 선언하고, 애플리케이션 시작 시 멱등하게 적용한다.
+- 이미 같은 키/옵션의 인덱스가 있으면 그대로 둠 (이름이 달라도 같은 키 패턴이면 존재로 취급)
+- TTL(expireAfterSeconds)만 다르면 collMod로 갱신, 그 외 옵션이 다르면 충돌로 보고만 하고 삭제하지 않음
+- 생성 실패(기존 데이터의 유일성 위반 등)는 시작을 막지 않고 보고서에 남김
+관리자 API는 inspect_indexes로 누락/미사용/미등록 인덱스를 확인한다 ($indexStats).
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING, DESCENDING, TEXT
+from pymongo.errors import PyMongoError
+
+from ..config import settings
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """선언형 인덱스 정의"""
+    collection: str
+    keys: Tuple[Tuple[str, Any], ...]
+    name: str
+    unique: bool = False
+    expire_after_seconds: Optional[int] = None             # TTL 인덱스
+    partial_filter: Optional[Dict[str, Any]] = None        # 부분 인덱스 (필드가 있는 문서만 유일성 검사 등)
+    options: Dict[str, Any] = field(default_factory=dict)  # default_language 등 기타 create_index 옵션
+    description: str = ""
+
+    def create_kwargs(self) -> Dict[str, Any]:
+        """create_index에 넘길 옵션"""
+        kwargs = {"name": self.name, **self.options}
+        if self.unique:
+            kwargs["unique"] = True
+        if self.expire_after_seconds is not None:
+            kwargs["expireAfterSeconds"] = self.expire_after_seconds
+        if self.partial_filter is not None:
+            kwargs["partialFilterExpression"] = self.partial_filter
+        return kwargs
+
+
+# 문자열 필드가 있는 문서만 유일성 검사 (필드가 없는 문서끼리 null 중복으로 충돌하지 않도록)
+def _has_string(field_name: str) -> Dict[str, Any]:
+    return {field_name: {"$type": "string"}}
+
+
+INDEX_REGISTRY: List[IndexSpec] = [
+    # 패턴 후보 $text 검색 (인메모리 색인이 준비되지 않았을 때의 대체 경로)
+    IndexSpec("context_patterns", (("pattern", TEXT),), "pattern_text",
+              options={"default_language": "none"},
+              description="context_patterns $text 후보 검색"),
+
+    # 대화 맥락(Clarification) 세션 조회 + 마지막 갱신 후 세션 유지 시간이 지나면 자동 삭제
+    IndexSpec("conversation_contexts", (("session_id", ASCENDING),), "session_id_unique", unique=True,
+              description="conversation_contexts session_id 조회/갱신"),
+    IndexSpec("conversation_contexts", (("updated_at", ASCENDING),), "updated_at_ttl",
+              expire_after_seconds=settings.CLARIFICATION_SESSION_TTL_SECONDS,
+              description="만료된 Clarification 세션 자동 삭제 (TTL)"),
+
+    # 로그인 세션: 토큰 조회 + 만료 시각에 자동 삭제
+    IndexSpec("sessions", (("access_token", ASCENDING),), "access_token_unique", unique=True,
+              description="verify_token/logout 토큰 조회"),
+    IndexSpec("sessions", (("expires_at", ASCENDING),), "expires_at_ttl", expire_after_seconds=0,
+              description="만료된 세션 자동 삭제 (TTL)"),
+
+    # 사용자 조회
+    IndexSpec("users", (("id", ASCENDING),), "id_unique", unique=True,
+              partial_filter=_has_string("id"),
+              description="verify_token/권한 조회"),
+    IndexSpec("users", (("email", ASCENDING),), "email_unique", unique=True,
+              partial_filter=_has_string("email"),
+              description="이메일 로그인/중복 확인 (자동 로그인 사용자는 이메일 없음)"),
+    IndexSpec("users", (("username", ASCENDING), ("company", ASCENDING)), "username_company",
+              description="수동/자동 로그인 사용자 조회, 사용자명 중복 확인"),
+
+    # 입력 분류 키워드 카테고리
+    IndexSpec("input_keywords", (("category", ASCENDING),), "category_unique", unique=True,
+              description="카테고리별 키워드 조회/갱신"),
+
+    # 상담 분석 기간 조회 (범위 + 최신순 정렬, 같은 시각은 _id로 이어지는 keyset 페이지네이션)
+    IndexSpec("conversations", (("consultation_start_time", DESCENDING), ("_id", DESCENDING)),
+              "consultation_start_time_-1__id_-1",
+              description="api/analysis 기간 검색/분석, 목록 커서 페이지네이션"),
+
+    # 가져오기 스크립트의 질문+답변 해시 중복 방지
+    IndexSpec("knowledge_base", (("hash", ASCENDING),), "hash_unique", unique=True,
+              partial_filter=_has_string("hash"),
+              description="import 스크립트 중복 데이터 방지"),
+
+    # 도메인 키워드 조회
+    IndexSpec("keyword_frequencies", (("is_domain", ASCENDING), ("count", DESCENDING)), "is_domain_count",
+              description="도메인 키워드 목록 조회"),
+]
+
+
+def _normalize_keys(keys) -> Tuple[Tuple[str, Any], ...]:
+    """인덱스 키 패턴을 비교 가능한 형태로 바꿉니다 (text 인덱스는 _fts/_ftsx로 저장됨)."""
+    items = list(keys.items()) if isinstance(keys, dict) else list(keys)
+    if any(direction == TEXT for _, direction in items) or any(name == "_fts" for name, _ in items):
+        return (("_fts", "text"),)
+    return tuple((name, int(direction) if isinstance(direction, (int, float)) else direction)
+                 for name, direction in items)
+
+
+def _find_existing(spec: IndexSpec, existing: Dict[str, Dict]) -> Optional[Dict]:
+    """같은 이름 또는 같은 키 패턴의 기존 인덱스를 찾습니다."""
+    if spec.name in existing:
+        return existing[spec.name]
+    spec_keys = _normalize_keys(spec.keys)
+    for info in existing.values():
+        if _normalize_keys(info.get("key", {})) == spec_keys:
+            return info
+    return None
+
+
+def _option_differences(spec: IndexSpec, info: Dict) -> Dict[str, Tuple[Any, Any]]:
+    """선언과 기존 인덱스의 옵션 차이 {옵션: (선언 값, 현재 값)}"""
+    differences = {}
+    if _normalize_keys(spec.keys) != _normalize_keys(info.get("key", {})):
+        differences["key"] = (list(spec.keys), list(info.get("key", {}).items()))
+    if spec.unique != bool(info.get("unique", False)):
+        differences["unique"] = (spec.unique, bool(info.get("unique", False)))
+    if spec.expire_after_seconds != info.get("expireAfterSeconds"):
+        differences["expireAfterSeconds"] = (spec.expire_after_seconds, info.get("expireAfterSeconds"))
+    if spec.partial_filter != info.get("partialFilterExpression"):
+        differences["partialFilterExpression"] = (spec.partial_filter, info.get("partialFilterExpression"))
+    return differences
+
+
+async def _list_indexes(collection) -> Dict[str, Dict]:
+    """컬렉션 인덱스를 이름별로 조회합니다 (컬렉션이 없으면 빈 dict)."""
+    indexes = {}
+    async for info in collection.list_indexes():
+        indexes[info["name"]] = dict(info)
+    return indexes
+
+
+async def ensure_indexes(db, specs: Optional[List[IndexSpec]] = None,
+                         collection: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    선언된 인덱스를 멱등하게 적용하고 인덱스별 결과를 반환합니다.
+
+    Args:
+        db: Motor 데이터베이스
+        specs: 적용할 인덱스 목록 (기본: INDEX_REGISTRY)
+        collection: 지정하면 해당 컬렉션의 인덱스만 적용
+
+    Returns:
+        List[Dict]: {collection, name, status, ...} status는 exists/created/updated/conflict/failed
+    """
+    specs = [spec for spec in (specs or INDEX_REGISTRY) if collection is None or spec.collection == collection]
+    existing_by_collection: Dict[str, Dict[str, Dict]] = {}
+    report = []
+
+    for spec in specs:
+        entry = {"collection": spec.collection, "name": spec.name}
+        try:
+            if spec.collection not in existing_by_collection:
+                existing_by_collection[spec.collection] = await _list_indexes(db[spec.collection])
+            info = _find_existing(spec, existing_by_collection[spec.collection])
+
+            if info is None:
+                await db[spec.collection].create_index(list(spec.keys), **spec.create_kwargs())
+                entry["status"] = "created"
+                logging.info(f"✅ 인덱스 생성: {spec.collection}.{spec.name}")
+            else:
+                differences = _option_differences(spec, info)
+                if not differences:
+                    entry["status"] = "exists"
+                elif set(differences) == {"expireAfterSeconds"} and info.get("expireAfterSeconds") is not None:
+                    # TTL 값만 다르면 인덱스를 다시 만들지 않고 갱신
+                    await db.command("collMod", spec.collection, index={
+                        "name": info["name"],
+                        "expireAfterSeconds": spec.expire_after_seconds
+                    })
+                    entry["status"] = "updated"
+                    logging.info(f"✅ TTL 인덱스 갱신: {spec.collection}.{info['name']} ({spec.expire_after_seconds}초)")
+                else:
+                    entry["status"] = "conflict"
+                    entry["existing_name"] = info["name"]
+                    entry["differences"] = {key: {"declared": declared, "current": current}
+                                            for key, (declared, current) in differences.items()}
+                    logging.warning(f"⚠️ 인덱스 선언과 다름 ({spec.collection}.{info['name']}), "
+                                    f"수동 확인 필요: {list(differences)}")
+
+        except PyMongoError as e:
+            entry["status"] = "failed"
+            entry["error"] = str(e)
+            logging.error(f"인덱스 적용 실패 ({spec.collection}.{spec.name}): {str(e)}")
+
+        report.append(entry)
+
+    summary: Dict[str, int] = {}
+    for entry in report:
+        summary[entry["status"]] = summary.get(entry["status"], 0) + 1
+    logging.info(f"인덱스 부트스트랩 완료: {summary}")
+    return report
+
+
+async def inspect_indexes(db, specs: Optional[List[IndexSpec]] = None) -> Dict[str, Any]:
+    """
+    레지스트리와 실제 인덱스를 비교하고 $indexStats 사용량을 함께 보고합니다.
+
+    Returns:
+        Dict: collections별 {missing, unused, unregistered, indexes}
+              unused는 통계 수집 시작(since) 이후 사용 횟수가 0인 인덱스 (_id_ 제외)
+    """
+    specs = specs or INDEX_REGISTRY
+    registered: Dict[str, List[IndexSpec]] = {}
+    for spec in specs:
+        registered.setdefault(spec.collection, []).append(spec)
+
+    report: Dict[str, Any] = {}
+    for collection_name, collection_specs in registered.items():
+        collection = db[collection_name]
+        entry: Dict[str, Any] = {"missing": [], "unused": [], "unregistered": [], "indexes": []}
+        try:
+            existing = await _list_indexes(collection)
+            usage = {}
+            async for stat in collection.aggregate([{"$indexStats": {}}]):
+                accesses = stat.get("accesses", {})
+                usage[stat["name"]] = {"ops": int(accesses.get("ops", 0)), "since": accesses.get("since")}
+
+            matched_names = set()
+            for spec in collection_specs:
+                info = _find_existing(spec, existing)
+                if info is None:
+                    entry["missing"].append(spec.name)
+                else:
+                    matched_names.add(info["name"])
+
+            for name, info in existing.items():
+                stats = usage.get(name, {"ops": 0, "since": None})
+                entry["indexes"].append({
+                    "name": name,
+                    "key": dict(info.get("key", {})),
+                    "ops": stats["ops"],
+                    "since": stats["since"],
+                    "registered": name in matched_names
+                })
+                if name == "_id_":
+                    continue
+                if stats["ops"] == 0:
+                    entry["unused"].append(name)
+                if name not in matched_names:
+                    entry["unregistered"].append(name)
+
+        except PyMongoError as e:
+            entry["error"] = str(e)
+            logging.error(f"인덱스 사용량 조회 실패 ({collection_name}): {str(e)}")
+
+        report[collection_name] = entry
+
+    return report
@@ -0,0 +1,182 @@
+"""
+인덱스 스냅샷 모듈
+상주 색인(패턴 TF-IDF 행렬, IDF, 어휘, 문서 목록)을 버전이 붙은 디스크 스냅샷으로 저장하고
+부팅 시 np.load(mmap_mode='r')로 매핑해 재벡터화 없이 불러온다.
+스냅샷은 컬렉션 변경 토큰과 함께 저장되어, 토큰이 현재 컬렉션과 다르면 사용하지 않는다.
+
+디렉터리 구조:
+    {root}/{name}/CURRENT              현재 스냅샷 id (원자적 교체)
+    {root}/{name}/{snapshot_id}/manifest.json
+    {root}/{name}/{snapshot_id}/{array}.npy
+    {root}/{name}/{snapshot_id}/docs.json
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from bson import json_util
+
+# 스냅샷 파일 형식 버전 (형식이 바뀌면 올려서 이전 스냅샷을 무시)
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+@dataclass
+class IndexSnapshot:
+    """불러온 스냅샷"""
+    snapshot_id: str
+    token: str
+    arrays: Dict[str, np.ndarray]   # 읽기 전용 메모리 매핑 배열
+    meta: Dict[str, Any]
+    docs: List[Dict]
+    load_ms: float
+
+
+async def collection_change_token(collection, text_field: str, extra: Optional[Dict] = None) -> str:
+    """
+    컬렉션 상태를 요약한 변경 토큰을 만듭니다 (문서 전체를 읽지 않는 집계 한 번).
+    문서 수, 최대 _id, 최대 updated_at/created_at, 텍스트 필드 전체 길이를 합쳐
+    추가/삭제/수정이 있으면 토큰이 달라지도록 한다.
+
+    Args:
+        collection: Motor 컬렉션
+        text_field: 색인 대상 텍스트 필드 (수정 감지용 길이 합)
+        extra: 토큰에 함께 넣을 설정 값 (벡터라이저 설정 등)
+    """
+    result = await collection.aggregate([
+        {"$group": {
+            "_id": None,
+            "count": {"$sum": 1},
+            "max_id": {"$max": "$_id"},
+            "max_updated": {"$max": "$updated_at"},
+            "max_created": {"$max": "$created_at"},
+            "text_length": {"$sum": {"$strLenCP": {"$ifNull": [f"${text_field}", ""]}}}
+        }}
+    ]).to_list(length=1)
+
+    state = result[0] if result else {}
+    state.pop("_id", None)
+    payload = json_util.dumps({
+        "format": SNAPSHOT_FORMAT_VERSION,
+        "state": state,
+        "extra": extra or {}
+    }, sort_keys=True)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class IndexSnapshotStore:
+    """이름별 색인 스냅샷 저장소"""
+
+    def __init__(self, root: str, keep: int = 2):
+        """
+        Args:
+            root: 스냅샷 루트 디렉터리
+            keep: 이름별로 남겨둘 스냅샷 수 (다른 워커가 매핑 중일 수 있어 직전 것도 유지)
+        """
+        self.root = root
+        self.keep = max(keep, 1)
+
+    def save(self, name: str, token: str, arrays: Dict[str, np.ndarray],
+             meta: Optional[Dict] = None, docs: Optional[List[Dict]] = None) -> Optional[str]:
+        """
+        스냅샷을 임시 디렉터리에 쓴 뒤 이름을 바꾸고 CURRENT를 교체합니다.
+        실패해도 서비스에는 영향이 없도록 None을 반환합니다.
+        """
+        base = os.path.join(self.root, name)
+        snapshot_id = f"{int(time.time() * 1000)}-{os.getpid()}"
+        tmp_path = os.path.join(base, f".{snapshot_id}.tmp")
+        final_path = os.path.join(base, snapshot_id)
+
+        try:
+            os.makedirs(tmp_path, exist_ok=True)
+            for key, array in arrays.items():
+                np.save(os.path.join(tmp_path, f"{key}.npy"), np.ascontiguousarray(array), allow_pickle=False)
+
+            with open(os.path.join(tmp_path, "docs.json"), 'w', encoding='utf-8') as f:
+                f.write(json_util.dumps(docs or []))
+
+            manifest = {
+                "format": SNAPSHOT_FORMAT_VERSION,
+                "token": token,
+                "created_at": time.time(),
+                "arrays": sorted(arrays.keys()),
+                "meta": meta or {}
+            }
+            with open(os.path.join(tmp_path, "manifest.json"), 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False)
+
+            os.rename(tmp_path, final_path)
+            current_tmp = os.path.join(base, f".CURRENT.{snapshot_id}")
+            with open(current_tmp, 'w', encoding='utf-8') as f:
+                f.write(snapshot_id)
+            os.replace(current_tmp, os.path.join(base, "CURRENT"))
+
+            self._prune(base, snapshot_id)
+            logging.info(f"✅ 색인 스냅샷 저장: {name}/{snapshot_id}")
+            return snapshot_id
+
+        except Exception as e:
+            logging.error(f"색인 스냅샷 저장 실패 ({name}): {str(e)}")
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            return None
+
+    def load(self, name: str, token: str) -> Optional[IndexSnapshot]:
+        """현재 스냅샷을 메모리 매핑으로 불러옵니다. 없거나 토큰/형식이 다르면 None."""
+        start_time = time.time()
+        base = os.path.join(self.root, name)
+        try:
+            current_file = os.path.join(base, "CURRENT")
+            if not os.path.exists(current_file):
+                return None
+            with open(current_file, 'r', encoding='utf-8') as f:
+                snapshot_id = f.read().strip()
+
+            path = os.path.join(base, snapshot_id)
+            with open(os.path.join(path, "manifest.json"), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+
+            if manifest.get("format") != SNAPSHOT_FORMAT_VERSION:
+                logging.info(f"색인 스냅샷 형식 불일치 ({name}), 새로 구성합니다")
+                return None
+            if manifest.get("token") != token:
+                logging.info(f"색인 스냅샷이 컬렉션과 다름 ({name}), 새로 구성합니다")
+                return None
+
+            arrays = {
+                key: np.load(os.path.join(path, f"{key}.npy"), mmap_mode='r', allow_pickle=False)
+                for key in manifest.get("arrays", [])
+            }
+            with open(os.path.join(path, "docs.json"), 'r', encoding='utf-8') as f:
+                docs = json_util.loads(f.read())
+
+            load_ms = (time.time() - start_time) * 1000
+            logging.info(f"✅ 색인 스냅샷 로드: {name}/{snapshot_id} ({len(docs)}개 문서, {load_ms:.1f}ms)")
+            return IndexSnapshot(
+                snapshot_id=snapshot_id,
+                token=token,
+                arrays=arrays,
+                meta=manifest.get("meta", {}),
+                docs=docs,
+                load_ms=load_ms
+            )
+
+        except Exception as e:
+            logging.warning(f"색인 스냅샷 로드 실패 ({name}), 새로 구성합니다: {str(e)}")
+            return None
+
+    def _prune(self, base: str, current_id: str):
+        """오래된 스냅샷을 정리합니다 (현재 포함 keep개 유지)."""
+        snapshot_ids = sorted(
+            (entry for entry in os.listdir(base)
+             if not entry.startswith('.') and entry != "CURRENT" and os.path.isdir(os.path.join(base, entry))),
+            key=lambda entry: int(entry.split('-', 1)[0]) if entry.split('-', 1)[0].isdigit() else 0
+        )
+        stale = [entry for entry in snapshot_ids if entry != current_id][:-(self.keep - 1) or None]
+        for entry in stale:
+            shutil.rmtree(os.path.join(base, entry), ignore_errors=True)
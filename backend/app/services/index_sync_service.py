@@ -0,0 +1,248 @@
+"""
+인덱스 동기화 서비스 모듈
+MongoDB change stream을 구독해 인메모리 색인(knowledge_base 역색인, context_patterns 벡터)을
+삽입/수정/삭제 단위로 갱신한다.
+replica set이 아닌 단독 mongod에서는 updated_at/created_at 기준 폴링과 _id 집합 비교로 대체한다.
+"""
+
+import asyncio
+import inspect
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure, PyMongoError
+
+# 문서 추가/수정 핸들러와 삭제 핸들러 타입
+UpsertHandler = Callable[[Dict], Any]
+DeleteHandler = Callable[[Any], Any]
+
+# change stream 미지원 오류 코드 (단독 mongod: 40573, 기타 미지원 환경: 303)
+CHANGE_STREAM_UNSUPPORTED_CODES = {40573, 303}
+
+
+class IndexSyncService:
+    """컬렉션 변경을 인메모리 색인에 반영하는 구독자"""
+
+    def __init__(self, db: AsyncIOMotorDatabase, poll_interval: float = 10.0,
+                 poll_overlap: float = 5.0, id_scan_every: int = 6):
+        """
+        Args:
+            db: MongoDB 데이터베이스 연결 인스턴스
+            poll_interval: 폴링 모드에서 변경 확인 주기(초)
+            poll_overlap: 폴링 시 마지막 확인 시각보다 이만큼(초) 앞에서부터 다시 조회
+                          (같은 ms/다른 서버 시계/늦게 커밋된 쓰기의 타임스탬프가 last_seen 이하여도 놓치지 않도록)
+            id_scan_every: 몇 번의 폴링마다 _id 전체 집합을 비교할지 (컬렉션 전체 _id를 읽으므로 드물게)
+        """
+        self.db = db
+        self.poll_interval = poll_interval
+        self.poll_overlap = timedelta(seconds=poll_overlap)
+        self.id_scan_every = max(id_scan_every, 1)
+
+        self.handlers: Dict[str, List[Dict[str, Callable]]] = {}
+        self.tasks: Dict[str, asyncio.Task] = {}
+        self.modes: Dict[str, str] = {}
+        self.is_running = False
+
+        self.stats = {
+            'upserts_applied': 0,
+            'deletes_applied': 0,
+            'handler_errors': 0,
+            'poll_cycles': 0,
+            'id_scans': 0
+        }
+
+    def register(self, collection_name: str, on_upsert: UpsertHandler, on_delete: DeleteHandler):
+        """
+        컬렉션 변경 핸들러를 등록합니다.
+
+        Args:
+            collection_name: 구독할 컬렉션명
+            on_upsert: 삽입/수정된 전체 문서를 받는 핸들러 (sync 또는 async)
+            on_delete: 삭제된 문서 _id를 받는 핸들러 (sync 또는 async)
+        """
+        self.handlers.setdefault(collection_name, []).append({
+            'upsert': on_upsert,
+            'delete': on_delete
+        })
+
+    async def start(self):
+        """등록된 컬렉션마다 구독 태스크를 시작합니다."""
+        if self.is_running:
+            return
+        self.is_running = True
+        for collection_name in self.handlers:
+            self.tasks[collection_name] = asyncio.create_task(self._watch_collection(collection_name))
+        logging.info(f"✅ 인덱스 동기화 시작: {list(self.handlers.keys())}")
+
+    async def stop(self):
+        """구독 태스크를 모두 중지합니다."""
+        self.is_running = False
+        for task in self.tasks.values():
+            task.cancel()
+        for task in self.tasks.values():
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self.tasks.clear()
+        logging.info("인덱스 동기화 중지 완료")
+
+    def get_stats(self) -> Dict:
+        """동기화 통계를 반환합니다."""
+        return {
+            **self.stats,
+            'is_running': self.is_running,
+            'modes': dict(self.modes)
+        }
+
+    async def _watch_collection(self, collection_name: str):
+        """change stream으로 구독하고, 지원되지 않으면 폴링으로 전환합니다."""
+        collection = self.db[collection_name]
+        resume_token = None
+
+        while self.is_running:
+            try:
+                async with collection.watch(full_document='updateLookup', resume_after=resume_token) as stream:
+                    self.modes[collection_name] = 'change_stream'
+                    logging.info(f"🔔 change stream 구독: {collection_name}")
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        await self._apply_change(collection_name, change)
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if e.code in CHANGE_STREAM_UNSUPPORTED_CODES:
+                    logging.warning(f"change stream 미지원 ({collection_name}), 폴링 모드로 전환: {e}")
+                    await self._poll_collection(collection_name)
+                    return
+                logging.error(f"change stream 오류 ({collection_name}): {e}")
+                resume_token = None
+                await asyncio.sleep(self.poll_interval)
+            except PyMongoError as e:
+                logging.error(f"change stream 연결 오류 ({collection_name}): {e}")
+                await asyncio.sleep(self.poll_interval)
+
+    async def _apply_change(self, collection_name: str, change: Dict):
+        """change stream 이벤트를 핸들러에 전달합니다."""
+        operation = change.get('operationType')
+        if operation in ('insert', 'update', 'replace'):
+            doc = change.get('fullDocument')
+            if doc is not None:
+                await self._dispatch_upsert(collection_name, doc)
+            else:
+                # updateLookup 시점에 이미 삭제된 문서
+                await self._dispatch_delete(collection_name, change['documentKey']['_id'])
+        elif operation == 'delete':
+            await self._dispatch_delete(collection_name, change['documentKey']['_id'])
+
+    async def _poll_collection(self, collection_name: str):
+        """
+        폴링 방식 동기화
+        - updated_at/created_at이 (마지막 확인 시각 - poll_overlap) 이상인 문서를 다시 확인하고,
+          이미 반영한 (문서, 타임스탬프)는 건너뛴다
+        - _id 집합 비교로 타임스탬프가 없는 삽입과 삭제를 찾아낸다.
+          컬렉션 전체 _id를 읽는 비용이 있어 id_scan_every번의 폴링마다 한 번만 수행
+          (삭제 반영은 최대 poll_interval * id_scan_every초 늦어질 수 있음)
+        poll_overlap보다 더 과거의 타임스탬프로 커밋된 수정은 여전히 놓칠 수 있다.
+        """
+        collection = self.db[collection_name]
+        self.modes[collection_name] = 'polling'
+
+        known_ids = await self._fetch_ids(collection)
+        last_seen = await self._latest_timestamp(collection)
+        applied: Dict[Any, datetime] = {}  # 겹침 구간 안에서 이미 반영한 문서별 타임스탬프
+        cycle = 0
+
+        while self.is_running:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                self.stats['poll_cycles'] += 1
+                cycle += 1
+
+                # 1. 타임스탬프 기준 변경 문서 (겹침 구간 포함, 중복 반영 제외)
+                changed_ids: Set[Any] = set()
+                if last_seen is not None:
+                    since = last_seen - self.poll_overlap
+                    query = {"$or": [
+                        {"updated_at": {"$gte": since}},
+                        {"created_at": {"$gte": since}}
+                    ]}
+                    async for doc in collection.find(query):
+                        changed_ids.add(doc['_id'])
+                        stamp = self._max_timestamp(None, doc)
+                        last_seen = self._max_timestamp(last_seen, doc)
+                        if stamp is not None and applied.get(doc['_id']) == stamp:
+                            continue
+                        applied[doc['_id']] = stamp
+                        await self._dispatch_upsert(collection_name, doc)
+
+                    # 겹침 구간을 벗어난 기록은 정리
+                    cutoff = last_seen - self.poll_overlap
+                    applied = {doc_id: stamp for doc_id, stamp in applied.items()
+                               if stamp is not None and stamp >= cutoff}
+                known_ids |= changed_ids
+
+                # 2. _id 집합 비교 (타임스탬프 없는 삽입, 삭제)
+                if cycle % self.id_scan_every == 0:
+                    self.stats['id_scans'] += 1
+                    current_ids = await self._fetch_ids(collection)
+                    new_ids = current_ids - known_ids
+                    if new_ids:
+                        async for doc in collection.find({"_id": {"$in": list(new_ids)}}):
+                            last_seen = self._max_timestamp(last_seen, doc)
+                            await self._dispatch_upsert(collection_name, doc)
+                    for doc_id in known_ids - current_ids:
+                        applied.pop(doc_id, None)
+                        await self._dispatch_delete(collection_name, doc_id)
+
+                    known_ids = current_ids
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"폴링 동기화 오류 ({collection_name}): {e}")
+
+    async def _fetch_ids(self, collection) -> Set[Any]:
+        """컬렉션의 _id 집합을 조회합니다."""
+        return {doc['_id'] async for doc in collection.find({}, {"_id": 1})}
+
+    async def _latest_timestamp(self, collection) -> Optional[datetime]:
+        """컬렉션의 가장 최근 updated_at/created_at을 조회합니다."""
+        latest = None
+        for field in ("updated_at", "created_at"):
+            doc = await collection.find_one({field: {"$exists": True}}, sort=[(field, -1)])
+            if doc:
+                latest = self._max_timestamp(latest, doc)
+        return latest
+
+    def _max_timestamp(self, current: Optional[datetime], doc: Dict) -> Optional[datetime]:
+        """문서의 타임스탬프와 현재 값 중 최신 값을 반환합니다."""
+        for field in ("updated_at", "created_at"):
+            value = doc.get(field)
+            if isinstance(value, datetime) and (current is None or value > current):
+                current = value
+        return current
+
+    async def _dispatch_upsert(self, collection_name: str, doc: Dict):
+        """추가/수정 핸들러를 호출합니다."""
+        for handler in self.handlers.get(collection_name, []):
+            await self._call(handler['upsert'], doc)
+        self.stats['upserts_applied'] += 1
+
+    async def _dispatch_delete(self, collection_name: str, doc_id: Any):
+        """삭제 핸들러를 호출합니다."""
+        for handler in self.handlers.get(collection_name, []):
+            await self._call(handler['delete'], doc_id)
+        self.stats['deletes_applied'] += 1
+
+    async def _call(self, handler: Callable, arg: Any):
+        """sync/async 핸들러를 구분해 호출합니다. 핸들러 오류는 구독을 중단시키지 않습니다."""
+        try:
+            result = handler(arg)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            self.stats['handler_errors'] += 1
+            logging.error(f"인덱스 동기화 핸들러 오류: {e}")
@@ -0,0 +1,176 @@
+"""
+추론 실행기 모듈
+model.generate 같은 블로킹 추론을 전용 스레드 풀에서 실행해 이벤트 루프를 막지 않도록 한다.
+동시 실행 수와 대기열 길이를 제한하고, 요청별 타임아웃/취소와 대기 시간 지표를 제공한다.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class InferenceQueueFullError(Exception):
+    """추론 대기열이 가득 찼을 때 발생하는 예외"""
+    pass
+
+
+class InferenceCancelledError(Exception):
+    """실행 전에 취소된 추론 작업에서 발생하는 예외"""
+    pass
+
+
+def make_cancel_stopping_criteria(cancel_event: threading.Event):
+    """
+    취소 이벤트가 설정되면 생성을 멈추는 transformers StoppingCriteriaList를 만듭니다.
+
+    Args:
+        cancel_event: 추론 실행기가 넘겨주는 취소 이벤트
+    """
+    from transformers import StoppingCriteria, StoppingCriteriaList
+
+    class CancelStoppingCriteria(StoppingCriteria):
+        def __call__(self, input_ids, scores, **kwargs) -> bool:
+            return cancel_event.is_set()
+
+    return StoppingCriteriaList([CancelStoppingCriteria()])
+
+
+class InferenceExecutor:
+    """
+    제한된 스레드 풀 기반 추론 실행기
+
+    torch 연산은 GIL을 해제하므로 스레드에서 실행해도 이벤트 루프가 계속 응답한다.
+    ThreadPoolExecutor 자체의 대기열은 무제한이므로 제출 시점에 대기 중인 작업 수로 상한을 건다.
+    """
+
+    def __init__(self, max_workers: int = 1, max_queue_size: int = 16, default_timeout: Optional[float] = None):
+        """
+        Args:
+            max_workers: 동시에 실행할 추론 수
+            max_queue_size: 실행을 기다릴 수 있는 최대 요청 수
+            default_timeout: 요청별 기본 타임아웃(초), None이면 무제한
+        """
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.default_timeout = default_timeout
+
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+
+        self.stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'rejected': 0,
+            'timeouts': 0,
+            'cancelled': 0,
+            'total_wait_ms': 0.0,
+            'max_wait_ms': 0.0,
+            'total_run_ms': 0.0
+        }
+
+    async def submit(self, fn: Callable, *args, timeout: Optional[float] = None,
+                     cancellable: bool = False, **kwargs) -> Any:
+        """
+        블로킹 함수를 추론 스레드에서 실행하고 결과를 기다립니다.
+
+        Args:
+            fn: 실행할 동기 함수
+            timeout: 이 요청의 타임아웃(초), None이면 기본값 사용
+            cancellable: True면 fn에 cancel_event 키워드 인자를 넘김
+
+        Returns:
+            Any: fn의 반환값
+
+        Raises:
+            InferenceQueueFullError: 대기열이 가득 찬 경우
+            asyncio.TimeoutError: 타임아웃이 지난 경우 (실행 중인 생성은 취소 이벤트로 중단)
+        """
+        with self._lock:
+            if self._queued >= self.max_queue_size:
+                self.stats['rejected'] += 1
+                raise InferenceQueueFullError(
+                    f"추론 대기열 초과 (대기 {self._queued}/{self.max_queue_size})")
+            self._queued += 1
+            self.stats['submitted'] += 1
+
+        cancel_event = threading.Event()
+        if cancellable:
+            kwargs['cancel_event'] = cancel_event
+
+        enqueued_at = time.monotonic()
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._pool, self._run, fn, args, kwargs, cancel_event, enqueued_at)
+        # 타임아웃/취소 후에도 스레드 작업은 끝까지 실행되므로 결과를 소비해 경고 로그를 막음
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+        timeout = self.default_timeout if timeout is None else timeout
+        try:
+            # shield: 대기 중인 작업이 풀에서 사라지지 않고 _run에서 취소 여부를 확인하도록 함
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            cancel_event.set()
+            self.stats['timeouts'] += 1
+            logging.warning(f"⏱️ 추론 타임아웃 ({timeout}s), 생성 중단 요청")
+            raise
+        except asyncio.CancelledError:
+            # 클라이언트 연결 종료 등으로 요청이 취소된 경우 스레드의 생성도 중단
+            cancel_event.set()
+            self.stats['cancelled'] += 1
+            raise
+
+    def _run(self, fn: Callable, args: tuple, kwargs: Dict, cancel_event: threading.Event, enqueued_at: float) -> Any:
+        """추론 스레드에서 실행되는 래퍼 (대기/실행 시간 기록)"""
+        started_at = time.monotonic()
+        wait_ms = (started_at - enqueued_at) * 1000
+
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self.stats['total_wait_ms'] += wait_ms
+            self.stats['max_wait_ms'] = max(self.stats['max_wait_ms'], wait_ms)
+
+        try:
+            if cancel_event.is_set():
+                raise InferenceCancelledError("실행 전 취소된 추론 요청")
+            result = fn(*args, **kwargs)
+            with self._lock:
+                self.stats['completed'] += 1
+            return result
+        except Exception:
+            with self._lock:
+                self.stats['failed'] += 1
+            raise
+        finally:
+            with self._lock:
+                self._running -= 1
+                self.stats['total_run_ms'] += (time.monotonic() - started_at) * 1000
+
+    def get_stats(self) -> Dict:
+        """대기열 길이, 대기 시간 등 실행기 지표를 반환합니다."""
+        with self._lock:
+            stats = dict(self.stats)
+            queue_depth = self._queued
+            running = self._running
+
+        started = max(stats['submitted'] - queue_depth, 1)
+        finished = max(stats['completed'] + stats['failed'], 1)
+        return {
+            **stats,
+            'queue_depth': queue_depth,
+            'running': running,
+            'max_workers': self.max_workers,
+            'max_queue_size': self.max_queue_size,
+            'avg_wait_ms': stats['total_wait_ms'] / started,
+            'avg_run_ms': stats['total_run_ms'] / finished
+        }
+
+    def shutdown(self, wait: bool = False):
+        """스레드 풀을 종료합니다."""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+        logging.info("추론 실행기 종료 완료")
@@ -1,6 +1,6 @@
-import re
 from typing import Dict, List, Tuple, Optional
 from enum import Enum
+from .keyword_automaton import get_keyword_matcher
 
 class InputType(Enum):
     """입력 타입 분류"""
@@ -18,6 +18,16 @@ class InputFilter:
         self.db = db
         self.pattern_collection = db.context_patterns if db else None
         self._initialize_patterns()
+        
+        # 패턴은 모두 리터럴 문자열이므로 공유 키워드 오토마톤 한 번의 스캔으로 전 카테고리를 매칭
+        self.keyword_matcher = get_keyword_matcher()
+        self.keyword_matcher.set_source("input_filter", {
+            'profanity': self.profanity_patterns,
+            'non_counseling': self.non_counseling_patterns,
+            'greeting': self.greeting_patterns,
+            'technical': self.technical_patterns,
+            'casual': self.casual_patterns
+        })
     
     def _initialize_patterns(self):
         """패턴 초기화"""
@@ -92,12 +102,13 @@ class InputFilter:
     def classify_input(self, user_input: str) -> Tuple[InputType, Dict[str, any]]:
         """사용자 입력을 분류하고 결과 반환"""
         input_lower = user_input.lower().strip()
+        hits = self.keyword_matcher.find(input_lower, "input_filter")
         
         # 욕설 체크 (가장 우선순위)
-        if self._contains_profanity(input_lower):
+        if hits.get('profanity'):
             return InputType.PROFANITY, {
                 "reason": "욕설 감지",
-                "matched_words": self._find_matched_words(input_lower, self.profanity_patterns)
+                "matched_words": hits['profanity']
             }
         
         # context_patterns에서 매칭 검색 (DB가 있는 경우)
@@ -107,64 +118,36 @@ class InputFilter:
                 return context_result
         
         # 비상담 질문 체크
-        if self._is_non_counseling(input_lower):
+        if hits.get('non_counseling'):
             return InputType.NON_COUNSELING, {
                 "reason": "상담 범위 외 질문",
-                "matched_words": self._find_matched_words(input_lower, self.non_counseling_patterns)
+                "matched_words": hits['non_counseling']
             }
         
         # 인사말 체크
-        if self._is_greeting(input_lower):
+        if hits.get('greeting'):
             return InputType.GREETING, {
                 "reason": "인사말 감지",
-                "matched_words": self._find_matched_words(input_lower, self.greeting_patterns)
+                "matched_words": hits['greeting']
             }
         
         # 기술적 질문 체크
-        if self._is_technical(input_lower):
+        if hits.get('technical'):
             return InputType.TECHNICAL, {
                 "reason": "기술적 질문",
-                "matched_words": self._find_matched_words(input_lower, self.technical_patterns)
+                "matched_words": hits['technical']
             }
         
         # 일상 대화 체크
-        if self._is_casual(input_lower):
+        if hits.get('casual'):
             return InputType.CASUAL, {
                 "reason": "일상 대화",
-                "matched_words": self._find_matched_words(input_lower, self.casual_patterns)
+                "matched_words": hits['casual']
             }
         
         # 기타
         return InputType.UNKNOWN, {"reason": "분류 불가"}
     
-    def _contains_profanity(self, text: str) -> bool:
-        """욕설 포함 여부 확인"""
-        return any(re.search(pattern, text) for pattern in self.profanity_patterns)
-    
-    def _is_non_counseling(self, text: str) -> bool:
-        """비상담 질문 여부 확인"""
-        return any(re.search(pattern, text) for pattern in self.non_counseling_patterns)
-    
-    def _is_greeting(self, text: str) -> bool:
-        """인사말 여부 확인"""
-        return any(re.search(pattern, text) for pattern in self.greeting_patterns)
-    
-    def _is_technical(self, text: str) -> bool:
-        """기술적 질문 여부 확인"""
-        return any(re.search(pattern, text) for pattern in self.technical_patterns)
-    
-    def _is_casual(self, text: str) -> bool:
-        """일상 대화 여부 확인"""
-        return any(re.search(pattern, text) for pattern in self.casual_patterns)
-    
-    def _find_matched_words(self, text: str, patterns: List[str]) -> List[str]:
-        """매칭된 단어들 찾기"""
-        matched = []
-        for pattern in patterns:
-            if re.search(pattern, text):
-                matched.append(pattern)
-        return matched
-    
     def _check_context_patterns_sync(self, user_input: str) -> Optional[Tuple[InputType, Dict[str, any]]]:
         """context_patterns 테이블에서 패턴 매칭 (동기 버전)"""
         try:
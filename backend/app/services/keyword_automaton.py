@@ -0,0 +1,236 @@
+"""
+키워드 오토마톤 모듈
+분류기들이 각자 들고 있던 키워드 목록(문맥 인식 분류기 clear_keywords, 입력 필터 패턴,
+모호함 감지기 표현, DB input_keywords)을 하나의 Aho-Corasick 오토마톤으로 컴파일해
+입력을 한 번 훑는 것으로 모든 (소스, 카테고리) 매칭을 구한다.
+키워드가 바뀌면 새 오토마톤을 만든 뒤 참조만 교체하므로 읽는 쪽은 락 없이 항상 완성된 오토마톤을 본다.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+# (소스, 카테고리) 예: ("clear_keywords", "casual"), ("input_keywords", "profanity")
+GroupKey = Tuple[str, str]
+KeywordMap = Dict[str, List[str]]
+
+# DB input_keywords 컬렉션에서 읽은 키워드의 소스 이름
+DB_KEYWORD_SOURCE = "input_keywords"
+
+
+class KeywordAutomaton:
+    """
+    불변 Aho-Corasick 오토마톤
+    키워드는 소문자로 컴파일하고, 각 키워드에는 (그룹, 목록 내 순번)을 붙여
+    매칭 결과를 원래 목록 순서(= 기존 우선순위)대로 돌려준다.
+    """
+
+    def __init__(self, sources: Dict[str, KeywordMap]):
+        """
+        Args:
+            sources: {소스: {카테고리: [키워드, ...]}}
+        """
+        self.groups: Dict[GroupKey, List[str]] = {}
+        # 패턴 id -> (그룹, 목록 내 순번). id는 그룹/순번 순서로 증가
+        self._patterns: List[Tuple[GroupKey, int]] = []
+
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+
+        for source, keyword_map in sources.items():
+            for category, keywords in keyword_map.items():
+                group = (source, category)
+                self.groups[group] = list(keywords)
+                for index, keyword in enumerate(keywords):
+                    # 빈 문자열은 모든 입력에 매칭되므로 제외
+                    if keyword:
+                        self._add(keyword.lower(), len(self._patterns))
+                        self._patterns.append((group, index))
+
+        self._build_failure_links()
+
+    @property
+    def pattern_count(self) -> int:
+        return len(self._patterns)
+
+    @property
+    def state_count(self) -> int:
+        return len(self._goto)
+
+    def find_all(self, text: str, source: Optional[str] = None) -> Dict[GroupKey, List[str]]:
+        """
+        입력을 한 번 훑어 그룹별로 매칭된 키워드를 목록 순서대로 반환합니다.
+
+        Args:
+            text: 입력 텍스트 (내부에서 소문자화)
+            source: 지정하면 해당 소스의 그룹만 반환
+
+        Returns:
+            Dict[GroupKey, List[str]]: 매칭된 그룹만 포함
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        matched = set()
+        state = 0
+        for ch in text.lower():
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                matched.update(out[state])
+
+        hits: Dict[GroupKey, List[str]] = {}
+        for pattern_id in sorted(matched):
+            group, index = self._patterns[pattern_id]
+            if source is not None and group[0] != source:
+                continue
+            hits.setdefault(group, []).append(self.groups[group][index])
+        return hits
+
+    def find(self, text: str, source: str) -> Dict[str, List[str]]:
+        """소스 하나의 매칭 결과를 {카테고리: [키워드]} 형태로 반환합니다."""
+        return {category: words for (_, category), words in self.find_all(text, source).items()}
+
+    def _add(self, keyword: str, pattern_id: int):
+        """트라이에 키워드를 추가합니다."""
+        state = 0
+        for ch in keyword:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = next_state
+        self._out[state] = self._out[state] + (pattern_id,)
+
+    def _build_failure_links(self):
+        """BFS로 실패 링크를 만들고, 실패 링크 쪽 출력을 미리 합쳐 둡니다."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                link = self._goto[fallback].get(ch, 0)
+                self._fail[next_state] = link if link != next_state else 0
+                if self._out[self._fail[next_state]]:
+                    self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+
+class KeywordMatcher:
+    """
+    소스별 키워드 목록을 모아 공유 오토마톤을 관리하는 매칭기
+    set_source/DB 변경 시 전체 오토마톤을 다시 만들어 원자적으로 교체한다.
+    """
+
+    def __init__(self):
+        self._sources: Dict[str, KeywordMap] = {}
+        self._db_categories: Dict[str, str] = {}  # input_keywords 문서 _id -> 카테고리
+        self._build_lock = threading.Lock()
+        self._automaton = KeywordAutomaton({})
+
+        self.stats = {
+            'rebuilds': 0,
+            'last_build_ms': 0.0
+        }
+
+    @property
+    def automaton(self) -> KeywordAutomaton:
+        """현재 오토마톤 (호출 시점의 완성된 스냅샷)"""
+        return self._automaton
+
+    def set_source(self, source: str, keyword_map: KeywordMap):
+        """소스의 키워드 목록을 등록/교체합니다. 내용이 같으면 다시 만들지 않습니다."""
+        with self._build_lock:
+            self._set_source(source, keyword_map)
+
+    def find_all(self, text: str) -> Dict[GroupKey, List[str]]:
+        """모든 소스의 매칭 결과를 반환합니다."""
+        return self._automaton.find_all(text)
+
+    def find(self, text: str, source: str) -> Dict[str, List[str]]:
+        """소스 하나의 {카테고리: [매칭 키워드]}를 반환합니다."""
+        return self._automaton.find(text, source)
+
+    async def load_db_keywords(self, db) -> KeywordMap:
+        """input_keywords 컬렉션 전체를 읽어 DB 소스를 교체합니다."""
+        categories: KeywordMap = {}
+        db_categories: Dict[str, str] = {}
+        async for doc in db.input_keywords.find({}, {"category": 1, "keywords": 1}):
+            category = doc.get('category', 'unknown')
+            categories[category] = doc.get('keywords', [])
+            db_categories[str(doc['_id'])] = category
+
+        with self._build_lock:
+            self._db_categories = db_categories
+            self._set_source(DB_KEYWORD_SOURCE, categories)
+        return categories
+
+    def apply_db_upsert(self, doc: Dict):
+        """수정된 input_keywords 문서를 반영합니다 (인덱스 동기화 핸들러용)."""
+        category = doc.get('category', 'unknown')
+        with self._build_lock:
+            previous = self._db_categories.get(str(doc['_id']))
+            self._db_categories[str(doc['_id'])] = category
+            keyword_map = dict(self._sources.get(DB_KEYWORD_SOURCE, {}))
+            if previous is not None and previous != category:
+                keyword_map.pop(previous, None)
+            keyword_map[category] = doc.get('keywords', [])
+            self._set_source(DB_KEYWORD_SOURCE, keyword_map)
+
+    def apply_db_delete(self, doc_id: Any):
+        """삭제된 input_keywords 문서의 카테고리를 제거합니다 (인덱스 동기화 핸들러용)."""
+        with self._build_lock:
+            category = self._db_categories.pop(str(doc_id), None)
+            if category is None:
+                return
+            keyword_map = dict(self._sources.get(DB_KEYWORD_SOURCE, {}))
+            keyword_map.pop(category, None)
+            self._set_source(DB_KEYWORD_SOURCE, keyword_map)
+
+    def get_stats(self) -> Dict:
+        """오토마톤 통계를 반환합니다."""
+        automaton = self._automaton
+        return {
+            **self.stats,
+            'sources': {source: sum(len(words) for words in keyword_map.values())
+                        for source, keyword_map in self._sources.items()},
+            'patterns': automaton.pattern_count,
+            'states': automaton.state_count
+        }
+
+    def _set_source(self, source: str, keyword_map: KeywordMap):
+        """소스를 교체하고 내용이 바뀌었으면 오토마톤을 다시 만듭니다 (빌드 락을 잡은 상태에서 호출)."""
+        keyword_map = {category: list(keywords) for category, keywords in keyword_map.items()}
+        if self._sources.get(source) == keyword_map:
+            return
+        self._sources[source] = keyword_map
+        self._rebuild()
+
+    def _rebuild(self):
+        """새 오토마톤을 만든 뒤 참조를 교체합니다 (빌드 락을 잡은 상태에서 호출)."""
+        start_time = time.time()
+        automaton = KeywordAutomaton(self._sources)
+        self._automaton = automaton
+        self.stats['rebuilds'] += 1
+        self.stats['last_build_ms'] = (time.time() - start_time) * 1000
+        logging.info(f"✅ 키워드 오토마톤 재구성: 패턴 {automaton.pattern_count}개, "
+                     f"상태 {automaton.state_count}개 ({self.stats['last_build_ms']:.1f}ms)")
+
+
+# 전역 키워드 매칭기 인스턴스
+_keyword_matcher: Optional[KeywordMatcher] = None
+
+
+def get_keyword_matcher() -> KeywordMatcher:
+    """전역 키워드 매칭기 인스턴스를 반환합니다."""
+    global _keyword_matcher
+    if _keyword_matcher is None:
+        _keyword_matcher = KeywordMatcher()
+    return _keyword_matcher
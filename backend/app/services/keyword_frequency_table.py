@@ -0,0 +1,226 @@
+"""
+도메인 키워드 빈도 테이블 모듈
+knowledge_base 문서의 keywords를 keyword_frequencies 컬렉션에 문서 빈도로 누적해 두고,
+문서가 추가/수정/삭제될 때마다 차이만 반영한다 (기술 질문마다 knowledge_base 전체를 다시 읽지 않음).
+
+컬렉션:
+    keyword_frequencies         {_id: 키워드, count: 포함 문서 수, is_domain: 도메인 키워드 여부, updated_at}
+    keyword_frequency_sources   {_id: knowledge _id, keywords: 마지막으로 반영한 키워드 목록, updated_at: 문서 updated_at}
+삭제 이벤트에는 문서 내용이 없으므로, 문서별로 반영한 키워드를 sources에 남겨 두었다가 그만큼 빼낸다.
+
+앱이 내려가 있던 동안의 변경이나 색인 동기화를 거치지 않은 쓰기(가져오기 스크립트, ENABLE_INDEX_SYNC=False 등)는
+증분으로 들어오지 않으므로, 처음 사용할 때 knowledge_base와 sources의 (문서 수, 최대 _id, 최대 updated_at)을 비교해
+다르면 다시 구성한다. 재구성은 staging 컬렉션에 만든 뒤 renameCollection으로 교체하고,
+그동안 증분 반영은 같은 락에서 기다린다.
+"""
+
+import asyncio
+import logging
+import re
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from pymongo import ReturnDocument, UpdateOne
+
+from .index_registry import ensure_indexes
+
+# 도메인 관련 키워드 (부분 문자열로 포함되면 도메인 키워드)
+DOMAIN_TERMS = [
+    '설치', '설정', '오류', '에러', '문제', '해결', '방법',
+    '프로그램', '소프트웨어', '하드웨어', '기기', '장비',
+    '스캐너', '프린터', '포스', 'pos', '시스템', '네트워크',
+    '연결', '인터넷', '데이터', '백업', '복구', '업데이트',
+    '영수증', '결제', '카드', '키오스크', 'kiosk',
+    '듀얼모니터', '모니터', '화면', '디스플레이',
+    '포트', '장치관리자', '디바이스', 'device',
+    '재연결', '출력', '정상출력', '정상작동',
+    '다운로드', '업로드', '설치파일', '드라이버',
+    '재부팅', '리부팅', '부팅', '인터페이스',
+    'ui', 'ux', '사용자', '사용법', '매뉴얼',
+    '설명서', '가이드', '도움말', 'help',
+    '거래명세서', '직인', '계좌번호', '로그인', '단말기',
+    '클라우드', '재설치', '설치요구', '작동', '재시작'
+]
+
+# 비도메인 키워드 (도메인 용어를 포함해도 제외)
+EXCLUDED_KEYWORDS = frozenset([
+    '고객님', '팀장', '아침', '커피', '감사', '안녕', '반갑', '좋은', '하이', 'hello',
+    '바쁘', '식사', '점심', '저녁', '차', '날씨', '기분', '피곤', '힘드시', '지내',
+    '너는', '당신은', 'ai', '인공지능', '로봇'
+])
+
+# 용어별 `.*용어.*` 정규식을 하나씩 시도하던 것을 한 번의 탐색으로 처리 (긴 용어 우선)
+_DOMAIN_PATTERN = re.compile(
+    '|'.join(re.escape(term) for term in sorted(set(DOMAIN_TERMS), key=len, reverse=True)),
+    re.IGNORECASE
+)
+
+
+# 재구성과 증분 반영을 직렬화하는 락 (요청마다 테이블 인스턴스를 만드는 API와도 공유)
+_table_lock: Optional[asyncio.Lock] = None
+
+
+def _get_table_lock() -> asyncio.Lock:
+    global _table_lock
+    if _table_lock is None:
+        _table_lock = asyncio.Lock()
+    return _table_lock
+
+
+def is_domain_keyword(keyword: str) -> bool:
+    """도메인 용어를 포함하고 제외 목록에 없는 키워드인지 확인합니다."""
+    return keyword not in EXCLUDED_KEYWORDS and _DOMAIN_PATTERN.search(keyword) is not None
+
+
+def filter_domain_keywords(keywords: Iterable[str]) -> List[str]:
+    """도메인 키워드만 중복 없이 남깁니다."""
+    return list({keyword for keyword in keywords if keyword and is_domain_keyword(keyword)})
+
+
+class KeywordFrequencyTable:
+    """knowledge_base 키워드 문서 빈도 테이블"""
+
+    def __init__(self, db):
+        """
+        Args:
+            db: MongoDB 데이터베이스 연결 인스턴스
+        """
+        self.db = db
+        self.knowledge_collection = db.knowledge_base
+        self.frequency_collection = db.keyword_frequencies
+        self.source_collection = db.keyword_frequency_sources
+        self.is_initialized = False
+
+    async def ensure_initialized(self):
+        """처음 사용할 때 knowledge_base와 테이블이 어긋나 있으면(비어 있는 경우 포함) 다시 구성합니다."""
+        if self.is_initialized:
+            return
+        knowledge_state = await self._collection_state(self.knowledge_collection)
+        source_state = await self._collection_state(self.source_collection)
+        if knowledge_state != source_state:
+            logging.info(f"키워드 빈도 테이블이 knowledge_base와 다름 (knowledge_base {knowledge_state}, "
+                         f"sources {source_state}), 다시 구성합니다.")
+            await self.rebuild()
+        self.is_initialized = True
+
+    async def rebuild(self) -> int:
+        """
+        knowledge_base 전체를 읽어 테이블을 다시 만듭니다 (초기 구성/복구용). 반영한 문서 수를 반환합니다.
+        staging 컬렉션에 만든 뒤 교체하므로 조회 중에 빈 테이블이 보이지 않고,
+        재구성 중 들어온 증분 반영은 락에서 기다렸다가 새 sources 기준으로 적용된다.
+        """
+        async with _get_table_lock():
+            counts: Dict[str, int] = {}
+            sources = []
+            async for doc in self.knowledge_collection.find({}, {"keywords": 1, "updated_at": 1}):
+                keywords = self._distinct_keywords(doc.get('keywords'))
+                sources.append({"_id": doc["_id"], "keywords": keywords, "updated_at": doc.get('updated_at')})
+                for keyword in keywords:
+                    counts[keyword] = counts.get(keyword, 0) + 1
+
+            now = datetime.now()
+            await self._replace_collection(self.source_collection, sources)
+            await self._replace_collection(self.frequency_collection, [
+                {"_id": keyword, "count": count, "is_domain": is_domain_keyword(keyword), "updated_at": now}
+                for keyword, count in counts.items()
+            ])
+            await ensure_indexes(self.db, collection=self.frequency_collection.name)
+
+        logging.info(f"✅ 키워드 빈도 테이블 구성: {len(sources)}개 문서, {len(counts)}개 키워드")
+        return len(sources)
+
+    async def apply_knowledge_upsert(self, doc: Dict):
+        """
+        knowledge_base 문서 추가/수정을 반영합니다 (색인 동기화 핸들러).
+        마지막으로 반영한 키워드와의 차이만 더하고 빼므로 같은 문서를 여러 번 반영해도 결과가 같다.
+        """
+        keywords = self._distinct_keywords(doc.get('keywords'))
+        async with _get_table_lock():
+            previous = await self.source_collection.find_one_and_replace(
+                {"_id": doc["_id"]},
+                {"keywords": keywords, "updated_at": doc.get('updated_at')},
+                upsert=True,
+                return_document=ReturnDocument.BEFORE
+            )
+            old_keywords = previous.get('keywords', []) if previous else []
+            await self._apply_delta(keywords, old_keywords)
+
+    async def apply_knowledge_delete(self, doc_id: Any):
+        """knowledge_base 문서 삭제를 반영합니다 (색인 동기화 핸들러)."""
+        async with _get_table_lock():
+            previous = await self.source_collection.find_one_and_delete({"_id": doc_id})
+            if previous:
+                await self._apply_delta([], previous.get('keywords', []))
+
+    async def domain_keywords(self) -> List[str]:
+        """하나 이상의 문서에 있는 도메인 키워드 목록"""
+        return [
+            doc["_id"]
+            async for doc in self.frequency_collection.find({"is_domain": True, "count": {"$gt": 0}}, {"_id": 1})
+        ]
+
+    async def all_keywords(self) -> List[str]:
+        """하나 이상의 문서에 있는 모든 키워드 (빈도 내림차순)"""
+        return [
+            doc["_id"]
+            async for doc in self.frequency_collection.find({"count": {"$gt": 0}}, {"_id": 1}).sort("count", -1)
+        ]
+
+    async def _apply_delta(self, new_keywords: List[str], old_keywords: List[str]):
+        """키워드별 증감을 한 번의 bulk_write로 반영하고, 빈도가 0이 된 키워드를 정리합니다."""
+        added = set(new_keywords) - set(old_keywords)
+        removed = set(old_keywords) - set(new_keywords)
+        if not added and not removed:
+            return
+
+        now = datetime.now()
+        operations = [
+            UpdateOne(
+                {"_id": keyword},
+                {"$inc": {"count": 1}, "$set": {"is_domain": is_domain_keyword(keyword), "updated_at": now}},
+                upsert=True
+            )
+            for keyword in added
+        ] + [
+            UpdateOne({"_id": keyword}, {"$inc": {"count": -1}, "$set": {"updated_at": now}})
+            for keyword in removed
+        ]
+        await self.frequency_collection.bulk_write(operations, ordered=False)
+        if removed:
+            await self.frequency_collection.delete_many({"_id": {"$in": list(removed)}, "count": {"$lte": 0}})
+
+    async def _replace_collection(self, collection, documents: List[Dict]):
+        """문서를 staging 컬렉션에 넣은 뒤 renameCollection(dropTarget)으로 한 번에 교체합니다."""
+        if not documents:
+            await collection.delete_many({})
+            return
+        staging = self.db[f"{collection.name}_staging"]
+        await staging.drop()
+        await staging.insert_many(documents, ordered=False)
+        await self.db.client.admin.command(
+            "renameCollection", f"{self.db.name}.{staging.name}",
+            to=f"{self.db.name}.{collection.name}",
+            dropTarget=True
+        )
+
+    @staticmethod
+    async def _collection_state(collection) -> Dict[str, Any]:
+        """knowledge_base/sources 비교용 요약 (문서 수, 최대 _id, 최대 updated_at)"""
+        result = await collection.aggregate([
+            {"$group": {
+                "_id": None,
+                "count": {"$sum": 1},
+                "max_id": {"$max": "$_id"},
+                "max_updated": {"$max": "$updated_at"}
+            }}
+        ]).to_list(length=1)
+        state = result[0] if result else {"count": 0, "max_id": None, "max_updated": None}
+        state.pop("_id", None)
+        return state
+
+    @staticmethod
+    def _distinct_keywords(keywords) -> List[str]:
+        """문서 keywords 필드를 중복 없는 문자열 목록으로 정리합니다 (문서 빈도 기준)."""
+        if not isinstance(keywords, list):
+            return []
+        return list(dict.fromkeys(keyword for keyword in keywords if isinstance(keyword, str) and keyword))
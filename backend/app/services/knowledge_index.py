@@ -0,0 +1,178 @@
+"""
+지식 베이스 인메모리 역색인 모듈
+knowledge_base 컬렉션을 시작 시 한 번 로드해 term → posting list(knowledge id 집합)로 상주시키고,
+키워드 검색 시 전체 컬렉션을 스캔하지 않고 후보 문서만 점수화할 수 있게 한다
+"""
+
+import logging
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+
+class KnowledgeIndex:
+    """
+    knowledge_base 인메모리 역색인
+
+    기존 키워드 점수는 부분 문자열 포함 여부(`keyword in question`)로 계산되므로
+    공백 토큰이 아닌 문자 2-gram을 색인 단위로 사용한다.
+    키워드의 모든 2-gram을 포함하는 문서만 그 키워드를 부분 문자열로 가질 수 있으므로
+    후보 집합이 기존 전체 스캔에서 점수를 받는 문서를 빠짐없이 포함한다.
+    """
+
+    GRAM_SIZE = 2
+
+    def __init__(self, static_combinations: Iterable[Tuple[str, str]] = ()):
+        """
+        Args:
+            static_combinations: 검색어와 무관하게 점수를 주는 키워드 조합 목록
+        """
+        self.static_combinations = list(static_combinations)
+
+        self.documents: Dict[Any, Dict] = {}      # knowledge id -> 문서
+        self.doc_order: Dict[Any, int] = {}       # knowledge id -> 로드 순서 (동점 시 기존 스캔 순서 유지)
+        self.question_postings: Dict[str, Set[Any]] = defaultdict(set)
+        self.answer_postings: Dict[str, Set[Any]] = defaultdict(set)
+        self.static_candidates: Set[Any] = set()  # 조합 키워드 보너스를 받는 문서
+
+        self._next_order = 0
+        self.is_ready = False
+        self.build_time_ms = 0.0
+
+    async def build(self, collection: AsyncIOMotorCollection):
+        """컬렉션 전체를 읽어 색인을 새로 구성합니다."""
+        start = time.time()
+        self.clear()
+
+        async for doc in collection.find({}):
+            self.add_document(doc)
+
+        self.is_ready = True
+        self.build_time_ms = (time.time() - start) * 1000
+        logging.info(f"✅ 지식 베이스 역색인 구성 완료: {len(self.documents)}개 문서, "
+                     f"{len(self.question_postings)}개 질문 term, {self.build_time_ms:.2f}ms")
+
+    def clear(self):
+        """색인을 비웁니다."""
+        self.documents.clear()
+        self.doc_order.clear()
+        self.question_postings.clear()
+        self.answer_postings.clear()
+        self.static_candidates.clear()
+        self._next_order = 0
+        self.is_ready = False
+
+    def add_document(self, doc: Dict):
+        """문서 하나를 색인에 추가합니다."""
+        doc_id = doc.get('_id')
+        if doc_id in self.documents:
+            self.remove_document(doc_id)
+
+        question = doc.get('question', '').lower()
+        answer = doc.get('answer', '').lower()
+
+        self.documents[doc_id] = doc
+        self.doc_order[doc_id] = self._next_order
+        self._next_order += 1
+
+        for gram in self._grams(question):
+            self.question_postings[gram].add(doc_id)
+        for gram in self._grams(answer):
+            self.answer_postings[gram].add(doc_id)
+
+        if self._has_static_combination(question, answer):
+            self.static_candidates.add(doc_id)
+
+    def remove_document(self, doc_id: Any):
+        """문서 하나를 색인에서 제거합니다."""
+        doc = self.documents.pop(doc_id, None)
+        if doc is None:
+            return
+        self.doc_order.pop(doc_id, None)
+        self.static_candidates.discard(doc_id)
+
+        self._discard_postings(self.question_postings, doc.get('question', '').lower(), doc_id)
+        self._discard_postings(self.answer_postings, doc.get('answer', '').lower(), doc_id)
+
+    def get_candidates(self, keywords: List[str]) -> List[Dict]:
+        """
+        키워드 중 하나라도 question 또는 answer에 포함될 수 있는 문서를 반환합니다.
+
+        Returns:
+            List[Dict]: 로드 순서대로 정렬된 후보 문서 목록
+        """
+        candidate_ids: Set[Any] = set(self.static_candidates)
+
+        for keyword in keywords:
+            grams = self._grams(keyword)
+            if not grams:
+                # 2-gram을 만들 수 없는 짧은 키워드는 색인으로 좁힐 수 없음
+                return self.all_documents()
+            candidate_ids |= self._intersect(self.question_postings, grams)
+            candidate_ids |= self._intersect(self.answer_postings, grams)
+
+        ordered_ids = sorted(candidate_ids, key=self.doc_order.__getitem__)
+        return [self.documents[doc_id] for doc_id in ordered_ids]
+
+    def all_documents(self) -> List[Dict]:
+        """색인된 모든 문서를 로드 순서대로 반환합니다."""
+        ordered_ids = sorted(self.documents, key=self.doc_order.__getitem__)
+        return [self.documents[doc_id] for doc_id in ordered_ids]
+
+    def get_document(self, doc_id: Any) -> Optional[Dict]:
+        """knowledge id로 문서를 조회합니다."""
+        return self.documents.get(doc_id)
+
+    def get_stats(self) -> Dict:
+        """색인 통계를 반환합니다."""
+        return {
+            'is_ready': self.is_ready,
+            'document_count': len(self.documents),
+            'question_terms': len(self.question_postings),
+            'answer_terms': len(self.answer_postings),
+            'static_candidates': len(self.static_candidates),
+            'build_time_ms': self.build_time_ms
+        }
+
+    def _grams(self, text: str) -> Set[str]:
+        """문자 n-gram 집합을 만듭니다."""
+        size = self.GRAM_SIZE
+        return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+    def _intersect(self, postings: Dict[str, Set[Any]], grams: Set[str]) -> Set[Any]:
+        """모든 gram의 posting list 교집합을 구합니다 (짧은 목록부터)."""
+        lists = []
+        for gram in grams:
+            posting = postings.get(gram)
+            if not posting:
+                return set()
+            lists.append(posting)
+
+        lists.sort(key=len)
+        result = set(lists[0])
+        for posting in lists[1:]:
+            result &= posting
+            if not result:
+                break
+        return result
+
+    def _discard_postings(self, postings: Dict[str, Set[Any]], text: str, doc_id: Any):
+        """텍스트의 gram posting에서 문서를 제거합니다."""
+        for gram in self._grams(text):
+            posting = postings.get(gram)
+            if posting is None:
+                continue
+            posting.discard(doc_id)
+            if not posting:
+                del postings[gram]
+
+    def _has_static_combination(self, question: str, answer: str) -> bool:
+        """조합 키워드 보너스를 받는 문서인지 확인합니다."""
+        for first, second in self.static_combinations:
+            if first in question and second in question:
+                return True
+            if first in answer and second in answer:
+                return True
+        return False
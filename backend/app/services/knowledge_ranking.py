@@ -0,0 +1,236 @@
+"""
+지식 베이스 랭킹 엔진 모듈
+한국어 조사/어미를 제거하는 토크나이저와 question/answer 필드 가중 BM25F 랭커 제공
+문서 길이, 평균 길이, IDF를 미리 계산해 두고 질의 시에는 posting list만 순회한다
+"""
+
+import heapq
+import logging
+import math
+import re
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+
+class KoreanTokenizer:
+    """
+    한국어 경량 토크나이저
+    형태소 분석기 없이 어절 끝의 조사/어미를 최장 일치로 잘라낸다.
+    ('프린터가', '프린터를', '프린터에서' → '프린터')
+    """
+
+    # 어절 끝에서 제거할 조사/어미 (최장 일치를 위해 길이 역순으로 정렬해서 사용)
+    SUFFIXES = [
+        # 조사
+        '에서는', '에서도', '으로는', '으로도', '에게서', '한테서', '이라고', '이라는',
+        '에서', '에게', '한테', '으로', '부터', '까지', '처럼', '보다', '이랑', '라고', '라는',
+        '이나', '이며', '마다', '밖에', '조차', '와', '과', '은', '는', '이', '가', '을', '를',
+        '의', '에', '로', '도', '만', '랑', '나',
+        # 어미
+        '했는데요', '하는데요', '했어요', '해요', '돼요', '되요', '나요', '하나요', '인가요',
+        '했는데', '하는데', '되는데', '안돼요', '습니다', '합니다', '됩니다', '입니다',
+        '할까요', '될까요', '하려면', '되려면', '하면', '되면', '해서', '돼서', '하고', '되고',
+        '하기', '되기', '해야', '돼야', '어요', '아요', '세요', '네요', '지요', '죠'
+    ]
+
+    # 토큰으로 취급하지 않을 불용어 (조사/어미 제거 후 기준)
+    STOP_WORDS = {
+        '어떻게', '어떤', '무엇', '왜', '언제', '어디서', '그', '저', '좀', '잘', '못', '안',
+        '알려', '주세', '주세요', '요청', '문의', '도움', '필요', '그러면', '그럼', '그래서',
+        '그리고', '또한', '또는', '하지만', '그런데', '안녕하', '안녕'
+    }
+
+    # 1음절 어간을 허용하면 "결과", "추가" 같은 2음절 명사의 끝 음절이 조사로 잘려 "결", "추"가 됨
+    MIN_STEM_LENGTH = 2
+
+    _token_pattern = re.compile(r'[가-힣]+|[a-z0-9]+')
+
+    def __init__(self):
+        self._suffix_set = set(self.SUFFIXES)
+        self._suffixes = sorted(self._suffix_set, key=len, reverse=True)
+
+    def tokenize(self, text: str) -> List[str]:
+        """텍스트를 소문자 토큰 목록으로 변환합니다 (중복 유지)."""
+        tokens = []
+        for raw in self._token_pattern.findall(text.lower()):
+            if raw in self._suffix_set:
+                # 'POS에서'처럼 영문 뒤에 분리된 조사 자체는 버림
+                continue
+            token = self.stem(raw)
+            if token and token not in self.STOP_WORDS:
+                tokens.append(token)
+        return tokens
+
+    def stem(self, word: str) -> str:
+        """어절 끝의 조사/어미를 한 번 제거합니다."""
+        if not ('가' <= word[0] <= '힣'):
+            return word
+        for suffix in self._suffixes:
+            if word.endswith(suffix) and len(word) - len(suffix) >= self.MIN_STEM_LENGTH:
+                return word[:-len(suffix)]
+        return word
+
+
+class BM25FRanker:
+    """
+    question/answer 두 필드에 대한 BM25F 랭커
+
+    필드별 정규화 TF를 가중합한 뒤 하나의 포화 함수(k1)를 적용한다.
+    문서 길이와 필드 합계 길이, posting은 색인 시점에 계산해 두고 문서 추가/삭제 시 해당 문서분만 갱신한다.
+    IDF는 검색 시 현재 문서 수와 posting 크기로 계산한다 (문서 수가 바뀌어도 모든 용어가 같은 N 기준).
+    """
+
+    FIELDS = ('question', 'answer')
+
+    def __init__(self,
+                 tokenizer: Optional[KoreanTokenizer] = None,
+                 k1: float = 1.2,
+                 field_weights: Optional[Dict[str, float]] = None,
+                 field_b: Optional[Dict[str, float]] = None):
+        self.tokenizer = tokenizer or KoreanTokenizer()
+        self.k1 = k1
+        self.field_weights = field_weights or {'question': 3.0, 'answer': 1.0}
+        self.field_b = field_b or {'question': 0.75, 'answer': 0.75}
+
+        self.documents: Dict[Any, Dict] = {}
+        self.doc_lengths: Dict[Any, Dict[str, int]] = {}
+        self.total_lengths: Dict[str, int] = {field: 0 for field in self.FIELDS}
+        # term -> {doc_id: {field: tf}}
+        self.postings: Dict[str, Dict[Any, Dict[str, int]]] = defaultdict(dict)
+
+        self.is_ready = False
+        self.build_time_ms = 0.0
+
+    async def build(self, collection: AsyncIOMotorCollection):
+        """컬렉션 전체를 읽어 통계를 새로 구성합니다."""
+        start = time.time()
+        self.clear()
+
+        async for doc in collection.find({}):
+            self._add(doc)
+
+        self.is_ready = True
+        self.build_time_ms = (time.time() - start) * 1000
+        logging.info(f"✅ BM25F 랭커 구성 완료: {len(self.documents)}개 문서, "
+                     f"{len(self.postings)}개 term, {self.build_time_ms:.2f}ms")
+
+    def clear(self):
+        """통계를 비웁니다."""
+        self.documents.clear()
+        self.doc_lengths.clear()
+        self.total_lengths = {field: 0 for field in self.FIELDS}
+        self.postings.clear()
+        self.is_ready = False
+
+    def add_document(self, doc: Dict):
+        """문서 하나를 추가(또는 교체)합니다."""
+        doc_id = doc.get('_id')
+        if doc_id in self.documents:
+            self._remove(doc_id)
+        self._add(doc)
+
+    def remove_document(self, doc_id: Any):
+        """문서 하나를 제거합니다."""
+        self._remove(doc_id)
+
+    def idf(self, term: str) -> float:
+        """현재 문서 수 기준 용어의 IDF (BM25 양수 IDF, 없는 용어는 0)"""
+        postings = self.postings.get(term)
+        if not postings:
+            return 0.0
+        n = len(self.documents)
+        df = len(postings)
+        return math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+
+    def search(self, query_terms: Iterable[str], top_k: int = 5) -> List[Tuple[float, Dict]]:
+        """
+        질의어 목록으로 상위 문서를 검색합니다.
+
+        Args:
+            query_terms: 질의어 목록 (토큰화 전 키워드도 가능)
+            top_k: 반환할 문서 수
+
+        Returns:
+            List[Tuple[float, Dict]]: (점수, 문서) 목록, 점수 내림차순
+        """
+        terms = set()
+        for term in query_terms:
+            terms.update(self.tokenizer.tokenize(term))
+
+        avg_lengths = self._average_lengths()
+        scores: Dict[Any, float] = defaultdict(float)
+
+        for term in terms:
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for doc_id, field_tfs in postings.items():
+                lengths = self.doc_lengths[doc_id]
+                weighted_tf = 0.0
+                for field, tf in field_tfs.items():
+                    b = self.field_b[field]
+                    norm = 1.0 - b + b * lengths[field] / avg_lengths[field]
+                    weighted_tf += self.field_weights[field] * tf / norm
+                scores[doc_id] += idf * weighted_tf / (self.k1 + weighted_tf)
+
+        top = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+        return [(score, self.documents[doc_id]) for doc_id, score in top]
+
+    def get_stats(self) -> Dict:
+        """랭커 통계를 반환합니다."""
+        return {
+            'is_ready': self.is_ready,
+            'document_count': len(self.documents),
+            'term_count': len(self.postings),
+            'average_lengths': self._average_lengths(),
+            'build_time_ms': self.build_time_ms
+        }
+
+    def _add(self, doc: Dict) -> set:
+        """문서를 posting에 반영하고 추가된 용어를 반환합니다."""
+        doc_id = doc.get('_id')
+        self.documents[doc_id] = doc
+        lengths = {}
+        touched = set()
+
+        for field in self.FIELDS:
+            tokens = self.tokenizer.tokenize(doc.get(field, '') or '')
+            lengths[field] = len(tokens)
+            self.total_lengths[field] += len(tokens)
+            for term, tf in Counter(tokens).items():
+                self.postings[term].setdefault(doc_id, {})[field] = tf
+                touched.add(term)
+
+        self.doc_lengths[doc_id] = lengths
+        return touched
+
+    def _remove(self, doc_id: Any) -> set:
+        """문서를 posting에서 제거하고 영향받은 용어를 반환합니다."""
+        doc = self.documents.pop(doc_id, None)
+        if doc is None:
+            return set()
+
+        lengths = self.doc_lengths.pop(doc_id, {})
+        for field, length in lengths.items():
+            self.total_lengths[field] -= length
+
+        touched = set()
+        for field in self.FIELDS:
+            for term in set(self.tokenizer.tokenize(doc.get(field, '') or '')):
+                postings = self.postings.get(term)
+                if postings is None:
+                    continue
+                postings.pop(doc_id, None)
+                touched.add(term)
+                if not postings:
+                    del self.postings[term]
+        return touched
+
+    def _average_lengths(self) -> Dict[str, float]:
+        """필드별 평균 길이를 반환합니다 (0 나누기 방지)."""
+        n = max(len(self.documents), 1)
+        return {field: max(total / n, 1.0) for field, total in self.total_lengths.items()}
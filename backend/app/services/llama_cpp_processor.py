@@ -4,8 +4,10 @@ import logging
 import time
 import psutil
 import re
+from collections import OrderedDict
 from llama_cpp import Llama
 import os
+from ..config import settings
 from .conversation_style_manager import get_style_manager, ConversationStyle
 from .input_filter import get_input_filter, InputType
 
@@ -19,6 +21,9 @@ class LlamaCppProcessor:
         self.style_manager = get_style_manager()
         self.input_filter = get_input_filter()
         self.current_style = style
+        # (스타일, 템플릿)별 고정 접두부를 평가해 둔 llama 상태 (save_state/load_state)
+        self.prefix_states: "OrderedDict[tuple, Any]" = OrderedDict()
+        self.prefix_stats = {'hits': 0, 'builds': 0, 'evictions': 0}
         self._initialize_model()
         
     def _initialize_model(self):
@@ -48,10 +53,14 @@ class LlamaCppProcessor:
     
     def create_casual_prompt(self, message: str) -> str:
         """일상 대화용 프롬프트 생성"""
+        return f"{self._casual_prefix()}{message}<|end|>\n<|assistant|>\n"
+    
+    def _casual_prefix(self) -> str:
+        """일상 대화 프롬프트의 고정 접두부 (스타일별 시스템 프롬프트)"""
         # 스타일 매니저에서 시스템 프롬프트 가져오기
         system_prompt = self.style_manager.get_system_prompt(self.current_style)
         
-        return f"<|system|>\n{system_prompt}<|end|>\n<|user|>\n{message}<|end|>\n<|assistant|>\n"
+        return f"<|system|>\n{system_prompt}<|end|>\n<|user|>\n"
     
     def process_user_input(self, message: str) -> tuple[str, bool]:
         """사용자 입력 처리 및 필터링"""
@@ -71,6 +80,10 @@ class LlamaCppProcessor:
     
     def create_professional_prompt(self, message: str, db_answer: str) -> str:
         """전문 상담용 프롬프트 생성"""
+        return f"{self._professional_prefix()}{message}\n\n참고자료: {db_answer}\n\n위 참고자료를 바탕으로 정확한 답변을 제공해주세요.<|end|>\n<|assistant|>\n"
+    
+    def _professional_prefix(self) -> str:
+        """전문 상담 프롬프트의 고정 접두부 (시스템 프롬프트 + 전문 상담 규칙)"""
         # 스타일 매니저에서 시스템 프롬프트 가져오기
         system_prompt = self.style_manager.get_system_prompt(self.current_style)
         
@@ -79,7 +92,47 @@ class LlamaCppProcessor:
         
         full_system_prompt = system_prompt + professional_instruction
         
-        return f"<|system|>\n{full_system_prompt}<|end|>\n<|user|>\n{message}\n\n참고자료: {db_answer}\n\n위 참고자료를 바탕으로 정확한 답변을 제공해주세요.<|end|>\n<|assistant|>\n"
+        return f"<|system|>\n{full_system_prompt}<|end|>\n<|user|>\n"
+    
+    def _restore_prefix_state(self, prompt: str):
+        """
+        프롬프트가 알려진 고정 접두부로 시작하면 접두부까지 평가된 llama 상태를 불러옵니다.
+        llama-cpp는 직전 평가 토큰과 겹치는 앞부분을 다시 계산하지 않으므로
+        이후 호출에서는 사용자 메시지/참고자료 부분만 prefill 됩니다.
+        """
+        if not settings.ENABLE_PREFIX_CACHE:
+            return
+        
+        templates = (("casual", self._casual_prefix()), ("professional", self._professional_prefix()))
+        for template, prefix in templates:
+            if not prompt.startswith(prefix):
+                continue
+            
+            key = (self.current_style.value, template)
+            state = self.prefix_states.get(key)
+            if state is None:
+                start_time = time.time()
+                self.llm.reset()
+                self.llm.eval(self.llm.tokenize(prefix.encode("utf-8")))
+                self.prefix_states[key] = self.llm.save_state()
+                self.prefix_stats['builds'] += 1
+                logging.info(f"✅ llama-cpp 접두부 상태 저장: {key} ({(time.time() - start_time) * 1000:.1f}ms)")
+                
+                while len(self.prefix_states) > settings.PREFIX_CACHE_MAX_ENTRIES:
+                    self.prefix_states.popitem(last=False)
+                    self.prefix_stats['evictions'] += 1
+            else:
+                self.llm.load_state(state)
+                self.prefix_states.move_to_end(key)
+                self.prefix_stats['hits'] += 1
+            return
+    
+    def get_prefix_cache_stats(self) -> Dict[str, Any]:
+        """접두부 상태 캐시 통계 반환"""
+        return {
+            **self.prefix_stats,
+            'entries': [list(key) for key in self.prefix_states.keys()]
+        }
     
     def get_optimized_parameters(self) -> Dict[str, Any]:
         """llama-cpp 최적화 파라미터 (스타일별로 조정)"""
@@ -106,6 +159,12 @@ class LlamaCppProcessor:
             # 생성 파라미터 가져오기
             params = self.get_optimized_parameters()
             
+            # 고정 접두부 상태 복원 (시스템 프롬프트 재계산 생략)
+            try:
+                self._restore_prefix_state(prompt)
+            except Exception as e:
+                logging.warning(f"llama-cpp 접두부 상태 복원 실패: {str(e)}")
+            
             # 응답 생성
             response = self.llm(
                 prompt,
@@ -163,6 +222,7 @@ class LlamaCppProcessor:
     
     def cleanup(self):
         """리소스 정리"""
+        self.prefix_states.clear()
         if self.llm:
             del self.llm
             self.llm = None
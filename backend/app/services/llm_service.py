@@ -7,14 +7,21 @@ from .formatting_service import FormattingService
 from .model_manager import get_model_manager, ModelType
 from .llm_processors import LLMProcessorFactory, BaseLLMProcessor
 from .llama_cpp_processor import LlamaCppProcessor
+from .inference_executor import InferenceExecutor, InferenceQueueFullError, make_cancel_stopping_criteria
+from .generation_batcher import GenerationBatcher
+from .token_streamer import AsyncTextIteratorStreamer
+from .prefix_cache import PrefixKVCache
+from .response_cache import EnhancedAnswerCache
+from .model_runtime import get_model_runtime
 # from .finetuned_processor import get_finetuned_processor  # 파인튜닝 모델 사용 시에만 활성화
 from motor.motor_asyncio import AsyncIOMotorDatabase
 import os
+import hashlib
 import logging
 import re
 import time
 from datetime import datetime
-from typing import Dict, List, Tuple, Optional
+from typing import AsyncIterator, Dict, List, Tuple, Optional
 from enum import Enum
 import asyncio
 
@@ -30,6 +37,13 @@ class IntentType(Enum):
     UNKNOWN = "unknown"  # 알 수 없음
 
 class LLMService:
+    # 접두부 KV 캐시 키 (스타일, 템플릿)
+    CASUAL_PREFIX_KEY = ("default", "casual")
+    ENHANCE_PREFIX_KEY = ("default", "enhance")
+    
+    # 채팅 템플릿에서 고정 접두부를 잘라내기 위한 자리표시자
+    _PROMPT_SLOT = "\u0000MESSAGE\u0000"
+    
     def __init__(self, use_db_mode: bool = False, use_llama_cpp: bool = False, use_finetuned: bool = False):
         """
         순수 LLM 서비스 초기화 (DB 의존성 제거)
@@ -47,6 +61,44 @@ class LLMService:
         # 원본 Llama-3.1-8B-Instruct 모델 직접 초기화
         self._initialize_original_llama()
         
+        # 블로킹 generate 호출을 이벤트 루프 밖에서 실행할 추론 실행기
+        self.inference_executor = InferenceExecutor(
+            max_workers=settings.INFERENCE_MAX_WORKERS,
+            max_queue_size=settings.INFERENCE_MAX_QUEUE_SIZE,
+            default_timeout=settings.INFERENCE_TIMEOUT
+        )
+        
+        # 고정 프롬프트 접두부의 KV 상태를 재사용하는 캐시
+        self.prefix_cache = None
+        if settings.ENABLE_PREFIX_CACHE:
+            self.prefix_cache = PrefixKVCache(
+                self.model,
+                self.tokenizer,
+                max_entries=settings.PREFIX_CACHE_MAX_ENTRIES
+            )
+        self._casual_prompt_template = None
+        
+        # (지식 문서 _id, 정규화 질문) 기준 강화 답변 캐시
+        self.response_cache = None
+        if settings.ENABLE_RESPONSE_CACHE:
+            self.response_cache = EnhancedAnswerCache(
+                max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+                max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+                ttl_seconds=settings.RESPONSE_CACHE_TTL
+            )
+        
+        # 동시 생성 요청을 모아 배치 디코딩하는 스케줄러
+        self.generation_batcher = None
+        if settings.ENABLE_GENERATION_BATCHING:
+            self.generation_batcher = GenerationBatcher(
+                self.model,
+                self.tokenizer,
+                self.inference_executor,
+                max_batch_size=settings.GENERATION_BATCH_MAX_SIZE,
+                batch_window_ms=settings.GENERATION_BATCH_WINDOW_MS,
+                prefix_cache=self.prefix_cache
+            )
+        
         # DB 서비스는 외부에서 주입받음 (의존성 분리)
         self.search_service = None
         
@@ -68,23 +120,16 @@ class LLMService:
     def _initialize_original_llama(self):
         """원본 Llama-3.1-8B-Instruct 모델 직접 초기화"""
         try:
-            from transformers import AutoTokenizer, AutoModelForCausalLM
-            import torch
-            
             # 모델 경로 설정
             model_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), 
                                     "models", "Llama-3.1-8B-Instruct")
             
             logging.info(f"원본 Llama-3.1-8B-Instruct 모델 로딩 중: {model_path}")
             
-            # 토크나이저와 모델 로드
-            self.tokenizer = AutoTokenizer.from_pretrained(model_path)
-            self.model = AutoModelForCausalLM.from_pretrained(
-                model_path,
-                torch_dtype=torch.float16,
-                device_map="auto",
-                trust_remote_code=True
-            )
+            # 공유 모델 런타임에서 토크나이저와 모델 핸들 획득 (같은 가중치는 한 벌만 로드)
+            self.model_handle = get_model_runtime().acquire(model_path, consumer="llm_service", torch_dtype=torch.float16)
+            self.tokenizer = self.model_handle.tokenizer
+            self.model = self.model_handle.model
             
             logging.info("✅ 원본 Llama-3.1-8B-Instruct 모델 로딩 완료")
             
@@ -282,18 +327,18 @@ class LLMService:
         try:
             # 1. DB에서 관련 답변 검색
             db_start_time = time.time()
-            db_answer = await self.search_service.search_answer(message)
+            knowledge = await self.search_service.search_knowledge(message)
             db_end_time = time.time()
             db_processing_time = (db_end_time - db_start_time) * 1000
             
             self.response_stats['db_processing_time'] += db_processing_time
             
-            if db_answer:
+            if knowledge:
                 self.response_stats['db_responses'] += 1
-                logging.info(f"DB에서 답변 찾음: {db_answer[:100]}...")
+                logging.info(f"DB에서 답변 찾음: {knowledge['answer'][:100]}...")
                 
-                # 2. LLM으로 답변 강화
-                enhanced_answer = await self._enhance_db_answer_with_llm(message, db_answer)
+                # 2. LLM으로 답변 강화 (캐시 우선)
+                enhanced_answer = await self._enhance_knowledge_answer(message, knowledge)
                 return enhanced_answer
             else:
                 logging.info("DB에서 관련 답변을 찾지 못함")
@@ -333,7 +378,9 @@ class LLMService:
             if hasattr(self, 'finetuned_processor') and self.finetuned_processor:
                 # 파인튜닝된 모델로 응답 생성
                 prompt = f"사용자: {message}\n상담사:"
-                response = self.finetuned_processor.generate_response(prompt, max_length=256, temperature=0.7)
+                response = await self.inference_executor.submit(
+                    self.finetuned_processor.generate_response, prompt, max_length=256, temperature=0.7
+                )
                 self.response_stats['finetuned_responses'] += 1
                 return response
             else:
@@ -357,7 +404,7 @@ class LLMService:
             
             # 일반적인 경우 LLM 처리
             prompt = self.llama_cpp_processor.create_casual_prompt(message)
-            response = self.llama_cpp_processor.generate_response(prompt)
+            response = await self.inference_executor.submit(self.llama_cpp_processor.generate_response, prompt)
             
             if response:
                 self.response_stats['llama_responses'] += 1
@@ -372,33 +419,15 @@ class LLMService:
     async def _handle_transformers_casual(self, message: str) -> str:
         """원본 Llama-3.1-8B-Instruct 모델을 사용한 일상 대화 처리 (Hugging Face 공식 방식)"""
         try:
-            # Hugging Face 공식 chat template 사용
-            messages = [
-                {"role": "user", "content": message}
-            ]
+            # Hugging Face 공식 chat template 적용
+            formatted_prompt = self._build_casual_prompt(message)
             
-            # 공식 chat template 적용
-            formatted_prompt = self.tokenizer.apply_chat_template(
-                messages, 
-                tokenize=False, 
-                add_generation_prompt=True
-            )
+            # 토크나이징 (고정 접두부 토큰 + 메시지 토큰)
+            input_ids = self._encode_prompt(self.CASUAL_PREFIX_KEY, *self._casual_prompt_parts(message))
             
-            # 토크나이징
-            inputs = self.tokenizer(formatted_prompt, return_tensors="pt")
-            
-            # 원래 잘 되던 설정으로 복원
-            with torch.no_grad():
-                outputs = self.model.generate(
-                    inputs.input_ids,
-                    max_new_tokens=30,         # 75 -> 30으로 복원 (간결한 응답)
-                    temperature=0.7,           # 0.3 -> 0.7로 복원 (자연스러움)
-                    top_p=0.9,                 # 0.8 -> 0.9로 복원
-                    do_sample=True,            # 샘플링 활성화
-                    repetition_penalty=1.1,    # 1.2 -> 1.1로 복원
-                    pad_token_id=self.tokenizer.eos_token_id,
-                    eos_token_id=self.tokenizer.eos_token_id
-                )
+            # 추론 실행기 스레드에서 생성
+            outputs = await self._run_generation(
+                input_ids, prefix_key=self.CASUAL_PREFIX_KEY, **self._casual_generation_kwargs())
             
             # 응답 디코딩 (공식 방식)
             response = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
@@ -428,6 +457,9 @@ class LLMService:
             else:
                 return "어떤 도움이 필요하신가요?"
                 
+        except InferenceQueueFullError as e:
+            logging.warning(f"추론 대기열 초과로 일상 대화 거절: {str(e)}")
+            return "현재 요청이 많아 답변이 지연되고 있습니다. 잠시 후 다시 시도해주세요."
         except Exception as e:
             logging.error(f"원본 Llama 일상 대화 처리 오류: {str(e)}")
             return "죄송합니다. 응답 생성 중 오류가 발생했습니다."
@@ -452,19 +484,19 @@ class LLMService:
             # 1. DB에서 관련 답변 검색
             logging.info("🔍 DB 검색 시작")
             db_start_time = time.time()
-            db_answer = await self.search_service.search_answer(message)
+            knowledge = await self.search_service.search_knowledge(message)
             db_end_time = time.time()
             db_processing_time = (db_end_time - db_start_time) * 1000
             
             self.response_stats['db_processing_time'] += db_processing_time
             
-            if db_answer:
+            if knowledge:
                 self.response_stats['db_responses'] += 1
-                logging.info(f"✅ DB에서 답변 찾음: {db_answer[:100]}...")
+                logging.info(f"✅ DB에서 답변 찾음: {knowledge['answer'][:100]}...")
                 
-                # 2. LLM으로 답변 강화
+                # 2. LLM으로 답변 강화 (캐시 우선)
                 logging.info("🔍 LLM으로 답변 강화 시작")
-                enhanced_answer = await self._enhance_db_answer_with_llm(message, db_answer)
+                enhanced_answer = await self._enhance_knowledge_answer(message, knowledge)
                 logging.info(f"✅ LLM 강화 완료: {enhanced_answer[:100]}...")
                 return enhanced_answer
             else:
@@ -478,6 +510,111 @@ class LLMService:
             # 오류 발생 시 일반 대화로 폴백
             return await self.get_conversation_response(message)
 
+    # ===== 스트리밍 응답 =====
+
+    async def stream_generation(self, input_ids, prefix_key=None, **generate_kwargs) -> AsyncIterator[str]:
+        """
+        추론 실행기에서 generate를 실행하면서 생성된 텍스트 조각을 순서대로 내보냅니다.
+        스트림 소비가 중단되면(클라이언트 연결 종료 등) 생성도 취소됩니다.
+        """
+        loop = asyncio.get_running_loop()
+        streamer = AsyncTextIteratorStreamer(self.tokenizer, loop)
+        
+        generation = asyncio.ensure_future(self.inference_executor.submit(
+            self._generate, input_ids, cancellable=True, prefix_key=prefix_key,
+            streamer=streamer, **generate_kwargs
+        ))
+        # 생성이 예외로 끝나도 스트림이 닫히도록 함
+        generation.add_done_callback(lambda _: streamer.close())
+        
+        try:
+            async for text in streamer:
+                yield text
+            await generation
+        finally:
+            if not generation.done():
+                generation.cancel()
+
+    async def stream_conversation_response(self, message: str) -> AsyncIterator[str]:
+        """
+        일상 대화 응답 스트리밍
+        transformers 경로만 토큰 단위로 내보내고, llama-cpp/파인튜닝/인사말은 완성 응답을 한 번에 내보냅니다.
+        """
+        uses_finetuned = self.use_finetuned and getattr(self, 'finetuned_processor', None)
+        is_greeting = any(word in message.lower() for word in ['안녕', '하이', '반갑'])
+        if self.use_llama_cpp or uses_finetuned or is_greeting:
+            yield await self.get_conversation_response(message)
+            return
+        
+        emitted = False
+        try:
+            input_ids = self._encode_prompt(self.CASUAL_PREFIX_KEY, *self._casual_prompt_parts(message))
+            async for text in self.stream_generation(
+                    input_ids, prefix_key=self.CASUAL_PREFIX_KEY, **self._casual_generation_kwargs()):
+                emitted = True
+                yield text
+            
+            if emitted:
+                self.response_stats['llama_responses'] += 1
+            else:
+                yield "어떤 도움이 필요하신가요?"
+                
+        except InferenceQueueFullError as e:
+            logging.warning(f"추론 대기열 초과로 일상 대화 스트리밍 거절: {str(e)}")
+            if not emitted:
+                yield "현재 요청이 많아 답변이 지연되고 있습니다. 잠시 후 다시 시도해주세요."
+        except Exception as e:
+            logging.error(f"일상 대화 스트리밍 오류: {str(e)}")
+            if not emitted:
+                yield "죄송합니다. 응답 생성 중 오류가 발생했습니다."
+
+    async def stream_search_and_enhance_answer(self, message: str) -> AsyncIterator[str]:
+        """DB 검색 후 LLM 강화 답변 스트리밍 (DB 답변이 없으면 일상 대화 스트리밍으로 폴백)"""
+        knowledge = None
+        if self.search_service:
+            try:
+                db_start_time = time.time()
+                knowledge = await self.search_service.search_knowledge(message)
+                self.response_stats['db_processing_time'] += (time.time() - db_start_time) * 1000
+            except Exception as e:
+                logging.error(f"❌ 스트리밍 DB 검색 중 오류: {str(e)}")
+        
+        if not knowledge:
+            async for text in self.stream_conversation_response(message):
+                yield text
+            return
+        
+        self.response_stats['db_responses'] += 1
+        db_answer = knowledge['answer']
+        
+        # 미리 생성/캐시된 강화 답변이 있으면 생성 없이 한 번에 전달
+        cached = self.get_precomputed_enhancement(knowledge) or self._get_cached_enhancement(message, knowledge)
+        if cached:
+            yield cached
+            return
+        
+        emitted = False
+        parts = []
+        try:
+            input_ids = self._encode_prompt(self.ENHANCE_PREFIX_KEY, *self._enhance_prompt_parts(message, db_answer))
+            async for text in self.stream_generation(
+                    input_ids, prefix_key=self.ENHANCE_PREFIX_KEY, **self._enhance_generation_kwargs()):
+                emitted = True
+                parts.append(text)
+                yield text
+            
+            if emitted:
+                self.response_stats['llama_responses'] += 1
+                self._cache_enhancement(message, knowledge, "".join(parts).strip())
+            else:
+                yield self._format_db_answer(db_answer)
+                
+        except Exception as e:
+            logging.error(f"DB 답변 LLM 강화 스트리밍 중 오류: {str(e)}")
+            # 아직 아무것도 보내지 않았으면 DB 답변 그대로 전달
+            if not emitted:
+                yield self._format_db_answer(db_answer)
+
     async def format_and_send_response(self, response: str) -> str:
         """응답 포맷팅 및 전송"""
         try:
@@ -502,36 +639,83 @@ class LLMService:
         """전문 상담 처리"""
         return await self.search_and_enhance_answer(message)
 
+    async def _enhance_knowledge_answer(self, message: str, knowledge: Dict) -> str:
+        """
+        지식 문서 답변을 LLM으로 강화합니다.
+        배치로 미리 생성된 강화 답변이 현재 답변 기준으로 유효하면 그것을, 
+        같은 문서에 같은(정규화 기준) 질문이 다시 오면 캐시된 강화 답변을 바로 반환합니다.
+        """
+        precomputed = self.get_precomputed_enhancement(knowledge)
+        if precomputed:
+            return precomputed
+        
+        cached = self._get_cached_enhancement(message, knowledge)
+        if cached:
+            return cached
+        
+        db_answer = knowledge['answer']
+        enhanced_answer = await self._enhance_db_answer_with_llm(message, db_answer)
+        
+        # DB 답변 폴백(강화 실패)은 캐시하지 않음
+        if enhanced_answer != self._format_db_answer(db_answer):
+            self._cache_enhancement(message, knowledge, enhanced_answer)
+        return enhanced_answer
+
+    def enhancement_source_hash(self, db_answer: str) -> str:
+        """
+        강화 답변의 원본 해시 (강화 지시문 + DB 답변)
+        답변이나 지시문이 바뀌면 값이 달라져 미리 생성된 강화 답변이 무효화됩니다.
+        """
+        instruction, _ = self._enhance_prompt_parts("", "")
+        return hashlib.sha1((instruction + (db_answer or "")).encode('utf-8')).hexdigest()
+
+    def get_precomputed_enhancement(self, knowledge: Dict) -> Optional[str]:
+        """지식 문서에 저장된 배치 생성 강화 답변이 현재 답변과 일치하면 반환합니다."""
+        if not settings.ENABLE_PRECOMPUTED_ENHANCEMENT:
+            return None
+        enhanced_answer = knowledge.get('enhanced_answer')
+        if not enhanced_answer:
+            return None
+        if knowledge.get('enhanced_source_hash') != self.enhancement_source_hash(knowledge.get('answer', '')):
+            # 배치 이후 새로 바뀐 답변 -> 실시간 생성
+            return None
+        logging.info(f"⚡ 미리 생성된 강화 답변 사용: {knowledge.get('question', '')[:50]}")
+        return enhanced_answer
+
+    def _get_cached_enhancement(self, message: str, knowledge: Dict) -> Optional[str]:
+        """응답 캐시에서 강화 답변을 조회합니다."""
+        if self.response_cache is None or knowledge.get('_id') is None:
+            return None
+        source_hash = self.enhancement_source_hash(knowledge.get('answer', ''))
+        cached = self.response_cache.get(knowledge['_id'], message, source_hash)
+        if cached:
+            logging.info(f"⚡ 강화 답변 캐시 적중: {knowledge.get('question', '')[:50]}")
+        return cached
+
+    def _cache_enhancement(self, message: str, knowledge: Dict, enhanced_answer: str):
+        """
+        강화 답변을 응답 캐시에 저장합니다 (너무 짧은 응답은 제외).
+        강화에 쓴 답변의 해시를 키에 넣어, 생성 중 문서가 수정되었다면 이전 답변 기준 결과가 조회되지 않게 함
+        """
+        if self.response_cache is None or knowledge.get('_id') is None:
+            return
+        if len(enhanced_answer.strip()) < 20:
+            return
+        source_hash = self.enhancement_source_hash(knowledge.get('answer', ''))
+        self.response_cache.put(knowledge['_id'], message, source_hash, enhanced_answer)
+
     async def _enhance_db_answer_with_llm(self, message: str, db_answer: str) -> str:
         """DB 답변을 원본 Llama-3.1-8B-Instruct 모델로 강화"""
         try:
             # LLaMA 형식 프롬프트 (더 간결하고 정확하게)
-            formatted_prompt = f"""<|im_start|>user
-사용자 질문: {message}
-
-DB 답변: {db_answer}
-
-위 DB 답변을 바탕으로 간결하고 정확한 해결 방법을 알려주세요. DB 답변의 핵심 내용을 유지하면서 친절하게 설명해주세요. 불필요한 확장은 하지 마세요.<|im_end|>
-<|im_start|>assistant
-"""
+            formatted_prompt = self._build_enhance_prompt(message, db_answer)
             
-            # 토크나이징
-            inputs = self.tokenizer(formatted_prompt, return_tensors="pt")
-            
-            # 안정적인 응답을 위한 설정
-            with torch.no_grad():
-                outputs = self.model.generate(
-                    inputs.input_ids,
-                    max_new_tokens=1000,        # 500 -> 1000으로 증가 (완전한 답변 보장)
-                    temperature=0.7,           # 자연스러움 유지
-                    top_p=0.9,                 # 안정성
-                    do_sample=True,
-                    repetition_penalty=1.1,    # 반복 방지
-                    pad_token_id=self.tokenizer.eos_token_id,
-                    eos_token_id=self.tokenizer.eos_token_id,
-                    early_stopping=True,       # 조기 종료 활성화
-                    num_beams=1               # 단일 빔으로 속도 향상
-                )
+            # 토크나이징 (고정 지시문 토큰 + 질문/DB 답변 토큰)
+            input_ids = self._encode_prompt(self.ENHANCE_PREFIX_KEY, *self._enhance_prompt_parts(message, db_answer))
+            
+            # 안정적인 응답을 위한 설정 (추론 실행기 스레드에서 생성)
+            outputs = await self._run_generation(
+                input_ids, prefix_key=self.ENHANCE_PREFIX_KEY, **self._enhance_generation_kwargs())
             
             # 응답 디코딩
             response = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
@@ -569,6 +753,114 @@ DB 답변: {db_answer}
             # 오류 발생 시 DB 답변 그대로 반환
             return self._format_db_answer(db_answer)
 
+    def _build_casual_prompt(self, message: str) -> str:
+        """일상 대화 프롬프트 (Hugging Face 공식 chat template)"""
+        return "".join(self._casual_prompt_parts(message))
+
+    def _casual_prompt_parts(self, message: str) -> Tuple[str, str]:
+        """
+        일상 대화 프롬프트를 (고정 접두부, 메시지 부분)으로 나눕니다.
+        chat template을 자리표시자로 한 번 렌더링해 메시지 앞까지를 접두부로 사용합니다.
+        """
+        if self._casual_prompt_template is None:
+            messages = [
+                {"role": "user", "content": self._PROMPT_SLOT}
+            ]
+            rendered = self.tokenizer.apply_chat_template(
+                messages, 
+                tokenize=False, 
+                add_generation_prompt=True
+            )
+            self._casual_prompt_template = tuple(rendered.split(self._PROMPT_SLOT, 1))
+        
+        prefix, tail = self._casual_prompt_template
+        return prefix, message + tail
+
+    def _build_enhance_prompt(self, message: str, db_answer: str) -> str:
+        """DB 답변 강화 프롬프트"""
+        return "".join(self._enhance_prompt_parts(message, db_answer))
+
+    def _enhance_prompt_parts(self, message: str, db_answer: str) -> Tuple[str, str]:
+        """
+        DB 답변 강화 프롬프트를 (고정 지시문, 질문/DB 답변 부분)으로 나눕니다.
+        지시문을 앞에 두어 모든 요청이 같은 접두부를 공유하도록 합니다.
+        """
+        prefix = """<|im_start|>user
+아래 DB 답변을 바탕으로 간결하고 정확한 해결 방법을 알려주세요. DB 답변의 핵심 내용을 유지하면서 친절하게 설명해주세요. 불필요한 확장은 하지 마세요.
+
+"""
+        body = f"""사용자 질문: {message}
+
+DB 답변: {db_answer}<|im_end|>
+<|im_start|>assistant
+"""
+        return prefix, body
+
+    def _encode_prompt(self, prefix_key, prefix: str, body: str):
+        """
+        프롬프트를 (1, L) 입력 토큰으로 만듭니다.
+        접두부 캐시가 켜져 있으면 접두부 토큰이 항상 같도록 접두부와 가변 부분을 따로 토크나이징합니다.
+        """
+        if self.prefix_cache is not None:
+            return self.prefix_cache.build_input_ids(prefix_key, prefix, body)
+        return self.tokenizer(prefix + body, return_tensors="pt").input_ids
+
+    def _casual_generation_kwargs(self) -> Dict:
+        """일상 대화 생성 설정 (원래 잘 되던 설정으로 복원)"""
+        return dict(
+            max_new_tokens=30,         # 75 -> 30으로 복원 (간결한 응답)
+            temperature=0.7,           # 0.3 -> 0.7로 복원 (자연스러움)
+            top_p=0.9,                 # 0.8 -> 0.9로 복원
+            do_sample=True,            # 샘플링 활성화
+            repetition_penalty=1.1,    # 1.2 -> 1.1로 복원
+            pad_token_id=self.tokenizer.eos_token_id,
+            eos_token_id=self.tokenizer.eos_token_id
+        )
+
+    def _enhance_generation_kwargs(self) -> Dict:
+        """DB 답변 강화 생성 설정"""
+        return dict(
+            max_new_tokens=1000,        # 500 -> 1000으로 증가 (완전한 답변 보장)
+            temperature=0.7,           # 자연스러움 유지
+            top_p=0.9,                 # 안정성
+            do_sample=True,
+            repetition_penalty=1.1,    # 반복 방지
+            pad_token_id=self.tokenizer.eos_token_id,
+            eos_token_id=self.tokenizer.eos_token_id,
+            early_stopping=True,       # 조기 종료 활성화
+            num_beams=1               # 단일 빔으로 속도 향상
+        )
+
+    async def _run_generation(self, input_ids, prefix_key=None, **generate_kwargs):
+        """
+        생성 요청 실행 (배칭 활성화 시 배치 스케줄러, 아니면 추론 실행기에서 단건 generate)
+        
+        Returns:
+            model.generate와 같은 형태의 출력 토큰 텐서
+        """
+        if self.generation_batcher is not None:
+            return await self.generation_batcher.generate(input_ids, prefix_key=prefix_key, **generate_kwargs)
+        return await self.inference_executor.submit(
+            self._generate, input_ids, cancellable=True, prefix_key=prefix_key, **generate_kwargs)
+
+    def _generate(self, input_ids, cancel_event=None, prefix_key=None, **generate_kwargs):
+        """
+        model.generate 동기 호출 (추론 실행기 스레드에서 실행)
+        
+        Args:
+            input_ids: 입력 토큰 텐서
+            cancel_event: 설정되면 다음 토큰에서 생성을 멈추는 취소 이벤트
+            prefix_key: 입력 앞부분에 해당하는 접두부 KV 캐시 키 (있으면 접두부 이후부터 prefill)
+        """
+        if cancel_event is not None:
+            generate_kwargs['stopping_criteria'] = make_cancel_stopping_criteria(cancel_event)
+        if prefix_key is not None and self.prefix_cache is not None:
+            _, past_key_values = self.prefix_cache.past_for(prefix_key, input_ids)
+            if past_key_values is not None:
+                generate_kwargs['past_key_values'] = past_key_values
+        with torch.no_grad():
+            return self.model.generate(input_ids, **generate_kwargs)
+
     def _format_db_answer(self, db_answer: str) -> str:
         """DB 답변 포맷팅 (메타데이터 및 불필요한 문자 제거)"""
         try:
@@ -651,6 +943,20 @@ DB 답변: {db_answer}
         else:
             stats['success_rate'] = 0
         
+        # 추론 실행기 지표 (대기열 길이, 대기 시간)
+        stats['inference_executor'] = self.inference_executor.get_stats()
+        if self.generation_batcher is not None:
+            stats['generation_batcher'] = self.generation_batcher.get_stats()
+        if self.prefix_cache is not None:
+            stats['prefix_cache'] = self.prefix_cache.get_stats()
+        if self.response_cache is not None:
+            stats['response_cache'] = self.response_cache.get_stats()
+        
+        # 모델별 가중치 메모리와 참조 현황
+        stats['model_runtime'] = get_model_runtime().get_memory_report()
+        if self.use_llama_cpp and getattr(self, 'llama_cpp_processor', None):
+            stats['llama_cpp_prefix_cache'] = self.llama_cpp_processor.get_prefix_cache_stats()
+        
         return stats
 
     def log_response_stats(self):
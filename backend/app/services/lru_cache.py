@@ -0,0 +1,168 @@
+"""
+LRU + TTL 캐시 모듈
+서비스별 질의 캐시(패턴 매칭 결과, 강화 답변 등)가 공통으로 쓰는 캐시 구성 요소.
+OrderedDict로 조회/삽입/제거를 O(1)로 처리하고, TTL은 시스템 시각 변경의 영향을 받지 않도록
+time.monotonic 기준으로 계산한다.
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# 제거 콜백: (키, 값, 사유) 사유는 "evicted" / "expired" / "invalidated" / "replaced"
+RemoveCallback = Callable[[Hashable, Any, str], None]
+
+
+def default_sizeof(value: Any) -> int:
+    """값의 대략적인 크기(바이트). 문자열은 UTF-8 길이, 그 외는 sys.getsizeof."""
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """
+    항목 수/바이트 예산과 TTL을 갖는 LRU 캐시
+
+    - get: TTL이 지난 항목은 제거하고 미스로 처리, 적중 시 최근 사용으로 이동
+    - put: 예산을 넘으면 가장 오래 쓰지 않은 항목부터 제거 (popitem, O(1))
+    - on_remove: 항목이 빠질 때마다 호출 (보조 색인 유지용, 캐시 락을 잡은 상태에서 호출)
+    - lock: 여러 연산을 묶어야 하는 호출자가 함께 잡을 수 있는 재진입 락
+    """
+
+    def __init__(self, max_entries: int = 1000, max_bytes: Optional[int] = None,
+                 ttl_seconds: Optional[float] = None,
+                 sizeof: Callable[[Any], int] = default_sizeof,
+                 on_remove: Optional[RemoveCallback] = None):
+        """
+        Args:
+            max_entries: 최대 항목 수
+            max_bytes: 값의 최대 누적 크기 (None이면 제한 없음)
+            ttl_seconds: 항목 유효 시간(초, None이면 만료 없음)
+            sizeof: 값 크기 계산 함수
+            on_remove: 항목 제거 콜백
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.sizeof = sizeof
+        self.on_remove = on_remove
+
+        # key -> (value, size, expires_at)
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int, float]]" = OrderedDict()
+        self._bytes = 0
+        self.lock = threading.RLock()
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'puts': 0,
+            'expired': 0,
+            'evictions': 0,
+            'invalidations': 0
+        }
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """캐시된 값을 반환합니다. 없거나 만료되었으면 default."""
+        with self.lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return default
+
+            if entry[2] <= time.monotonic():
+                self._remove(key, 'expired')
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> bool:
+        """
+        값을 저장합니다. 바이트 예산보다 큰 값은 저장하지 않고 False를 반환합니다.
+
+        Args:
+            key: 캐시 키
+            value: 저장할 값
+            ttl_seconds: 이 항목만의 유효 시간 (None이면 캐시 기본값)
+        """
+        size = self.sizeof(value) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return False
+
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        expires_at = time.monotonic() + ttl if ttl is not None else float('inf')
+
+        with self.lock:
+            if key in self._entries:
+                self._remove(key, 'replaced')
+
+            self._entries[key] = (value, size, expires_at)
+            self._bytes += size
+            self.stats['puts'] += 1
+
+            while self._entries and (len(self._entries) > self.max_entries
+                                     or (self.max_bytes is not None and self._bytes > self.max_bytes)):
+                oldest = next(iter(self._entries))
+                self._remove(oldest, 'evicted')
+                self.stats['evictions'] += 1
+            return True
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """항목을 무효화하고 값을 반환합니다."""
+        with self.lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            self._remove(key, 'invalidated')
+            self.stats['invalidations'] += 1
+            return entry[0]
+
+    def clear(self):
+        """모든 항목을 제거합니다 (제거 콜백은 호출하지 않음)."""
+        with self.lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self.lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[2] > time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get_stats(self) -> Dict:
+        """캐시 통계를 반환합니다."""
+        with self.lock:
+            stats = dict(self.stats)
+            entries = len(self._entries)
+            size = self._bytes
+        lookups = stats['hits'] + stats['misses']
+        return {
+            **stats,
+            'entries': entries,
+            'bytes': size,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'ttl_seconds': self.ttl_seconds,
+            'hit_rate': stats['hits'] / lookups if lookups else 0.0
+        }
+
+    def _remove(self, key: Hashable, reason: str):
+        """항목 하나를 제거합니다 (락을 잡은 상태에서 호출)."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry[1]
+        if self.on_remove is not None:
+            self.on_remove(key, entry[0], reason)
@@ -1,5 +1,6 @@
 from transformers import AutoTokenizer, AutoModelForCausalLM
 import torch
+from .model_runtime import get_model_runtime, ModelHandle
 import os
 import logging
 import time
@@ -25,6 +26,7 @@ class ModelManager:
     
     def __init__(self):
         self.models: Dict[str, Tuple[AutoModelForCausalLM, AutoTokenizer]] = {}
+        self.handles: Dict[str, ModelHandle] = {}  # 공유 모델 런타임 핸들
         self.current_model: Optional[str] = None
         self.model_configs = {
             ModelType.LLAMA_2_7B_CHAT.value: ModelConfig(
@@ -110,19 +112,9 @@ class ModelManager:
             
             logging.info(f"Loading model: {model_type} from {model_path}")
             
-            # 토크나이저 로딩
-            tokenizer = AutoTokenizer.from_pretrained(model_path)
-            if tokenizer.pad_token is None:
-                tokenizer.pad_token = tokenizer.eos_token
-            
-            # 모델 로딩
-            model = AutoModelForCausalLM.from_pretrained(
-                model_path,
-                torch_dtype=torch.float16,
-                device_map="auto",
-                trust_remote_code=True,
-                low_cpu_mem_usage=True
-            )
+            # 공유 모델 런타임에서 토크나이저/모델 획득 (다른 서비스가 이미 로드했으면 공유)
+            handle = get_model_runtime().acquire(model_path, consumer="model_manager", torch_dtype=torch.float16)
+            model, tokenizer = handle.model, handle.tokenizer
             
             # 로딩 완료 후 시스템 메트릭
             load_end_time = time.time()
@@ -133,6 +125,7 @@ class ModelManager:
             
             # 모델 저장
             self.models[model_type] = (model, tokenizer)
+            self.handles[model_type] = handle
             self.current_model = model_type
             
             logging.info(f"✅ Model {model_type} loaded successfully in {load_time:.2f}ms!")
@@ -149,14 +142,11 @@ class ModelManager:
                 # 언로딩 시작 전 시스템 메트릭
                 self.log_system_metrics("모델 언로딩 시작", model_type)
                 
-                model, tokenizer = self.models[model_type]
-                
-                # GPU 메모리 해제
-                del model
-                del tokenizer
-                
-                # 모델 제거
+                # 모델 제거 후 런타임 참조 해제 (다른 소비자가 없을 때만 실제 메모리 해제)
                 del self.models[model_type]
+                handle = self.handles.pop(model_type, None)
+                if handle is not None:
+                    handle.release()
                 
                 # 현재 모델이 언로딩된 모델이면 None으로 설정
                 if self.current_model == model_type:
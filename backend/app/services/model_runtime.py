@@ -0,0 +1,259 @@
+"""
+모델 런타임 모듈
+토크나이저와 가중치를 한 곳에서 소유하고, 같은 가중치 세트를 요청하는 모든 소비자
+(LLMService, HybridResponseGenerator, ModelManager, FinetunedProcessor)에게
+참조 카운트 핸들을 나눠 준다. 같은 가중치는 프로세스에 한 벌만 올라간다.
+"""
+
+import gc
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+import psutil
+import torch
+from transformers import AutoModelForCausalLM, AutoTokenizer
+
+# (모델 경로, LoRA 어댑터 경로, dtype, 양자화 여부)
+RuntimeKey = Tuple[str, Optional[str], str, bool]
+
+
+@dataclass
+class _LoadedModel:
+    """런타임이 소유하는 로드된 모델 한 벌"""
+    key: RuntimeKey
+    model: Any
+    tokenizer: Any
+    load_ms: float
+    weight_bytes: int
+    refcount: int = 0
+    consumers: Dict[str, int] = field(default_factory=dict)
+    loaded_at: float = field(default_factory=time.time)
+
+
+class ModelHandle:
+    """
+    런타임이 빌려주는 모델 핸들
+    release()를 호출하면 참조가 해제되고, 마지막 참조가 해제되면 가중치가 내려간다.
+    """
+
+    def __init__(self, runtime: "ModelRuntime", entry: _LoadedModel, consumer: str):
+        self._runtime = runtime
+        self._entry = entry
+        self.consumer = consumer
+        self.released = False
+
+    @property
+    def model(self):
+        return self._entry.model
+
+    @property
+    def tokenizer(self):
+        return self._entry.tokenizer
+
+    @property
+    def key(self) -> RuntimeKey:
+        return self._entry.key
+
+    def release(self):
+        """참조를 해제합니다 (여러 번 호출해도 한 번만 반영)."""
+        if not self.released:
+            self.released = True
+            self._runtime._release(self._entry, self.consumer)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+class ModelRuntime:
+    """같은 가중치 세트를 한 번만 로드하는 모델 레지스트리"""
+
+    def __init__(self):
+        self._models: Dict[RuntimeKey, _LoadedModel] = {}
+        self._lock = threading.Lock()
+        self._load_locks: Dict[RuntimeKey, threading.Lock] = {}
+
+        self.stats = {
+            'loads': 0,
+            'shared_acquires': 0,
+            'unloads': 0
+        }
+
+    def acquire(self, model_path: str, consumer: str, torch_dtype=torch.float16,
+                adapter_path: Optional[str] = None, quantization_config=None,
+                device_map: Optional[str] = "auto") -> ModelHandle:
+        """
+        모델 핸들을 얻습니다. 이미 로드된 가중치 세트면 로드 없이 참조만 늘립니다.
+
+        Args:
+            model_path: 기본 모델 경로
+            consumer: 사용하는 쪽 이름 (메모리 보고용)
+            torch_dtype: 가중치 dtype
+            adapter_path: LoRA 어댑터 경로 (있으면 기본 모델에 어댑터를 입힌 별도 가중치 세트)
+            quantization_config: BitsAndBytes 양자화 설정
+            device_map: from_pretrained device_map
+
+        Returns:
+            ModelHandle: 모델/토크나이저 핸들
+        """
+        key = self._make_key(model_path, torch_dtype, adapter_path, quantization_config)
+
+        # 같은 키의 동시 로드는 한 번만 수행하고, 다른 키의 로드는 서로 막지 않음
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                entry = self._models.get(key)
+                if entry is not None:
+                    self.stats['shared_acquires'] += 1
+                    logging.info(f"♻️ 로드된 모델 공유: {os.path.basename(key[0])} -> {consumer}")
+                    return self._add_ref(entry, consumer)
+
+            entry = self._load(key, model_path, torch_dtype, adapter_path, quantization_config, device_map)
+            with self._lock:
+                self._models[key] = entry
+                return self._add_ref(entry, consumer)
+
+    def get_memory_report(self) -> Dict:
+        """모델별 가중치 크기와 참조 현황, 프로세스 상주 메모리를 반환합니다."""
+        with self._lock:
+            models = [
+                {
+                    'model_path': entry.key[0],
+                    'adapter_path': entry.key[1],
+                    'dtype': entry.key[2],
+                    'quantized': entry.key[3],
+                    'weight_mb': entry.weight_bytes / 1024**2,
+                    'refcount': entry.refcount,
+                    'consumers': dict(entry.consumers),
+                    'load_ms': entry.load_ms,
+                    'device_map': self._device_summary(entry.model)
+                }
+                for entry in self._models.values()
+            ]
+
+        report = {
+            **self.stats,
+            'models': models,
+            'total_weight_mb': sum(m['weight_mb'] for m in models),
+            'process_rss_mb': psutil.Process().memory_info().rss / 1024**2
+        }
+        if torch.cuda.is_available():
+            report['cuda_allocated_mb'] = torch.cuda.memory_allocated() / 1024**2
+            report['cuda_reserved_mb'] = torch.cuda.memory_reserved() / 1024**2
+        return report
+
+    def _make_key(self, model_path: str, torch_dtype, adapter_path: Optional[str], quantization_config) -> RuntimeKey:
+        """경로는 실제 경로로 정규화해 같은 가중치가 다른 문자열로 두 번 로드되지 않도록 합니다."""
+        return (
+            os.path.realpath(model_path),
+            os.path.realpath(adapter_path) if adapter_path else None,
+            str(torch_dtype).replace('torch.', ''),
+            quantization_config is not None
+        )
+
+    def _load(self, key: RuntimeKey, model_path: str, torch_dtype, adapter_path: Optional[str],
+              quantization_config, device_map: Optional[str]) -> _LoadedModel:
+        """토크나이저와 가중치를 로드합니다 (키별 로드 락을 잡은 상태에서 호출)."""
+        logging.info(f"모델 로딩: {model_path} (dtype={key[2]}, adapter={adapter_path})")
+        start_time = time.time()
+
+        tokenizer = AutoTokenizer.from_pretrained(model_path, trust_remote_code=True)
+        if tokenizer.pad_token is None:
+            tokenizer.pad_token = tokenizer.eos_token
+
+        model = AutoModelForCausalLM.from_pretrained(
+            model_path,
+            torch_dtype=torch_dtype,
+            device_map=device_map,
+            quantization_config=quantization_config,
+            trust_remote_code=True,
+            low_cpu_mem_usage=True
+        )
+
+        if adapter_path:
+            # 어댑터는 기본 모델 모듈을 직접 바꾸므로 어댑터 모델은 별도 키로 관리
+            from peft import PeftModel
+            model = PeftModel.from_pretrained(model, adapter_path)
+
+        model.eval()
+        load_ms = (time.time() - start_time) * 1000
+        weight_bytes = self._weight_bytes(model)
+        self.stats['loads'] += 1
+        logging.info(f"✅ 모델 로딩 완료: {os.path.basename(key[0])} "
+                     f"({weight_bytes / 1024**3:.2f}GB, {load_ms:.0f}ms)")
+
+        return _LoadedModel(key=key, model=model, tokenizer=tokenizer,
+                            load_ms=load_ms, weight_bytes=weight_bytes)
+
+    def _add_ref(self, entry: _LoadedModel, consumer: str) -> ModelHandle:
+        """참조를 늘리고 핸들을 만듭니다 (락을 잡은 상태에서 호출)."""
+        entry.refcount += 1
+        entry.consumers[consumer] = entry.consumers.get(consumer, 0) + 1
+        return ModelHandle(self, entry, consumer)
+
+    def _release(self, entry: _LoadedModel, consumer: str):
+        """참조를 줄이고, 마지막 참조면 가중치를 내립니다."""
+        with self._lock:
+            entry.refcount -= 1
+            remaining = entry.consumers.get(consumer, 0) - 1
+            if remaining > 0:
+                entry.consumers[consumer] = remaining
+            else:
+                entry.consumers.pop(consumer, None)
+
+            if entry.refcount > 0 or self._models.get(entry.key) is not entry:
+                return
+            del self._models[entry.key]
+            entry.model = None
+            entry.tokenizer = None
+            self.stats['unloads'] += 1
+
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        logging.info(f"✅ 모델 언로드: {os.path.basename(entry.key[0])}")
+
+    @staticmethod
+    def _weight_bytes(model) -> int:
+        """파라미터와 버퍼의 메모리 크기를 계산합니다 (공유 텐서는 한 번만)."""
+        seen = set()
+        total = 0
+        for tensor in list(model.parameters()) + list(model.buffers()):
+            pointer = tensor.data_ptr()
+            if pointer in seen:
+                continue
+            seen.add(pointer)
+            total += tensor.numel() * tensor.element_size()
+        return total
+
+    @staticmethod
+    def _device_summary(model) -> Dict[str, int]:
+        """device_map 기준으로 장치별 모듈 수를 요약합니다."""
+        device_map = getattr(model, 'hf_device_map', None)
+        if not device_map:
+            device = getattr(model, 'device', None)
+            return {str(device): 1} if device is not None else {}
+        summary: Dict[str, int] = {}
+        for device in device_map.values():
+            summary[str(device)] = summary.get(str(device), 0) + 1
+        return summary
+
+
+# 전역 모델 런타임 인스턴스
+_model_runtime: Optional[ModelRuntime] = None
+
+
+def get_model_runtime() -> ModelRuntime:
+    """전역 모델 런타임 인스턴스를 반환합니다."""
+    global _model_runtime
+    if _model_runtime is None:
+        _model_runtime = ModelRuntime()
+    return _model_runtime
@@ -3,6 +3,69 @@ from typing import List, Dict, Optional, Tuple
 import re
 from datetime import datetime
 import logging
+from ..config import settings
+from .knowledge_index import KnowledgeIndex
+from .knowledge_ranking import BM25FRanker
+
+# 핵심 키워드 가중치 (포인트 관련 추가)
+KEYWORD_PRIORITY_WEIGHTS = {
+    '포인트': 8.0,
+    '적립': 8.0,
+    '포인트적립': 10.0,
+    '포인트 적립': 10.0,
+    '포스': 5.0,
+    'POS': 5.0,
+    '프로그램': 4.0,
+    '설치': 4.0,
+    '재설치': 6.0,
+    '데이터': 4.0,
+    '백업': 5.0,
+    '복원': 4.0,
+    '키오스크': 5.0,
+    '터치': 3.0,
+    '프린터': 5.0,
+    '인쇄': 4.0,
+    '출력': 3.0,
+    '오류': 3.0,
+    '에러': 3.0,
+    '문제': 2.0,
+    '연결': 3.0,
+    '설정': 3.0,
+    '네트워크': 4.0,
+    '와이파이': 4.0,
+    'WiFi': 4.0,
+    '결제': 4.0,
+    '환불': 4.0,
+    '취소': 3.0,
+    'DB': 6.0,
+    '데이터베이스': 6.0,
+    '공간': 4.0,
+    '늘리기': 5.0,
+    '늘리': 5.0,
+    'ARUMLOCADB': 8.0,
+    'TABLE': 4.0,
+    '견적서': 6.0,
+    '참조사항': 6.0,
+    '참고사항': 6.0,
+    '메모': 4.0
+}
+
+# 질문/답변에 함께 등장하면 가산점을 주는 키워드 조합 (포인트 관련 추가)
+KEYWORD_COMBINATIONS = [
+    ('포스', '포인트'),
+    ('포인트', '적립'),
+    ('포인트', '설정'),
+    ('포스', '재설치'),
+    ('POS', '재설치'),
+    ('프로그램', '재설치'),
+    ('데이터', '백업'),
+    ('키오스크', '터치'),
+    ('프린터', '오류'),
+    ('DB', '늘리기'),
+    ('데이터베이스', '늘리기'),
+    ('견적서', '참조사항'),
+    ('견적서', '참고사항')
+]
 
 class MongoDBSearchService:
     def __init__(self, db: AsyncIOMotorDatabase):
@@ -10,6 +73,44 @@ class MongoDBSearchService:
         self.conversations_collection = db.conversations
         self.knowledge_collection = db.knowledge_base  # 지식 베이스 컬렉션
         
+        # knowledge_base 인메모리 역색인 (initialize_index 호출 후 사용)
+        self.knowledge_index = KnowledgeIndex(KEYWORD_COMBINATIONS)
+        
+        # 키워드 검색 랭킹 엔진 ("keyword" 또는 "bm25")
+        self.ranking_engine = settings.KNOWLEDGE_RANKING_ENGINE
+        self.bm25_min_score = settings.BM25_MIN_SCORE
+        self.bm25_top_k = settings.BM25_TOP_K
+        self.bm25_ranker = BM25FRanker()
+        
+    async def initialize_index(self):
+        """knowledge_base 역색인(및 BM25 통계)을 구성합니다. 실패 시 전체 스캔 방식으로 동작합니다."""
+        try:
+            await self.knowledge_index.build(self.knowledge_collection)
+        except Exception as e:
+            logging.error(f"지식 베이스 역색인 구성 실패: {str(e)}")
+            self.knowledge_index.clear()
+        
+        if self.ranking_engine == "bm25":
+            try:
+                await self.bm25_ranker.build(self.knowledge_collection)
+            except Exception as e:
+                logging.error(f"BM25F 랭커 구성 실패: {str(e)}")
+                self.bm25_ranker.clear()
+        
+    def apply_knowledge_upsert(self, doc: Dict):
+        """추가/수정된 knowledge_base 문서를 인메모리 색인에 반영합니다."""
+        if self.knowledge_index.is_ready:
+            self.knowledge_index.add_document(doc)
+        if self.bm25_ranker.is_ready:
+            self.bm25_ranker.add_document(doc)
+    
+    def apply_knowledge_delete(self, doc_id):
+        """삭제된 knowledge_base 문서를 인메모리 색인에서 제거합니다."""
+        if self.knowledge_index.is_ready:
+            self.knowledge_index.remove_document(doc_id)
+        if self.bm25_ranker.is_ready:
+            self.bm25_ranker.remove_document(doc_id)
+        
     async def search_answer(self, query: str) -> Optional[str]:
         """
         사용자 질문에 대한 답변을 검색합니다.
@@ -20,6 +121,19 @@ class MongoDBSearchService:
         Returns:
             Optional[str]: 찾은 답변 또는 None
         """
+        knowledge = await self.search_knowledge(query)
+        return knowledge['answer'] if knowledge else None
+    
+    async def search_knowledge(self, query: str) -> Optional[Dict]:
+        """
+        사용자 질문에 가장 잘 맞는 knowledge_base 문서를 검색합니다.
+        
+        Args:
+            query: 사용자 질문
+            
+        Returns:
+            Optional[Dict]: 찾은 지식 문서 (_id, question, answer 포함) 또는 None
+        """
         logging.info(f"🔍 MongoDB 검색 시작: {query[:50]}...")
         
         try:
@@ -54,7 +168,7 @@ class MongoDBSearchService:
             logging.error(f"❌ 검색 중 오류 발생: {str(e)}")
             return None
     
-    async def _search_exact_match(self, query: str) -> Optional[str]:
+    async def _search_exact_match(self, query: str) -> Optional[Dict]:
         """스마트 검색: 부분 매치 → 키워드 기반 → 유사도 순"""
         try:
             # 정규화된 쿼리
@@ -67,7 +181,7 @@ class MongoDBSearchService:
             
             if partial_match:
                 logging.info(f"Partial match found: {partial_match['question']}")
-                return partial_match['answer']
+                return partial_match
             
             # 2. 키워드 기반 검색 (미래: question 꼬인 형태 대응)
             keywords = self._extract_keywords(query)
@@ -76,13 +190,13 @@ class MongoDBSearchService:
                 and_match = await self._search_by_keywords_and(keywords)
                 if and_match:
                     logging.info(f"AND keyword match found: {and_match['question']}")
-                    return and_match['answer']
+                    return and_match
                 
                 # OR 조건: 주요 키워드가 포함된 답변
                 or_match = await self._search_by_keywords_or(keywords)
                 if or_match:
                     logging.info(f"OR keyword match found: {or_match['question']}")
-                    return or_match['answer']
+                    return or_match
             
             return None
             
@@ -158,52 +272,10 @@ class MongoDBSearchService:
         question = item.get('question', '').lower()
         answer = item.get('answer', '').lower()
         
-        # 핵심 키워드 가중치 (포인트 관련 추가)
-        priority_keywords = {
-            '포인트': 8.0,
-            '적립': 8.0,
-            '포인트적립': 10.0,
-            '포인트 적립': 10.0,
-            '포스': 5.0,
-            'POS': 5.0,
-            '프로그램': 4.0,
-            '설치': 4.0,
-            '재설치': 6.0,
-            '데이터': 4.0,
-            '백업': 5.0,
-            '복원': 4.0,
-            '키오스크': 5.0,
-            '터치': 3.0,
-            '프린터': 5.0,
-            '인쇄': 4.0,
-            '출력': 3.0,
-            '오류': 3.0,
-            '에러': 3.0,
-            '문제': 2.0,
-            '연결': 3.0,
-            '설정': 3.0,
-            '네트워크': 4.0,
-            '와이파이': 4.0,
-            'WiFi': 4.0,
-            '결제': 4.0,
-            '환불': 4.0,
-            '취소': 3.0,
-            'DB': 6.0,
-            '데이터베이스': 6.0,
-            '공간': 4.0,
-            '늘리기': 5.0,
-            '늘리': 5.0,
-            'ARUMLOCADB': 8.0,
-            'TABLE': 4.0,
-            '견적서': 6.0,
-            '참조사항': 6.0,
-            '참고사항': 6.0,
-            '메모': 4.0
-        }
         
         # 개별 키워드 점수
         for keyword in keywords:
-            weight = priority_keywords.get(keyword, 1.0)
+            weight = KEYWORD_PRIORITY_WEIGHTS.get(keyword, 1.0)
             
             # 질문에 키워드가 있으면 높은 점수
             if keyword in question:
@@ -221,23 +293,8 @@ class MongoDBSearchService:
                 score += 4.0  # 2.0 -> 4.0으로 증가
         
         # 특정 조합에 높은 점수 (포인트 관련 추가)
-        combinations = [
-            ('포스', '포인트'),
-            ('포인트', '적립'),
-            ('포인트', '설정'),
-            ('포스', '재설치'),
-            ('POS', '재설치'),
-            ('프로그램', '재설치'),
-            ('데이터', '백업'),
-            ('키오스크', '터치'),
-            ('프린터', '오류'),
-            ('DB', '늘리기'),
-            ('데이터베이스', '늘리기'),
-            ('견적서', '참조사항'),
-            ('견적서', '참고사항')
-        ]
         
-        for combo in combinations:
+        for combo in KEYWORD_COMBINATIONS:
             if combo[0] in question and combo[1] in question:
                 score += 12.0  # 8.0 -> 12.0으로 증가
             if combo[0] in answer and combo[1] in answer:
@@ -245,18 +302,27 @@ class MongoDBSearchService:
         
         return score
 
-    async def _search_by_keywords(self, keywords: List[str]) -> Optional[str]:
+    async def _search_by_keywords(self, keywords: List[str]) -> Optional[Dict]:
         """키워드 기반 검색을 수행합니다."""
         try:
             import time
             if not keywords:
                 return None
             
-            # 모든 지식 베이스 항목을 가져와서 점수 계산
+            # BM25 엔진이 선택되어 있고 준비되었으면 BM25F로 랭킹
+            if self.ranking_engine == "bm25" and self.bm25_ranker.is_ready:
+                return self._search_by_bm25(keywords)
+            
+            # 역색인이 준비되어 있으면 후보 문서만, 아니면 모든 지식 베이스 항목을 가져와서 점수 계산
             fetch_start = time.time()
-            all_items = await self.knowledge_collection.find({}).to_list(length=None)
+            if self.knowledge_index.is_ready:
+                all_items = self.knowledge_index.get_candidates(keywords)
+                source = "역색인 후보"
+            else:
+                all_items = await self.knowledge_collection.find({}).to_list(length=None)
+                source = "DB 전체 스캔"
             fetch_time = (time.time() - fetch_start) * 1000
-            logging.info(f"DB 데이터 가져오기 시간: {fetch_time:.2f}ms (항목 수: {len(all_items)})")
+            logging.info(f"{source} 가져오기 시간: {fetch_time:.2f}ms (항목 수: {len(all_items)})")
             
             # 점수 계산
             score_start = time.time()
@@ -270,12 +336,12 @@ class MongoDBSearchService:
                     best_match = item
             
             score_time = (time.time() - score_start) * 1000
-            logging.info(f"점수 계산 시간: {score_time:.2f}ms (항목당 평균: {score_time/len(all_items):.3f}ms)")
+            logging.info(f"점수 계산 시간: {score_time:.2f}ms (항목당 평균: {score_time/max(len(all_items), 1):.3f}ms)")
             
             # 점수가 충분히 높은 경우만 반환 (임계값을 더 낮춤)
             if best_score >= 1.0:  # 1.5에서 1.0으로 낮춤
                 logging.info(f"Keyword match found with score {best_score}: {best_match.get('question', '')[:50]}...")
-                return best_match['answer']
+                return best_match
             
             return None
             
@@ -283,7 +349,22 @@ class MongoDBSearchService:
             logging.error(f"Error in keyword search: {str(e)}")
             return None
 
-    async def _search_by_similarity(self, query: str) -> Optional[str]:
+    def _search_by_bm25(self, keywords: List[str]) -> Optional[Dict]:
+        """미리 계산된 BM25F 통계로 상위 문서를 찾습니다."""
+        import time
+        search_start = time.time()
+        results = self.bm25_ranker.search(keywords, top_k=self.bm25_top_k)
+        search_time = (time.time() - search_start) * 1000
+        logging.info(f"BM25F 검색 시간: {search_time:.3f}ms (후보 수: {len(results)})")
+        
+        if results and results[0][0] >= self.bm25_min_score:
+            best_score, best_match = results[0]
+            logging.info(f"BM25 match found with score {best_score:.3f}: {best_match.get('question', '')[:50]}...")
+            return best_match
+        
+        return None
+
+    async def _search_by_similarity(self, query: str) -> Optional[Dict]:
         """유사도 기반 검색을 수행합니다."""
         try:
             # 간단한 유사도 검색 (키워드 기반)
@@ -0,0 +1,298 @@
+"""
+근사 중복 질문 색인 모듈 (MinHash + LSH)
+질문을 문자 n-gram 집합으로 나눈 뒤 MinHash 서명을 만들고, 서명을 밴드로 잘라 버킷에 넣어
+새 질문과 같은 버킷에 걸리는 문서만 후보로 돌려준다 (전체 질문과 비교하지 않음).
+후보는 기존과 같은 SequenceMatcher 비율로 최종 확인하므로 판정 기준은 그대로이고,
+문자 n-gram Jaccard가 낮은데 SequenceMatcher 비율만 높은 드문 경우만 후보에서 빠질 수 있다.
+
+서명은 knowledge_base 문서의 question_minhash 필드에 저장해 재시작 시 다시 계산하지 않는다
+(질문이 수정되어 digest가 달라진 서명은 다시 계산).
+"""
+
+import asyncio
+import hashlib
+import logging
+import random
+import re
+import threading
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+# knowledge_base 문서에 저장하는 서명 필드 ({"params": ..., "digest": ..., "values": [...]})
+SIGNATURE_FIELD = "question_minhash"
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_question(text: str) -> str:
+    """비교용 정규화 (소문자, 연속 공백 하나로)"""
+    return _WHITESPACE.sub(' ', (text or '').lower()).strip()
+
+
+def _text_digest(text: str) -> str:
+    """저장된 서명이 현재 질문에서 나온 것인지 확인하는 digest"""
+    return hashlib.blake2b(normalize_question(text).encode('utf-8'), digest_size=8).hexdigest()
+
+
+def shingles(text: str, size: int = 2) -> Set[str]:
+    """공백을 제거한 정규화 문자열의 문자 n-gram 집합 (size보다 짧으면 문자열 자체)"""
+    compact = _WHITESPACE.sub('', normalize_question(text))
+    if len(compact) < size:
+        return {compact} if compact else set()
+    return {compact[i:i + size] for i in range(len(compact) - size + 1)}
+
+
+class NearDuplicateIndex:
+    """
+    질문 MinHash 서명의 LSH 밴드 색인
+
+    - num_perm개의 (a*x + b) mod p 해시로 서명을 만들고, rows = num_perm / bands 개씩 묶어 밴드 키로 사용
+    - Jaccard 유사도가 s인 두 질문이 후보가 될 확률은 1 - (1 - s^rows)^bands
+      (기본값 128/32 → 약 0.42 부근에서 급격히 올라가며, s=0.6이면 약 99%)
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 32, shingle_size: int = 2, seed: int = 42):
+        """
+        Args:
+            num_perm: 서명 길이 (해시 함수 수)
+            bands: LSH 밴드 수 (num_perm의 약수)
+            shingle_size: 문자 n-gram 크기
+            seed: 해시 계수 난수 시드 (저장된 서명과 호환되려면 고정)
+        """
+        if num_perm % bands:
+            raise ValueError(f"num_perm({num_perm})은 bands({bands})의 배수여야 합니다")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.params = f"s{shingle_size}-p{num_perm}-r{seed}"
+
+        rng = random.Random(seed)
+        self._coefficients = [
+            (rng.randint(1, _MERSENNE_PRIME - 1), rng.randint(0, _MERSENNE_PRIME - 1))
+            for _ in range(num_perm)
+        ]
+
+        self._buckets: List[Dict[Tuple[int, ...], Set[Any]]] = [{} for _ in range(bands)]
+        self._signatures: Dict[Any, List[int]] = {}
+        self._texts: Dict[Any, str] = {}  # SequenceMatcher 확인용 정규화 질문
+        self._lock = threading.Lock()
+        self.is_ready = False
+
+    def signature(self, text: str) -> List[int]:
+        """질문의 MinHash 서명을 계산합니다."""
+        hashes = [
+            int.from_bytes(hashlib.blake2b(gram.encode('utf-8'), digest_size=4).digest(), 'little')
+            for gram in shingles(text, self.shingle_size)
+        ]
+        if not hashes:
+            return [_MAX_HASH] * self.num_perm
+        return [
+            min((a * h + b) % _MERSENNE_PRIME for h in hashes) & _MAX_HASH
+            for a, b in self._coefficients
+        ]
+
+    def stored_signature(self, text: str, signature: Optional[List[int]] = None) -> Dict[str, Any]:
+        """
+        문서에 저장할 서명 값.
+        설정이 바뀌거나 질문이 수정되면 다시 계산하도록 params와 질문 digest를 함께 저장한다.
+        """
+        return {
+            "params": self.params,
+            "digest": _text_digest(text),
+            "values": signature if signature is not None else self.signature(text)
+        }
+
+    def signature_from_doc(self, doc: Dict, text_field: str = "question") -> Optional[List[int]]:
+        """문서에 저장된 서명이 현재 설정/질문과 맞으면 반환하고, 아니면 None."""
+        stored = doc.get(SIGNATURE_FIELD)
+        if not isinstance(stored, dict) or stored.get("params") != self.params:
+            return None
+        if stored.get("digest") != _text_digest(doc.get(text_field) or ''):
+            return None
+        values = stored.get("values")
+        if not isinstance(values, list) or len(values) != self.num_perm:
+            return None
+        return values
+
+    def add(self, doc_id: Any, text: str, signature: Optional[List[int]] = None):
+        """질문 하나를 추가/교체합니다."""
+        signature = signature if signature is not None else self.signature(text)
+        with self._lock:
+            self._remove(doc_id)
+            for band, key in enumerate(self._band_keys(signature)):
+                self._buckets[band].setdefault(key, set()).add(doc_id)
+            self._signatures[doc_id] = signature
+            self._texts[doc_id] = normalize_question(text)
+
+    def remove(self, doc_id: Any):
+        """질문 하나를 제거합니다."""
+        with self._lock:
+            self._remove(doc_id)
+
+    def clear(self):
+        """색인을 비웁니다."""
+        with self._lock:
+            self._buckets = [{} for _ in range(self.bands)]
+            self._signatures.clear()
+            self._texts.clear()
+            self.is_ready = False
+
+    def candidates(self, signature: List[int]) -> Set[Any]:
+        """서명과 하나 이상의 밴드가 같은 문서 _id 집합"""
+        found: Set[Any] = set()
+        with self._lock:
+            for band, key in enumerate(self._band_keys(signature)):
+                found.update(self._buckets[band].get(key, ()))
+        return found
+
+    def find_similar(self, text: str, threshold: float = 0.8,
+                     signature: Optional[List[int]] = None) -> List[Tuple[Any, float]]:
+        """
+        SequenceMatcher 비율이 threshold 이상인 기존 질문을 비율 내림차순으로 반환합니다.
+
+        Args:
+            text: 확인할 질문
+            threshold: 중복 판정 비율 (기존 _check_similarity와 같은 기준)
+            signature: 미리 계산한 서명 (없으면 계산)
+        """
+        signature = signature if signature is not None else self.signature(text)
+        question = normalize_question(text)
+        matches = []
+        for doc_id in self.candidates(signature):
+            existing = self._texts.get(doc_id)
+            if existing is None:
+                continue
+            ratio = SequenceMatcher(None, question, existing).ratio()
+            if ratio >= threshold:
+                matches.append((doc_id, ratio))
+        matches.sort(key=lambda match: -match[1])
+        return matches
+
+    def duplicate_groups(self, threshold: float = 0.8) -> List[List[Any]]:
+        """
+        색인 전체에서 서로 중복인 질문 묶음을 찾습니다 (오프라인 정리용).
+        같은 버킷에 들어간 쌍만 SequenceMatcher로 확인하고, 확인된 쌍을 union-find로 묶는다.
+        """
+        with self._lock:
+            buckets = [list(ids) for band in self._buckets for ids in band.values() if len(ids) > 1]
+            texts = dict(self._texts)
+
+        parent: Dict[Any, Any] = {}
+
+        def find(doc_id):
+            parent.setdefault(doc_id, doc_id)
+            while parent[doc_id] != doc_id:
+                parent[doc_id] = parent[parent[doc_id]]
+                doc_id = parent[doc_id]
+            return doc_id
+
+        checked: Set[Tuple[Any, Any]] = set()
+        for ids in buckets:
+            for i, left in enumerate(ids):
+                for right in ids[i + 1:]:
+                    root_left, root_right = find(left), find(right)
+                    if root_left == root_right:
+                        continue
+                    pair = (left, right) if str(left) < str(right) else (right, left)
+                    if pair in checked:
+                        continue
+                    checked.add(pair)
+                    if SequenceMatcher(None, texts[left], texts[right]).ratio() >= threshold:
+                        parent[root_right] = root_left
+
+        groups: Dict[Any, List[Any]] = {}
+        for doc_id in parent:
+            groups.setdefault(find(doc_id), []).append(doc_id)
+        return [members for members in groups.values() if len(members) > 1]
+
+    def get_stats(self) -> Dict:
+        """색인 통계를 반환합니다."""
+        with self._lock:
+            bucket_count = sum(len(band) for band in self._buckets)
+            documents = len(self._signatures)
+        return {
+            'is_ready': self.is_ready,
+            'documents': documents,
+            'buckets': bucket_count,
+            'num_perm': self.num_perm,
+            'bands': self.bands,
+            'rows': self.rows
+        }
+
+    def _band_keys(self, signature: List[int]):
+        """서명을 밴드별 키로 자릅니다."""
+        for band in range(self.bands):
+            yield tuple(signature[band * self.rows:(band + 1) * self.rows])
+
+    def _remove(self, doc_id: Any):
+        """문서를 버킷에서 제거합니다 (락을 잡은 상태에서 호출)."""
+        signature = self._signatures.pop(doc_id, None)
+        if signature is None:
+            return
+        for band, key in enumerate(self._band_keys(signature)):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(doc_id)
+                if not bucket:
+                    del self._buckets[band][key]
+        self._texts.pop(doc_id, None)
+
+
+def _compute_signatures(index: NearDuplicateIndex, texts: List[str]) -> List[List[int]]:
+    """질문 목록의 서명을 계산합니다 (작업 스레드에서 실행)."""
+    return [index.signature(text) for text in texts]
+
+
+async def load_question_index(collection, index: NearDuplicateIndex, text_field: str = "question",
+                              backfill: bool = True, chunk_size: int = 200) -> int:
+    """
+    컬렉션의 질문으로 색인을 구성합니다. 저장된 서명이 있으면 그대로 쓰고,
+    없거나 설정이 다르면 계산한 뒤 backfill=True일 때 문서에 저장합니다.
+    (updated_at은 바꾸지 않아 질문/답변 변경으로 취급되지 않음)
+    서명 계산(질문당 약 1ms)은 chunk_size개씩 작업 스레드에서 수행해 이벤트 루프를 막지 않는다.
+
+    Returns:
+        int: 색인한 문서 수
+    """
+    index.clear()
+    pending: List[Tuple[Any, str]] = []  # 서명을 새로 계산해야 하는 (_id, 질문)
+    count = 0
+    async for doc in collection.find({}, {text_field: 1, SIGNATURE_FIELD: 1}):
+        text = doc.get(text_field) or ''
+        signature = index.signature_from_doc(doc, text_field)
+        if signature is None:
+            pending.append((doc["_id"], text))
+            continue
+        index.add(doc["_id"], text, signature)
+        count += 1
+
+    backfill_operations = []
+    for start in range(0, len(pending), chunk_size):
+        chunk = pending[start:start + chunk_size]
+        signatures = await asyncio.to_thread(_compute_signatures, index, [text for _, text in chunk])
+        for (doc_id, text), signature in zip(chunk, signatures):
+            index.add(doc_id, text, signature)
+            count += 1
+            if backfill:
+                backfill_operations.append(UpdateOne(
+                    {"_id": doc_id},
+                    {"$set": {SIGNATURE_FIELD: index.stored_signature(text, signature)}}
+                ))
+
+    if backfill_operations:
+        try:
+            await collection.bulk_write(backfill_operations, ordered=False)
+            logging.info(f"✅ {SIGNATURE_FIELD} 서명 저장: {len(backfill_operations)}개 문서")
+        except PyMongoError as e:
+            logging.error(f"{SIGNATURE_FIELD} 서명 저장 실패 (다음 구성 때 다시 계산): {str(e)}")
+
+    index.is_ready = True
+    logging.info(f"✅ 근사 중복 색인 구성 완료: {count}개 질문")
+    return count
@@ -10,9 +10,16 @@ from typing import Dict, List, Optional, Tuple, Set
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from datetime import datetime
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import scipy.sparse as sp
 import asyncio
+from .pattern_candidate_index import PatternCandidateIndex
+from .lru_cache import LRUCache
+from .pattern_vectorizer import (
+    create_pattern_vectorizer, vectorizer_signature, export_vectorizer_state, restore_vectorizer_state
+)
+from .index_snapshot import IndexSnapshotStore, collection_change_token
+from .index_registry import ensure_indexes
+from ..config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -22,28 +29,40 @@ class OptimizedPatternMatcher:
     def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
         self.pattern_collection = db.context_patterns
-        self.cache = {}  # 간단한 메모리 캐시
         self.cache_ttl = 300  # 5분 캐시 TTL
+        self.cache = LRUCache(max_entries=1000, ttl_seconds=self.cache_ttl)  # 입력별 매칭 결과 캐시
         self.last_cache_update = 0
         
-        # TF-IDF 벡터라이저 (한국어 최적화)
-        self.vectorizer = TfidfVectorizer(
-            analyzer='word',
-            ngram_range=(1, 3),  # 1-3그램으로 단어 조합 캐치
-            min_df=1,
-            max_df=0.9,
-            stop_words=None,  # 한국어는 불용어 처리가 복잡하므로 제외
-            lowercase=True
+        # TF-IDF 벡터라이저 (기본: 단어 1-3그램, 설정으로 한국어 교착어에 맞춘 char_wb n-gram 해시 + IDF 선택)
+        self.vectorizer = create_pattern_vectorizer(
+            mode=settings.PATTERN_VECTORIZER_MODE,
+            n_features=settings.PATTERN_HASH_FEATURES,
+            ngram_min=settings.PATTERN_CHAR_NGRAM_MIN,
+            ngram_max=settings.PATTERN_CHAR_NGRAM_MAX
         )
         
         # 패턴 벡터 캐시
         self.pattern_vectors = None
         self.pattern_texts = []
         self.pattern_docs = []
+        self.pattern_rows = {}  # pattern _id -> pattern_vectors 행 번호
+        
+        # $text 검색을 대신하는 인메모리 후보 색인 (패턴 로드 전에는 Mongo $text로 fallback)
+        self.candidate_index = PatternCandidateIndex()
+        
+        # 벡터/IDF/문서 목록 디스크 스냅샷 (컬렉션이 그대로면 재벡터화 없이 메모리 매핑으로 로드)
+        self.snapshot_store = IndexSnapshotStore(settings.INDEX_SNAPSHOT_DIR) if settings.ENABLE_INDEX_SNAPSHOT else None
+        self.snapshot_name = "context_patterns"
+        
+        # 증분 반영 횟수 (기존 어휘/IDF로 변환한 행이 많아지면 전체 재학습)
+        self.incremental_changes = 0
+        self.refit_ratio = 0.2
         
         # 성능 통계
         self.stats = {
             'text_search_count': 0,
+            'memory_index_count': 0,
+            'mongo_text_fallback_count': 0,
             'vector_search_count': 0,
             'cache_hits': 0,
             'total_queries': 0,
@@ -68,28 +87,19 @@ class OptimizedPatternMatcher:
             raise
     
     async def _ensure_text_index(self):
-        """MongoDB Text Index 생성"""
+        """MongoDB Text Index 생성 (인덱스 레지스트리의 context_patterns 선언 적용, 이미 있으면 그대로)"""
         try:
-            # 기존 인덱스 확인
-            indexes = await self.pattern_collection.list_indexes().to_list()
-            has_text_index = any(idx.get('name') == 'pattern_text' for idx in indexes)
-            
-            if not has_text_index:
-                # Text Index 생성 (한국어 지원)
-                await self.pattern_collection.create_index([
-                    ("pattern", "text")
-                ], name="pattern_text", default_language="none")
-                
-                logger.info("✅ MongoDB Text Index 생성 완료")
-            else:
-                logger.info("✅ MongoDB Text Index 이미 존재")
-                
+            await ensure_indexes(self.db, collection="context_patterns")
         except Exception as e:
             logger.error(f"Text Index 생성 실패: {e}")
     
     async def _load_and_vectorize_patterns(self):
-        """패턴 데이터 로드 및 벡터화"""
+        """패턴 데이터 로드 및 벡터화 (유효한 스냅샷이 있으면 스냅샷에서 로드)"""
         try:
+            token = await self._snapshot_token()
+            if token and self._load_snapshot(token):
+                return
+            
             # 모든 패턴 로드
             cursor = self.pattern_collection.find({})
             self.pattern_docs = await cursor.to_list(length=None)
@@ -100,16 +110,76 @@ class OptimizedPatternMatcher:
             
             # 패턴 텍스트 추출
             self.pattern_texts = [doc['pattern'] for doc in self.pattern_docs]
+            self.pattern_rows = {doc['_id']: row for row, doc in enumerate(self.pattern_docs)}
+            
+            # 후보 색인 구축
+            self.candidate_index.build(self.pattern_docs)
             
             # TF-IDF 벡터화
             self.pattern_vectors = self.vectorizer.fit_transform(self.pattern_texts)
+            self.incremental_changes = 0
             
             logger.info(f"✅ {len(self.pattern_docs)}개 패턴 벡터화 완료")
             
+            if token:
+                self._save_snapshot(token)
+            
         except Exception as e:
             logger.error(f"패턴 로드 및 벡터화 실패: {e}")
             raise
     
+    async def _snapshot_token(self) -> Optional[str]:
+        """현재 컬렉션 상태와 벡터라이저 설정으로 스냅샷 변경 토큰을 만듭니다."""
+        if self.snapshot_store is None:
+            return None
+        try:
+            return await collection_change_token(
+                self.pattern_collection, "pattern", extra=vectorizer_signature(self.vectorizer)
+            )
+        except Exception as e:
+            logger.warning(f"패턴 스냅샷 토큰 계산 실패: {e}")
+            return None
+    
+    def _load_snapshot(self, token: str) -> bool:
+        """토큰이 일치하는 스냅샷에서 벡터 행렬/벡터라이저 상태/문서 목록을 복원합니다."""
+        snapshot = self.snapshot_store.load(self.snapshot_name, token)
+        if snapshot is None or not snapshot.docs:
+            return False
+        try:
+            arrays = snapshot.arrays
+            restore_vectorizer_state(self.vectorizer, arrays, snapshot.meta)
+            # 메모리 매핑된 CSR 배열을 복사 없이 그대로 사용 (증분 반영 시에만 새 행렬 생성)
+            self.pattern_vectors = sp.csr_matrix(
+                (arrays['data'], arrays['indices'], arrays['indptr']),
+                shape=tuple(snapshot.meta['shape']),
+                copy=False
+            )
+            self.pattern_docs = snapshot.docs
+            self.pattern_texts = [doc['pattern'] for doc in self.pattern_docs]
+            self.pattern_rows = {doc['_id']: row for row, doc in enumerate(self.pattern_docs)}
+            self.candidate_index.build(self.pattern_docs)
+            self.incremental_changes = 0
+            logger.info(f"✅ 스냅샷에서 {len(self.pattern_docs)}개 패턴 로드 ({snapshot.load_ms:.1f}ms)")
+            return True
+        except Exception as e:
+            logger.warning(f"패턴 스냅샷 복원 실패, 다시 벡터화합니다: {e}")
+            self.pattern_vectors = None
+            return False
+    
+    def _save_snapshot(self, token: str):
+        """현재 벡터 행렬/벡터라이저 상태/문서 목록을 스냅샷으로 저장합니다."""
+        if self.snapshot_store is None or self.pattern_vectors is None:
+            return
+        try:
+            vectors = self.pattern_vectors.tocsr()
+            vectors.sort_indices()
+            arrays, meta = export_vectorizer_state(self.vectorizer)
+            arrays.update({'data': vectors.data, 'indices': vectors.indices, 'indptr': vectors.indptr})
+            meta['shape'] = list(vectors.shape)
+            self.snapshot_store.save(self.snapshot_name, token, arrays, meta, self.pattern_docs)
+        except Exception as e:
+            logger.warning(f"패턴 스냅샷 저장 실패: {e}")
+    
     async def find_best_match(self, user_input: str, threshold: float = 0.3) -> Optional[Tuple[Dict, float, str]]:
         """
         사용자 입력에 대한 최적 패턴 매칭
@@ -124,18 +194,20 @@ class OptimizedPatternMatcher:
             
             # 1. 캐시 체크
             cache_key = user_input.lower().strip()
-            if cache_key in self.cache:
-                cache_entry = self.cache[cache_key]
-                if (datetime.now() - cache_entry['timestamp']).seconds < self.cache_ttl:
-                    self.stats['cache_hits'] += 1
-                    return cache_entry['result']
+            cached_result = self.cache.get(cache_key)
+            if cached_result is not None:
+                self.stats['cache_hits'] += 1
+                return cached_result
+            
+            # 입력은 한 번만 벡터화해 텍스트 검색 후보 점수와 전체 벡터 검색에 재사용
+            user_vector = self._vectorize_input(user_input)
             
             # 2. 1단계: MongoDB Text Search (빠른 필터링)
             text_candidates = await self._text_search(user_input)
             
             if not text_candidates:
                 # Text Search 결과가 없으면 벡터 검색으로 확장
-                vector_result = await self._vector_search(user_input, threshold)
+                vector_result = await self._vector_search(user_input, threshold, user_vector=user_vector)
                 if vector_result:
                     pattern_doc, score, method = vector_result
                     result = (pattern_doc, score, method)
@@ -143,20 +215,22 @@ class OptimizedPatternMatcher:
                     return result
                 return None
             
-            # 3. 2단계: Text Search 후보들에 대해 벡터 검색으로 정확도 향상
+            # 3. 2단계: Text Search 후보들을 미리 계산된 패턴 벡터 행과 한 번의 행렬-벡터 곱으로 채점
             best_match = None
             best_score = 0
             best_method = "text_search"
             
-            for pattern_doc in text_candidates:
-                vector_score = await self._calculate_similarity(user_input, pattern_doc['pattern'])
+            scores = self._score_candidates(user_vector, text_candidates)
+            if len(scores):
+                best_idx = int(np.argmax(scores))
+                vector_score = float(scores[best_idx])
                 
                 # Text Search 결과에 가중치 부여 (빠른 매칭 우선)
                 weighted_score = vector_score * 1.2 if vector_score > threshold else vector_score
                 
                 if weighted_score > best_score:
                     best_score = weighted_score
-                    best_match = pattern_doc
+                    best_match = text_candidates[best_idx]
                     best_method = "hybrid"
             
             # 4. 결과 반환
@@ -177,9 +251,30 @@ class OptimizedPatternMatcher:
             return None
     
     async def _text_search(self, user_input: str) -> List[Dict]:
-        """MongoDB Text Search 수행"""
+        """
+        Text Search 후보 생성
+        패턴이 로드되어 있으면 인메모리 후보 색인으로 $text와 같은 후보를 만들고,
+        색인이 비어 있을 때(초기화 전)만 MongoDB $text 쿼리를 보낸다.
+        """
+        self.stats['text_search_count'] += 1
+        
+        if settings.ENABLE_PATTERN_MEMORY_INDEX and self.candidate_index.is_warm:
+            self.stats['memory_index_count'] += 1
+            candidates = self.candidate_index.search(
+                user_input,
+                limit=10,
+                min_score=1.0,
+                ngram_expansion=settings.PATTERN_INDEX_NGRAM_EXPANSION
+            )
+            logger.debug(f"인메모리 후보 색인 결과: {len(candidates)}개")
+            return candidates
+        
+        return await self._mongo_text_search(user_input)
+    
+    async def _mongo_text_search(self, user_input: str) -> List[Dict]:
+        """MongoDB Text Search 수행 (인메모리 색인이 준비되지 않았을 때의 fallback)"""
         try:
-            self.stats['text_search_count'] += 1
+            self.stats['mongo_text_fallback_count'] += 1
             
             # Text Search 쿼리 (한국어 최적화)
             query = {
@@ -189,8 +284,8 @@ class OptimizedPatternMatcher:
                 }
             }
             
-            # Text Score로 정렬하여 상위 결과만 반환
-            cursor = self.pattern_collection.find(query).sort([
+            # Text Score로 정렬하여 상위 결과만 반환 (score 필터를 위해 textScore를 함께 조회)
+            cursor = self.pattern_collection.find(query, {"score": {"$meta": "textScore"}}).sort([
                 ("score", {"$meta": "textScore"})
             ]).limit(10)  # 상위 10개만
             
@@ -209,23 +304,28 @@ class OptimizedPatternMatcher:
             logger.error(f"Text Search 실패: {e}")
             return []
     
-    async def _vector_search(self, user_input: str, threshold: float) -> Optional[Tuple[Dict, float, str]]:
+    async def _vector_search(self, user_input: str, threshold: float,
+                             user_vector: Optional[sp.csr_matrix] = None) -> Optional[Tuple[Dict, float, str]]:
         """벡터 검색 수행"""
         try:
             self.stats['vector_search_count'] += 1
             
-            if not self.pattern_vectors or not self.pattern_texts:
+            if self.pattern_vectors is None or not self.pattern_texts:
                 return None
             
-            # 사용자 입력 벡터화
-            user_vector = self.vectorizer.transform([user_input])
+            # 사용자 입력 벡터화 (호출자가 이미 변환했으면 재사용)
+            if user_vector is None:
+                user_vector = self._vectorize_input(user_input)
             
-            # 코사인 유사도 계산
-            similarities = cosine_similarity(user_vector, self.pattern_vectors).flatten()
+            # 코사인 유사도 계산 (TF-IDF 행은 L2 정규화되어 있어 내적 = 코사인)
+            similarities = self._dot_scores(self.pattern_vectors, user_vector)
             
             # 최고 유사도 패턴 찾기
-            best_idx = np.argmax(similarities)
-            best_score = similarities[best_idx]
+            top_rows = self._top_k(similarities, 1)
+            if len(top_rows) == 0:
+                return None
+            best_idx = int(top_rows[0])
+            best_score = float(similarities[best_idx])
             
             if best_score >= threshold:
                 pattern_doc = self.pattern_docs[best_idx]
@@ -238,37 +338,74 @@ class OptimizedPatternMatcher:
             logger.error(f"벡터 검색 실패: {e}")
             return None
     
-    async def _calculate_similarity(self, user_input: str, pattern: str) -> float:
-        """두 텍스트 간의 유사도 계산"""
+    async def find_top_matches(self, user_input: str, k: int = 5, threshold: float = 0.0) -> List[Tuple[Dict, float]]:
+        """전체 패턴 중 유사도 상위 k개를 반환합니다 (벡터 검색만 사용)."""
         try:
-            if not self.pattern_vectors or not self.pattern_texts:
-                return 0.0
-            
-            # 벡터화
-            user_vector = self.vectorizer.transform([user_input])
-            pattern_vector = self.vectorizer.transform([pattern])
-            
-            # 코사인 유사도
-            similarity = cosine_similarity(user_vector, pattern_vector)[0][0]
-            return float(similarity)
+            if self.pattern_vectors is None or not self.pattern_texts:
+                return []
+            
+            similarities = self._dot_scores(self.pattern_vectors, self._vectorize_input(user_input))
+            return [
+                (self.pattern_docs[row], float(similarities[row]))
+                for row in self._top_k(similarities, k)
+                if similarities[row] >= threshold
+            ]
             
         except Exception as e:
-            logger.error(f"유사도 계산 실패: {e}")
-            return 0.0
+            logger.error(f"상위 패턴 검색 실패: {e}")
+            return []
     
-    def _update_cache(self, key: str, result: Tuple):
-        """캐시 업데이트"""
-        self.cache[key] = {
-            'result': result,
-            'timestamp': datetime.now()
-        }
+    def _vectorize_input(self, user_input: str) -> Optional[sp.csr_matrix]:
+        """사용자 입력을 한 번 벡터화합니다. 벡터라이저가 학습 전이면 None."""
+        if self.pattern_vectors is None:
+            return None
+        return self.vectorizer.transform([user_input])
+    
+    def _score_candidates(self, user_vector: Optional[sp.csr_matrix], candidates: List[Dict]) -> np.ndarray:
+        """
+        Text Search 후보들의 코사인 유사도를 한 번에 계산합니다.
+        후보 _id로 미리 계산된 pattern_vectors 행을 골라 쓰고, 아직 인메모리 색인에 반영되지 않은
+        후보만 따로 변환합니다.
+        """
+        scores = np.zeros(len(candidates), dtype=np.float64)
+        if user_vector is None or not candidates:
+            return scores
+        
+        rows, positions, missing = [], [], []
+        for position, doc in enumerate(candidates):
+            row = self.pattern_rows.get(doc.get('_id'))
+            if row is not None:
+                rows.append(row)
+                positions.append(position)
+            else:
+                missing.append(position)
         
-        # 캐시 크기 제한 (메모리 관리)
-        if len(self.cache) > 1000:
-            # 가장 오래된 항목 제거
-            oldest_key = min(self.cache.keys(), 
-                           key=lambda k: self.cache[k]['timestamp'])
-            del self.cache[oldest_key]
+        if rows:
+            scores[positions] = self._dot_scores(self.pattern_vectors[rows], user_vector)
+        if missing:
+            missing_vectors = self.vectorizer.transform([candidates[i]['pattern'] for i in missing])
+            scores[missing] = self._dot_scores(missing_vectors, user_vector)
+        return scores
+    
+    @staticmethod
+    def _dot_scores(matrix: sp.csr_matrix, user_vector: sp.csr_matrix) -> np.ndarray:
+        """정규화된 행렬과 입력 벡터의 희소 행렬-벡터 곱 (= 행별 코사인 유사도)"""
+        return np.asarray((matrix @ user_vector.T).todense()).ravel()
+    
+    @staticmethod
+    def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+        """점수 상위 k개 행 번호를 점수 내림차순으로 반환합니다 (argpartition으로 전체 정렬 회피)."""
+        if k <= 0 or len(scores) == 0:
+            return np.array([], dtype=np.int64)
+        if k < len(scores):
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        return top[np.argsort(-scores[top], kind='stable')]
+    
+    def _update_cache(self, key: str, result: Tuple):
+        """캐시 업데이트 (용량 초과 시 가장 오래 쓰지 않은 항목 제거, O(1))"""
+        self.cache.put(key, result)
     
     def _update_stats(self, response_time: float):
         """성능 통계 업데이트"""
@@ -297,12 +434,82 @@ class OptimizedPatternMatcher:
         except Exception as e:
             logger.error(f"패턴 새로고침 실패: {e}")
     
+    def upsert_pattern(self, pattern_doc: Dict):
+        """
+        패턴 하나를 증분 반영합니다.
+        학습된 어휘/IDF로 새 행만 변환해 추가하며, 패턴 텍스트가 바뀌지 않은 수정은
+        문서만 교체합니다 (usage_count 증가 등).
+        """
+        if self.pattern_vectors is None:
+            # 아직 초기화 전이면 initialize 시점에 전체 로드됨
+            return
+        
+        pattern_id = pattern_doc.get('_id')
+        row = self.pattern_rows.get(pattern_id)
+        self.candidate_index.upsert(pattern_doc)
+        
+        if row is not None:
+            if self.pattern_texts[row] == pattern_doc.get('pattern'):
+                self.pattern_docs[row] = pattern_doc
+                return
+            self._remove_rows([row])
+        
+        new_vector = self.vectorizer.transform([pattern_doc['pattern']])
+        self.pattern_vectors = sp.vstack([self.pattern_vectors, new_vector], format='csr')
+        self.pattern_docs.append(pattern_doc)
+        self.pattern_texts.append(pattern_doc['pattern'])
+        self.pattern_rows[pattern_id] = len(self.pattern_docs) - 1
+        
+        self._after_incremental_change()
+    
+    def remove_pattern(self, pattern_id):
+        """패턴 하나를 벡터 행렬에서 제거합니다 (재벡터화 없음)."""
+        if self.pattern_vectors is None:
+            return
+        
+        self.candidate_index.remove(pattern_id)
+        row = self.pattern_rows.get(pattern_id)
+        if row is None:
+            return
+        
+        self._remove_rows([row])
+        self._after_incremental_change()
+    
+    def _remove_rows(self, rows: List[int]):
+        """지정한 행을 벡터 행렬과 문서 목록에서 제거합니다."""
+        removed = set(rows)
+        keep = [i for i in range(len(self.pattern_docs)) if i not in removed]
+        
+        self.pattern_vectors = self.pattern_vectors[keep]
+        self.pattern_docs = [self.pattern_docs[i] for i in keep]
+        self.pattern_texts = [self.pattern_texts[i] for i in keep]
+        self.pattern_rows = {doc['_id']: row for row, doc in enumerate(self.pattern_docs)}
+    
+    def _after_incremental_change(self):
+        """증분 반영 후 캐시를 비우고, 누적 변경이 많으면 재학습을 예약합니다."""
+        self.cache.clear()
+        self.incremental_changes += 1
+        
+        # 해시 벡터라이저는 어휘가 고정되지 않아 새 패턴도 그대로 변환되므로 재학습하지 않음
+        if getattr(self.vectorizer, 'supports_incremental', False):
+            return
+        
+        if self.incremental_changes > max(len(self.pattern_docs), 1) * self.refit_ratio:
+            logger.info(f"🔄 증분 변경 {self.incremental_changes}건 누적, 패턴 벡터 재학습")
+            try:
+                self.pattern_vectors = self.vectorizer.fit_transform(self.pattern_texts)
+                self.incremental_changes = 0
+            except Exception as e:
+                logger.error(f"패턴 벡터 재학습 실패: {e}")
+    
     def get_performance_stats(self) -> Dict:
         """성능 통계 반환"""
         return {
             **self.stats,
             'cache_size': len(self.cache),
+            'cache': self.cache.get_stats(),
             'pattern_count': len(self.pattern_docs),
+            'candidate_index': self.candidate_index.get_stats(),
             'cache_hit_rate': (
                 self.stats['cache_hits'] / max(self.stats['total_queries'], 1)
             )
@@ -321,10 +528,11 @@ class OptimizedPatternMatcher:
                 "accuracy": 0.9
             }
             
-            await self.pattern_collection.insert_one(pattern_doc)
+            result = await self.pattern_collection.insert_one(pattern_doc)
+            pattern_doc["_id"] = result.inserted_id
             
-            # 패턴 데이터 새로고침
-            await self.refresh_patterns()
+            # 전체 재벡터화 대신 새 패턴 행만 추가
+            self.upsert_pattern(pattern_doc)
             
             logger.info(f"✅ 새 패턴 추가: {pattern}")
             
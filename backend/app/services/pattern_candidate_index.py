@@ -0,0 +1,198 @@
+"""
+패턴 후보 인메모리 색인 모듈
+context_patterns의 pattern 필드를 토큰 역색인과 문자 n-gram 역색인으로 보관해
+MongoDB `$text` 검색(default_language="none")과 같은 후보 집합을 네트워크 왕복 없이 만든다.
+
+토큰 점수는 MongoDB 텍스트 인덱스 점수 계산을 그대로 따른다.
+- 토큰화: 공백/문장 부호 기준 분리, 대소문자 무시, 언어 "none"이므로 어간 추출/불용어 없음
+- 문서 내 용어 점수: 반복 출현은 1, 1/2, 1/4 ... 로 누적(freq), coeff = 0.5 * 출현 수 / 전체 토큰 수 + 0.5
+- 필드 전체가 그 용어 하나와 같으면 1.1배
+- 문서 점수 = 검색어의 서로 다른 용어별 점수 합
+"""
+
+import re
+import threading
+from typing import Any, Dict, List, Set, Tuple
+
+# MongoDB 텍스트 토크나이저처럼 문장 부호/공백/밑줄을 구분자로 사용
+_TOKEN_PATTERN = re.compile(r'[^\W_]+')
+
+
+def tokenize(text: str) -> List[str]:
+    """$text와 같은 규칙으로 토큰을 나눕니다 (대소문자 무시)."""
+    return _TOKEN_PATTERN.findall((text or '').casefold())
+
+
+def char_ngrams(text: str, n: int = 2) -> Set[str]:
+    """공백을 제거한 문자열의 문자 n-gram 집합 (한 글자 문자열은 그 자체)"""
+    compact = ''.join(tokenize(text))
+    if len(compact) < n:
+        return {compact} if compact else set()
+    return {compact[i:i + n] for i in range(len(compact) - n + 1)}
+
+
+class PatternCandidateIndex:
+    """
+    pattern _id 기준 인메모리 후보 색인
+    - term_postings: 용어 -> {pattern _id: $text 용어 점수}
+    - ngram_postings: 문자 n-gram -> {pattern _id} (조사 붙은 한국어 입력 등 토큰 불일치 보완용)
+    """
+
+    def __init__(self, ngram_size: int = 2):
+        self.ngram_size = ngram_size
+        self.term_postings: Dict[str, Dict[Any, float]] = {}
+        self.ngram_postings: Dict[str, Set[Any]] = {}
+        self.docs: Dict[Any, Dict] = {}
+        self._doc_terms: Dict[Any, Tuple[List[str], Set[str]]] = {}
+        self._order: Dict[Any, int] = {}  # 동점 정렬용 추가 순번
+        self._next_order = 0
+        self._lock = threading.Lock()
+        self.is_warm = False
+
+    def build(self, pattern_docs: List[Dict]):
+        """전체 패턴으로 색인을 다시 만듭니다."""
+        with self._lock:
+            self.term_postings = {}
+            self.ngram_postings = {}
+            self.docs = {}
+            self._doc_terms = {}
+            self._order = {}
+            self._next_order = 0
+            for doc in pattern_docs:
+                self._add(doc)
+            self.is_warm = True
+
+    def upsert(self, doc: Dict):
+        """패턴 하나를 추가/교체합니다. 패턴 텍스트가 같으면 문서만 교체합니다."""
+        with self._lock:
+            pattern_id = doc.get('_id')
+            current = self.docs.get(pattern_id)
+            if current is not None and current.get('pattern') == doc.get('pattern'):
+                self.docs[pattern_id] = doc
+                return
+            if current is not None:
+                self._remove(pattern_id)
+            self._add(doc)
+
+    def remove(self, pattern_id: Any):
+        """패턴 하나를 색인에서 제거합니다."""
+        with self._lock:
+            self._remove(pattern_id)
+
+    def search(self, query: str, limit: int = 10, min_score: float = 1.0,
+               ngram_expansion: bool = False, min_ngram_overlap: float = 0.5) -> List[Dict]:
+        """
+        $text 검색과 같은 후보를 점수 내림차순으로 반환합니다.
+        반환 문서에는 Mongo textScore 대신 'score' 필드가 채워진 사본이 담긴다.
+
+        Args:
+            query: 사용자 입력
+            limit: 최대 후보 수 (기존 $text 검색의 limit(10))
+            min_score: 최소 텍스트 점수 (기존 필터 1.0)
+            ngram_expansion: 토큰 후보가 limit보다 적으면 문자 n-gram 겹침이 큰 패턴으로 보충
+            min_ngram_overlap: 보충 후보의 최소 n-gram 겹침 비율 (입력 n-gram 기준)
+        """
+        terms = set(tokenize(query))
+        scores: Dict[Any, float] = {}
+        for term in terms:
+            postings = self.term_postings.get(term)
+            if not postings:
+                continue
+            for pattern_id, score in postings.items():
+                scores[pattern_id] = scores.get(pattern_id, 0.0) + score
+
+        ranked = sorted(
+            (pid for pid, score in scores.items() if score >= min_score),
+            key=lambda pid: (-scores[pid], self._order.get(pid, 0))
+        )[:limit]
+        results = [{**self.docs[pid], 'score': scores[pid]} for pid in ranked]
+
+        if ngram_expansion and len(results) < limit:
+            results.extend(self._ngram_candidates(query, set(ranked), limit - len(results), min_ngram_overlap))
+        return results
+
+    def get_stats(self) -> Dict:
+        """색인 통계를 반환합니다."""
+        return {
+            'is_warm': self.is_warm,
+            'patterns': len(self.docs),
+            'terms': len(self.term_postings),
+            'ngrams': len(self.ngram_postings)
+        }
+
+    def _ngram_candidates(self, query: str, exclude: Set[Any], limit: int, min_overlap: float) -> List[Dict]:
+        """입력 n-gram과 겹치는 비율이 큰 패턴을 보충 후보로 반환합니다."""
+        query_ngrams = char_ngrams(query, self.ngram_size)
+        if not query_ngrams:
+            return []
+        overlaps: Dict[Any, int] = {}
+        for gram in query_ngrams:
+            for pattern_id in self.ngram_postings.get(gram, ()):
+                if pattern_id not in exclude:
+                    overlaps[pattern_id] = overlaps.get(pattern_id, 0) + 1
+
+        ranked = sorted(
+            (pid for pid, count in overlaps.items() if count / len(query_ngrams) >= min_overlap),
+            key=lambda pid: (-overlaps[pid], self._order.get(pid, 0))
+        )[:limit]
+        return [{**self.docs[pid], 'score': overlaps[pid] / len(query_ngrams)} for pid in ranked]
+
+    def _add(self, doc: Dict):
+        """문서를 색인에 추가합니다 (락을 잡은 상태에서 호출)."""
+        pattern_id = doc.get('_id')
+        pattern = doc.get('pattern') or ''
+        term_scores = self._term_scores(pattern)
+        ngrams = char_ngrams(pattern, self.ngram_size)
+
+        for term, score in term_scores.items():
+            self.term_postings.setdefault(term, {})[pattern_id] = score
+        for gram in ngrams:
+            self.ngram_postings.setdefault(gram, set()).add(pattern_id)
+
+        self.docs[pattern_id] = doc
+        self._doc_terms[pattern_id] = (list(term_scores), ngrams)
+        self._order[pattern_id] = self._next_order
+        self._next_order += 1
+
+    def _remove(self, pattern_id: Any):
+        """문서를 색인에서 제거합니다 (락을 잡은 상태에서 호출)."""
+        entry = self._doc_terms.pop(pattern_id, None)
+        if entry is None:
+            return
+        terms, ngrams = entry
+        for term in terms:
+            postings = self.term_postings.get(term)
+            if postings is not None:
+                postings.pop(pattern_id, None)
+                if not postings:
+                    del self.term_postings[term]
+        for gram in ngrams:
+            postings = self.ngram_postings.get(gram)
+            if postings is not None:
+                postings.discard(pattern_id)
+                if not postings:
+                    del self.ngram_postings[gram]
+        self.docs.pop(pattern_id, None)
+        self._order.pop(pattern_id, None)
+
+    @staticmethod
+    def _term_scores(pattern: str) -> Dict[str, float]:
+        """MongoDB 텍스트 인덱스와 같은 방식으로 필드 내 용어별 점수를 계산합니다."""
+        tokens = tokenize(pattern)
+        if not tokens:
+            return {}
+
+        stats: Dict[str, List[float]] = {}  # term -> [freq, count, exp]
+        for token in tokens:
+            entry = stats.setdefault(token, [0.0, 0, 0])
+            entry[2] = entry[2] * 2 if entry[2] else 1
+            entry[1] += 1
+            entry[0] += 1.0 / entry[2]
+
+        raw = pattern.casefold()
+        scores = {}
+        for term, (freq, count, _) in stats.items():
+            coeff = 0.5 * count / len(tokens) + 0.5
+            adjustment = 1.1 if raw == term else 1.0
+            scores[term] = freq * coeff * adjustment
+        return scores
@@ -0,0 +1,104 @@
+"""
+패턴 벡터라이저 모듈
+한국어 교착어 입력('프린터가', '프린터를')도 같은 특징을 공유하도록 단어 경계 안의 문자 n-gram(char_wb)을
+고정 크기 해시 공간으로 보낸 뒤 IDF 가중치를 적용한다.
+- 어휘 사전이 없으므로 transform에 어휘 조회가 없고 메모리는 n_features로 고정
+- IDF는 fit 시점의 패턴으로 한 번 계산하며, 이후 추가되는 패턴은 같은 IDF로 변환해 재학습이 필요 없음
+"""
+
+from typing import Any, Dict, Iterable, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
+
+
+class HashedCharTfidfVectorizer:
+    """HashingVectorizer(char_wb) + TfidfTransformer 조합 (TfidfVectorizer와 같은 fit_transform/transform 인터페이스)"""
+
+    # 증분 추가 시 전체 재학습이 필요 없음을 매칭기에 알림
+    supports_incremental = True
+
+    def __init__(self, ngram_range=(2, 4), n_features: int = 2 ** 18):
+        """
+        Args:
+            ngram_range: 문자 n-gram 범위
+            n_features: 해시 특징 공간 크기 (메모리 상한)
+        """
+        self.hasher = HashingVectorizer(
+            analyzer='char_wb',
+            ngram_range=ngram_range,
+            n_features=n_features,
+            alternate_sign=False,  # 음수 값이 생기면 IDF/코사인 계산이 왜곡되므로 끔
+            norm=None,
+            lowercase=True
+        )
+        self.idf = TfidfTransformer(norm='l2', use_idf=True, smooth_idf=True)
+        self.is_fitted = False
+
+    def fit_transform(self, texts: Iterable[str]) -> sp.csr_matrix:
+        """패턴으로 IDF를 계산하고 L2 정규화된 TF-IDF 행렬을 반환합니다."""
+        counts = self.hasher.transform(texts)
+        vectors = self.idf.fit_transform(counts)
+        self.is_fitted = True
+        return vectors.tocsr()
+
+    def transform(self, texts: Iterable[str]) -> sp.csr_matrix:
+        """학습된 IDF로 변환합니다 (어휘 조회 없음)."""
+        return self.idf.transform(self.hasher.transform(texts)).tocsr()
+    
+    def config_signature(self) -> Dict[str, Any]:
+        """스냅샷 호환성 확인용 설정 값"""
+        return {
+            'kind': 'char_hash',
+            'ngram_range': list(self.hasher.ngram_range),
+            'n_features': self.hasher.n_features
+        }
+
+
+def create_pattern_vectorizer(mode: str = "word", n_features: int = 2 ** 18,
+                              ngram_min: int = 2, ngram_max: int = 4):
+    """
+    설정에 맞는 패턴 벡터라이저를 만듭니다.
+
+    Args:
+        mode: "word" (기존 단어 1-3그램 TF-IDF) 또는 "char_hash" (문자 n-gram 해시 + IDF)
+    """
+    if mode == "word":
+        return TfidfVectorizer(
+            analyzer='word',
+            ngram_range=(1, 3),  # 1-3그램으로 단어 조합 캐치
+            min_df=1,
+            max_df=0.9,
+            stop_words=None,  # 한국어는 불용어 처리가 복잡하므로 제외
+            lowercase=True
+        )
+    return HashedCharTfidfVectorizer(ngram_range=(ngram_min, ngram_max), n_features=n_features)
+
+
+def vectorizer_signature(vectorizer) -> Dict[str, Any]:
+    """벡터라이저 종류/설정 요약 (스냅샷 변경 토큰에 포함)"""
+    if isinstance(vectorizer, HashedCharTfidfVectorizer):
+        return vectorizer.config_signature()
+    return {'kind': 'word', 'ngram_range': list(vectorizer.ngram_range)}
+
+
+def export_vectorizer_state(vectorizer) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """
+    학습된 벡터라이저 상태를 (배열, 메타) 형태로 내보냅니다.
+    해시 모드는 IDF 배열만, 단어 모드는 IDF 배열과 어휘 사전을 내보낸다.
+    """
+    if isinstance(vectorizer, HashedCharTfidfVectorizer):
+        return {'idf': np.asarray(vectorizer.idf.idf_)}, vectorizer.config_signature()
+    vocabulary = {term: int(index) for term, index in vectorizer.vocabulary_.items()}
+    return {'idf': np.asarray(vectorizer.idf_)}, {**vectorizer_signature(vectorizer), 'vocabulary': vocabulary}
+
+
+def restore_vectorizer_state(vectorizer, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]):
+    """export_vectorizer_state로 내보낸 상태를 다시 적용합니다 (재학습 없음)."""
+    if isinstance(vectorizer, HashedCharTfidfVectorizer):
+        vectorizer.idf.idf_ = arrays['idf']
+        vectorizer.is_fitted = True
+        return
+    vectorizer.vocabulary_ = meta['vocabulary']
+    vectorizer.idf_ = arrays['idf']
@@ -0,0 +1,200 @@
+"""
+프롬프트 접두부 KV 캐시 모듈
+시스템 프롬프트/고정 지시문처럼 요청마다 같은 프롬프트 앞부분의 KV 상태를 한 번만 계산해 두고,
+생성 시 그 상태에서 이어서 사용자/DB 텍스트만 prefill 하도록 한다.
+키는 (스타일, 템플릿) 튜플이다.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, Optional, Tuple
+
+import torch
+
+PrefixKey = Tuple[Hashable, ...]
+
+
+@dataclass
+class PrefixEntry:
+    """등록된 고정 접두부 하나"""
+    key: PrefixKey
+    text: str
+    input_ids: torch.Tensor                 # 1차원 접두부 토큰
+    past: Optional[tuple] = None            # 레이어별 (key, value) 텐서 튜플, 첫 사용 시 계산
+    build_ms: float = 0.0
+    hits: int = 0
+    created_at: float = field(default_factory=time.monotonic)
+    # 접두부별 KV 계산 락 (같은 접두부를 두 번 계산하지 않도록, 다른 접두부/등록은 막지 않음)
+    build_lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+
+class PrefixKVCache:
+    """
+    transformers 모델용 접두부 KV 캐시
+
+    - register()로 접두부 텍스트를 등록하면 토큰만 미리 만들어 두고,
+      KV 상태는 추론 스레드에서 처음 필요할 때 한 번 계산한다.
+    - 전역 락(_lock)은 항목/통계 관리에만 쓰고, KV 계산은 접두부별 락으로 한다
+      (register/build_input_ids는 이벤트 루프에서 호출되므로 모델 forward를 기다리면 안 됨).
+    - 생성 시에는 캐시된 KV를 요청/배치 크기만큼 복사해 넘긴다 (generate가 캐시를 덮어쓰므로).
+    - 등록 수가 max_entries를 넘으면 가장 오래 쓰지 않은 접두부부터 제거한다.
+    """
+
+    def __init__(self, model, tokenizer, max_entries: int = 8):
+        """
+        Args:
+            model: transformers CausalLM 모델
+            tokenizer: 모델 토크나이저
+            max_entries: 유지할 최대 접두부 수
+        """
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_entries = max_entries
+
+        self._entries: "OrderedDict[PrefixKey, PrefixEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.stats = {
+            'hits': 0,
+            'builds': 0,
+            'evictions': 0,
+            'saved_prefill_tokens': 0
+        }
+
+    def register(self, key: PrefixKey, text: str) -> PrefixEntry:
+        """
+        접두부를 등록합니다. 같은 키에 다른 텍스트가 오면 KV 상태를 다시 계산하도록 교체합니다.
+
+        Args:
+            key: (스타일, 템플릿) 형태의 캐시 키
+            text: 고정 접두부 텍스트
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.text == text:
+                self._entries.move_to_end(key)
+                return entry
+
+        # 토크나이징은 락 밖에서 (이벤트 루프에서 호출되므로 다른 등록/조회를 기다리게 하지 않음)
+        input_ids = self.tokenizer(text, return_tensors="pt").input_ids[0]
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.text == text:
+                self._entries.move_to_end(key)
+                return entry
+
+            entry = PrefixEntry(key=key, text=text, input_ids=input_ids)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+            return entry
+
+    def build_input_ids(self, key: PrefixKey, prefix_text: str, suffix_text: str) -> torch.Tensor:
+        """
+        접두부 토큰 뒤에 가변 부분 토큰을 이어 붙인 (1, L) 입력을 만듭니다.
+        가변 부분은 특수 토큰 없이 따로 토크나이징해 접두부 토큰이 항상 그대로 앞에 오도록 합니다.
+        """
+        entry = self.register(key, prefix_text)
+        suffix_ids = self.tokenizer(suffix_text, add_special_tokens=False, return_tensors="pt").input_ids[0]
+        return torch.cat([entry.input_ids, suffix_ids]).unsqueeze(0)
+
+    def get_entry(self, key: PrefixKey) -> Optional[PrefixEntry]:
+        """등록된 접두부를 반환합니다."""
+        with self._lock:
+            return self._entries.get(key)
+
+    def past_for(self, key: PrefixKey, input_ids: torch.Tensor, batch_size: int = 1):
+        """
+        입력이 해당 접두부로 시작하면 접두부 KV 캐시의 복사본을 반환합니다 (추론 스레드에서 호출).
+
+        Args:
+            key: 접두부 키
+            input_ids: 실제 생성 입력 (1, L) 또는 (L,)
+            batch_size: 복사할 배치 크기
+
+        Returns:
+            (접두부 길이, past_key_values) 또는 사용할 수 없으면 (0, None)
+        """
+        entry = self.get_entry(key)
+        if entry is None or not self.matches(entry, input_ids):
+            return 0, None
+
+        if entry.past is None:
+            # 모델 forward는 전역 락 밖에서, 접두부별 락으로 한 번만 계산
+            with entry.build_lock:
+                if entry.past is None:
+                    self._build(entry)
+
+        with self._lock:
+            entry.hits += 1
+            self.stats['hits'] += 1
+            self.stats['saved_prefill_tokens'] += len(entry.input_ids) * batch_size
+            past = entry.past
+
+        return len(entry.input_ids), self._to_cache(past, batch_size)
+
+    @staticmethod
+    def matches(entry: PrefixEntry, input_ids: torch.Tensor) -> bool:
+        """입력 토큰이 접두부 토큰으로 시작하고 뒤에 최소 한 토큰이 더 있는지 확인합니다."""
+        tokens = input_ids.reshape(-1)
+        length = len(entry.input_ids)
+        return len(tokens) > length and torch.equal(tokens[:length].cpu(), entry.input_ids)
+
+    def clear(self):
+        """등록된 접두부를 모두 제거합니다."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        """캐시 통계를 반환합니다."""
+        with self._lock:
+            entries = [
+                {
+                    'key': list(entry.key),
+                    'prefix_tokens': len(entry.input_ids),
+                    'built': entry.past is not None,
+                    'build_ms': entry.build_ms,
+                    'hits': entry.hits
+                }
+                for entry in self._entries.values()
+            ]
+        return {**self.stats, 'entries': entries, 'max_entries': self.max_entries}
+
+    def _build(self, entry: PrefixEntry):
+        """접두부 KV 상태를 한 번 계산합니다 (entry.build_lock을 잡은 상태에서 호출, 전역 락은 잡지 않음)."""
+        start = time.monotonic()
+        with torch.no_grad():
+            outputs = self.model(
+                input_ids=entry.input_ids.unsqueeze(0).to(self.model.device),
+                use_cache=True
+            )
+        past = outputs.past_key_values
+        if hasattr(past, 'to_legacy_cache'):
+            past = past.to_legacy_cache()
+        entry.build_ms = (time.monotonic() - start) * 1000
+        entry.past = tuple((layer[0], layer[1]) for layer in past)
+        with self._lock:
+            self.stats['builds'] += 1
+        logging.info(f"✅ 접두부 KV 캐시 생성: {entry.key} ({len(entry.input_ids)} 토큰, {entry.build_ms:.1f}ms)")
+
+    @staticmethod
+    def _to_cache(past: tuple, batch_size: int):
+        """저장된 KV 텐서를 배치 크기만큼 복사해 generate/forward에 넘길 캐시 객체로 만듭니다."""
+        layers = tuple(
+            (key.repeat(batch_size, 1, 1, 1), value.repeat(batch_size, 1, 1, 1))
+            for key, value in past
+        )
+        try:
+            from transformers import DynamicCache
+        except ImportError:
+            return layers
+        if hasattr(DynamicCache, 'from_legacy_cache'):
+            return DynamicCache.from_legacy_cache(layers)
+        return DynamicCache(layers)
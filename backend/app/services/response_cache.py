@@ -0,0 +1,122 @@
+"""
+DB 답변 강화 응답 캐시 모듈
+knowledge_base 문서 _id, 정규화된 질문 시그니처, 강화에 쓴 원본 답변 해시를 키로 LLM 강화 결과를 보관한다.
+만료/용량 관리는 공통 LRUCache에 맡기고, 지식 문서가 수정/삭제되면
+해당 문서의 항목을 모두 무효화한다.
+(LLM 호출 중에 답변이 수정되어 무효화가 먼저 실행되더라도, 늦게 저장된 이전 답변 기준 결과는
+원본 해시가 달라 다시 조회되지 않음)
+"""
+
+import hashlib
+import re
+import unicodedata
+from typing import Any, Dict, Optional, Set, Tuple
+
+from .lru_cache import LRUCache
+
+CacheKey = Tuple[str, str, str]
+
+# 질문 시그니처에서 제외할 문장 부호/기호
+_PUNCTUATION = re.compile(r'[^\w\s]')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_question(question: str) -> str:
+    """
+    질문을 캐시 비교용으로 정규화합니다.
+    유니코드 NFKC, 소문자화, 문장 부호 제거, 공백 제거 순으로 처리해
+    '포스 재설치 방법?'과 '포스재설치 방법'이 같은 시그니처를 갖도록 한다.
+    """
+    text = unicodedata.normalize('NFKC', question or '').lower()
+    text = _PUNCTUATION.sub(' ', text)
+    return _WHITESPACE.sub('', text)
+
+
+def question_signature(question: str) -> str:
+    """정규화된 질문의 짧은 해시 시그니처를 반환합니다."""
+    return hashlib.sha1(normalize_question(question).encode('utf-8')).hexdigest()[:16]
+
+
+class EnhancedAnswerCache:
+    """
+    (지식 문서 _id, 질문 시그니처, 원본 답변 해시) -> 강화된 답변 캐시
+
+    - 만료/용량 관리는 공통 LRUCache(TTL + 항목 수 + 바이트 예산)에 맡김
+    - 문서별 키 목록을 유지해 invalidate(knowledge_id)로 한 번에 무효화
+    """
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 16 * 1024 * 1024,
+                 ttl_seconds: float = 3600.0):
+        """
+        Args:
+            max_entries: 최대 항목 수
+            max_bytes: 보관할 답변의 최대 누적 크기(바이트, UTF-8 기준)
+            ttl_seconds: 항목 유효 시간(초)
+        """
+        self._entries = LRUCache(
+            max_entries=max_entries,
+            max_bytes=max_bytes,
+            ttl_seconds=ttl_seconds,
+            on_remove=self._on_remove
+        )
+        self._keys_by_knowledge: Dict[str, Set[CacheKey]] = {}
+
+    @property
+    def max_entries(self) -> int:
+        return self._entries.max_entries
+
+    @property
+    def max_bytes(self) -> int:
+        return self._entries.max_bytes
+
+    @property
+    def ttl_seconds(self) -> float:
+        return self._entries.ttl_seconds
+
+    def get(self, knowledge_id: Any, question: str, source_hash: str) -> Optional[str]:
+        """캐시된 강화 답변을 반환합니다. 없거나 만료되었거나 원본 답변이 다르면 None."""
+        return self._entries.get((str(knowledge_id), question_signature(question), source_hash))
+
+    def put(self, knowledge_id: Any, question: str, source_hash: str, answer: str):
+        """
+        강화 답변을 저장합니다. 예산보다 큰 답변은 저장하지 않습니다.
+        source_hash는 강화에 사용한 원본 답변의 해시 (LLMService.enhancement_source_hash)
+        """
+        knowledge_id = str(knowledge_id)
+        key = (knowledge_id, question_signature(question), source_hash)
+        with self._entries.lock:
+            if self._entries.put(key, answer):
+                self._keys_by_knowledge.setdefault(knowledge_id, set()).add(key)
+
+    def invalidate(self, knowledge_id: Any) -> int:
+        """지식 문서의 캐시 항목을 모두 제거하고 제거한 개수를 반환합니다."""
+        with self._entries.lock:
+            keys = self._keys_by_knowledge.get(str(knowledge_id))
+            if not keys:
+                return 0
+            removed = len(keys)
+            for key in list(keys):
+                self._entries.pop(key)
+            return removed
+
+    def invalidate_document(self, doc: Dict):
+        """수정된 지식 문서를 받아 무효화합니다 (인덱스 동기화 핸들러용)."""
+        self.invalidate(doc.get('_id'))
+
+    def clear(self):
+        """모든 항목을 제거합니다."""
+        with self._entries.lock:
+            self._entries.clear()
+            self._keys_by_knowledge.clear()
+
+    def get_stats(self) -> Dict:
+        """캐시 통계를 반환합니다."""
+        return self._entries.get_stats()
+
+    def _on_remove(self, key: CacheKey, answer: str, reason: str):
+        """LRU 항목이 빠지면 문서별 키 목록에서도 제거합니다 (캐시 락을 잡은 상태에서 호출)."""
+        keys = self._keys_by_knowledge.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_knowledge[key[0]]
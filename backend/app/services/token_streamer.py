@@ -0,0 +1,51 @@
+"""
+토큰 스트리머 모듈
+추론 스레드에서 생성된 텍스트 조각을 이벤트 루프의 asyncio.Queue로 전달하는
+TextIteratorStreamer 방식의 비동기 스트리머
+"""
+
+import asyncio
+from typing import Optional
+
+from transformers import TextStreamer
+
+
+class AsyncTextIteratorStreamer(TextStreamer):
+    """
+    model.generate(streamer=...)에 넘기는 비동기 스트리머
+
+    generate는 추론 스레드에서 on_finalized_text를 호출하고,
+    이벤트 루프 쪽에서는 `async for text in streamer`로 조각을 받는다.
+    """
+
+    _END = object()
+
+    def __init__(self, tokenizer, loop: asyncio.AbstractEventLoop, skip_prompt: bool = True, **decode_kwargs):
+        decode_kwargs.setdefault('skip_special_tokens', True)
+        super().__init__(tokenizer, skip_prompt=skip_prompt, **decode_kwargs)
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._closed = False
+
+    def on_finalized_text(self, text: str, stream_end: bool = False):
+        """디코딩이 확정된 텍스트를 이벤트 루프로 전달합니다 (추론 스레드에서 호출)."""
+        if text:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, text)
+        if stream_end:
+            self.close()
+
+    def close(self):
+        """스트림 종료 신호를 보냅니다 (생성 실패 시에도 호출해 대기 중인 소비자를 깨움)."""
+        if self._closed:
+            return
+        self._closed = True
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, self._END)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> str:
+        item: Optional[object] = await self.queue.get()
+        if item is self._END:
+            raise StopAsyncIteration
+        return item
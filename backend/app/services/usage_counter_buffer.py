@@ -0,0 +1,129 @@
+"""
+사용 횟수 카운터 쓰기 지연 버퍼 모듈
+요청마다 보내던 update_one($inc)을 메모리에 누적했다가 주기적으로 한 번의 bulk_write로 반영한다.
+- 시간 제한: flush_interval마다 백그라운드 태스크가 비움
+- 크기 제한: 대기 중인 문서 수가 max_pending에 닿으면 즉시 비움
+- 종료 시 stop()으로 남은 증가분을 마지막으로 반영
+  (태스크를 취소하지 않고 종료 이벤트로 멈추므로 진행 중인 반영은 끝까지 수행됨)
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+
+class UsageCounterBuffer:
+    """문서 _id별 카운터 증가분을 모아 bulk_write로 반영하는 버퍼"""
+
+    def __init__(self, collection, field: str = "usage_count",
+                 flush_interval: float = 5.0, max_pending: int = 200):
+        """
+        Args:
+            collection: 카운터를 올릴 Motor 컬렉션
+            field: 증가시킬 필드명
+            flush_interval: 주기적 반영 간격(초)
+            max_pending: 이 수만큼 문서가 쌓이면 주기를 기다리지 않고 반영
+        """
+        self.collection = collection
+        self.field = field
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self._pending: Dict[Any, int] = {}
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._stop_event = asyncio.Event()
+        self._size_flush: Optional[asyncio.Task] = None
+        self.is_running = False
+
+        self.stats = {
+            'increments': 0,
+            'flushes': 0,
+            'documents_written': 0,
+            'flush_errors': 0
+        }
+
+    def increment(self, doc_id: Any, amount: int = 1):
+        """증가분을 누적합니다 (DB 호출 없음). 이벤트 루프 안에서 호출합니다."""
+        self._pending[doc_id] = self._pending.get(doc_id, 0) + amount
+        self.stats['increments'] += 1
+
+        if not self.is_running:
+            self.start()
+
+        if len(self._pending) >= self.max_pending and (self._size_flush is None or self._size_flush.done()):
+            self._size_flush = asyncio.create_task(self.flush())
+
+    def start(self):
+        """주기적 반영 태스크를 시작합니다."""
+        if self.is_running:
+            return
+        self.is_running = True
+        self._stop_event.clear()
+        self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """주기적 반영을 멈추고 남은 증가분을 반영합니다 (애플리케이션 종료 시)."""
+        self.is_running = False
+        self._stop_event.set()
+        if self._task is not None:
+            # 반영 도중 취소하면 이미 꺼낸 증가분이 사라지므로 루프가 스스로 끝나기를 기다림
+            await self._task
+            self._task = None
+        if self._size_flush is not None and not self._size_flush.done():
+            await self._size_flush
+        await self.flush()
+
+    async def flush(self) -> int:
+        """
+        누적된 증가분을 한 번의 bulk_write로 반영하고 반영한 문서 수를 반환합니다.
+        실패하면(취소 포함) 증가분을 다시 버퍼에 합쳐 다음 반영 때 재시도합니다.
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+
+            pending, self._pending = self._pending, {}
+            operations = [
+                UpdateOne({"_id": doc_id}, {"$inc": {self.field: amount}})
+                for doc_id, amount in pending.items()
+            ]
+            try:
+                await self.collection.bulk_write(operations, ordered=False)
+                self.stats['flushes'] += 1
+                self.stats['documents_written'] += len(operations)
+                logging.debug(f"✅ {self.field} 반영: {len(operations)}개 문서")
+                return len(operations)
+            except BaseException as e:
+                for doc_id, amount in pending.items():
+                    self._pending[doc_id] = self._pending.get(doc_id, 0) + amount
+                if not isinstance(e, PyMongoError):
+                    raise
+                self.stats['flush_errors'] += 1
+                logging.error(f"{self.field} 일괄 반영 실패 ({len(operations)}개 문서, 다음 주기에 재시도): {str(e)}")
+                return 0
+
+    def get_stats(self) -> Dict:
+        """버퍼 통계를 반환합니다."""
+        return {
+            **self.stats,
+            'pending_documents': len(self._pending),
+            'pending_increments': sum(self._pending.values()),
+            'is_running': self.is_running
+        }
+
+    async def _flush_loop(self):
+        """flush_interval마다 버퍼를 비웁니다 (종료 이벤트가 설정되면 즉시 끝남)."""
+        while not self._stop_event.is_set():
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=self.flush_interval)
+                break
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception as e:
+                logging.error(f"{self.field} 주기적 반영 중 오류: {str(e)}")
@@ -83,11 +83,14 @@ export default function ChatPage() {
 
     setMessages(prev => [...prev, typingMessage]);
 
+    const assistantId = `assistant-${Date.now()}`;
+
     try {
-      const response = await fetch('http://localhost:8000/api/v1/chat/send', {
+      const response = await fetch('http://localhost:8000/api/v1/chat/send/stream', {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          'Accept': 'text/event-stream',
         },
         body: JSON.stringify({
           message: input,
@@ -95,23 +98,72 @@ export default function ChatPage() {
         }),
       });
 
-      const data = await response.json();
-      
-      // 타이핑 메시지 제거하고 실제 응답 추가
-      setMessages(prev => {
-        const filtered = prev.filter(msg => !msg.isTyping);
-        return [...filtered, {
-          id: `assistant-${Date.now()}`,
-          content: data.response,
-          role: 'assistant',
-          timestamp: new Date()
-        }];
-      });
+      if (!response.ok || !response.body) {
+        throw new Error(`HTTP ${response.status}`);
+      }
+
+      const completedLines: string[] = [];
+
+      // 타이핑 메시지를 스트리밍 중인 응답 메시지로 교체/갱신
+      const updateAssistant = (content: string) => {
+        setMessages(prev => {
+          const filtered = prev.filter(msg => !msg.isTyping && msg.id !== assistantId);
+          return [...filtered, {
+            id: assistantId,
+            content,
+            role: 'assistant',
+            timestamp: new Date()
+          }];
+        });
+      };
+
+      // SSE 이벤트 파싱 (event: <type>\ndata: <json>\n\n)
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let finished = false;
+
+      while (!finished) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let boundary = buffer.indexOf('\n\n');
+        while (boundary !== -1) {
+          const rawEvent = buffer.slice(0, boundary);
+          buffer = buffer.slice(boundary + 2);
+          boundary = buffer.indexOf('\n\n');
+
+          let eventType = 'message';
+          let data = '';
+          for (const line of rawEvent.split('\n')) {
+            if (line.startsWith('event:')) eventType = line.slice(6).trim();
+            else if (line.startsWith('data:')) data += line.slice(5).trim();
+          }
+          if (!data) continue;
+          const payload = JSON.parse(data);
+
+          if (eventType === 'delta') {
+            completedLines.push(...payload.lines);
+            const content = [...completedLines, payload.pending].filter(Boolean).join('\n');
+            if (content) updateAssistant(content);
+          } else if (eventType === 'done') {
+            updateAssistant(payload.response);
+            finished = true;
+          } else if (eventType === 'error') {
+            throw new Error(payload.message);
+          }
+        }
+      }
+
+      if (!finished) {
+        throw new Error('응답 스트림이 중간에 종료되었습니다.');
+      }
     } catch (error) {
       console.error('Error sending message:', error);
-      // 에러 메시지 표시
+      // 에러 메시지 표시 (스트리밍 중이던 미완성 응답도 제거)
       setMessages(prev => {
-        const filtered = prev.filter(msg => !msg.isTyping);
+        const filtered = prev.filter(msg => !msg.isTyping && msg.id !== assistantId);
         return [...filtered, {
           id: `error-${Date.now()}`,
           content: '죄송합니다. 응답을 생성하는 중 오류가 발생했습니다.',
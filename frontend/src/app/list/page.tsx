@@ -35,7 +35,17 @@ interface Conversation {
   summary: string;
   status: string;
   message_count: number;
-  messages: Message[];
+  messages?: Message[];
+}
+
+const SEARCH_URL = 'http://localhost:8000/api/v1/analysis/search';
+const CONVERSATION_URL = 'http://localhost:8000/api/v1/analysis/conversations';
+
+// 첫 페이지를 조회한 검색 조건 (이후 페이지는 입력란이 바뀌어도 같은 조건으로 이어서 조회)
+interface SearchParams {
+  startDate: string;
+  endDate: string;
+  keyword?: string;
 }
 
 export default function ListPage() {
@@ -50,26 +60,38 @@ export default function ListPage() {
   const [conversations, setConversations] = useState<Conversation[]>([]);
   const [isLoading, setIsLoading] = useState(false);
   const [total, setTotal] = useState(0);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [searchParams, setSearchParams] = useState<SearchParams | null>(null);
   const [selectedConversation, setSelectedConversation] = useState<Conversation | null>(null);
 
-  const handleSearch = async () => {
-    if (!dateRange.startDate || !dateRange.endDate) {
-      alert('날짜 범위를 선택해주세요.');
+  const handleSearch = async (cursor: string | null = null) => {
+    let params = searchParams;
+    if (!cursor) {
+      if (!dateRange.startDate || !dateRange.endDate) {
+        alert('날짜 범위를 선택해주세요.');
+        return;
+      }
+      params = {
+        startDate: dateRange.startDate.toISOString(),
+        endDate: dateRange.endDate.toISOString(),
+        keyword: keyword.trim() || undefined,
+      };
+    }
+    if (!params) {
       return;
     }
     
     setIsLoading(true);
 
     try {
-      const response = await fetch('http://localhost:8000/api/v1/analysis/search', {
+      const response = await fetch(SEARCH_URL, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
         },
         body: JSON.stringify({
-          startDate: dateRange.startDate.toISOString(),
-          endDate: dateRange.endDate.toISOString(),
-          keyword: keyword.trim() || undefined,
+          ...params,
+          cursor: cursor || undefined,
         }),
       });
 
@@ -79,8 +101,15 @@ export default function ListPage() {
       }
 
       const data = await response.json();
-      setConversations(data.conversations);
-      setTotal(data.total);
+      // 첫 페이지면 새로 채우고, 이후 페이지는 이어 붙임 (전체 건수는 첫 페이지에서만 옴)
+      if (cursor) {
+        setConversations((prev) => [...prev, ...data.conversations]);
+      } else {
+        setConversations(data.conversations);
+        setTotal(data.total);
+        setSearchParams(params);
+      }
+      setNextCursor(data.next_cursor);
     } catch (error) {
       console.error('Search error:', error);
       alert('검색 중 오류가 발생했습니다.');
@@ -89,6 +118,22 @@ export default function ListPage() {
     }
   };
 
+  // 목록에는 요약만 있으므로 선택한 상담의 전체 메시지를 불러옴
+  const handleSelect = async (conv: Conversation) => {
+    setSelectedConversation(conv);
+    try {
+      const response = await fetch(`${CONVERSATION_URL}/${conv.id}`);
+      if (!response.ok) {
+        throw new Error('상담 내용을 불러오지 못했습니다.');
+      }
+      const detail: Conversation = await response.json();
+      setSelectedConversation((current) => (current?.id === detail.id ? detail : current));
+    } catch (error) {
+      console.error('Detail error:', error);
+      alert('상담 내용을 불러오는 중 오류가 발생했습니다.');
+    }
+  };
+
   return (
     <div className="container mx-auto p-4">
       <h1 className="text-2xl font-bold mb-6">상담 리스트</h1>
@@ -108,7 +153,7 @@ export default function ListPage() {
             className="flex-1"
           />
           <Button
-            onClick={handleSearch}
+            onClick={() => handleSearch()}
             disabled={isLoading || !dateRange.startDate || !dateRange.endDate}
           >
             {isLoading ? '검색 중...' : '검색'}
@@ -139,9 +184,9 @@ export default function ListPage() {
                 <TableRow
                   key={conv.id}
                   className="cursor-pointer hover:bg-gray-50"
-                  onClick={() => setSelectedConversation(conv)}
+                  onClick={() => handleSelect(conv)}
                 >
-                  <TableCell className="font-medium">{conversations.length - index}</TableCell>
+                  <TableCell className="font-medium">{total - index}</TableCell>
                   <TableCell>
                     {format(new Date(conv.consultation_time), 'yyyy-MM-dd HH:mm:ss', { locale: ko })}
                   </TableCell>
@@ -152,6 +197,17 @@ export default function ListPage() {
               ))}
             </TableBody>
           </Table>
+          {nextCursor && (
+            <div className="p-4 text-center">
+              <Button
+                variant="outline"
+                onClick={() => handleSearch(nextCursor)}
+                disabled={isLoading}
+              >
+                {isLoading ? '불러오는 중...' : '더 보기'}
+              </Button>
+            </div>
+          )}
         </div>
       ) : (
         !isLoading && (
@@ -167,7 +223,10 @@ export default function ListPage() {
             <DialogTitle>상담 내용</DialogTitle>
           </DialogHeader>
           <div className="space-y-4 mt-4">
-            {selectedConversation?.messages.map((message, index) => (
+            {!selectedConversation?.messages && (
+              <div className="text-center text-gray-500">불러오는 중...</div>
+            )}
+            {selectedConversation?.messages?.map((message, index) => (
               <div
                 key={index}
                 className={`flex ${message.role === 'user' ? 'justify-end' : 'justify-start'}`}